@@ -0,0 +1,167 @@
+"""
+End-to-end benchmark of the fetch layer against a local mock Semantic Scholar API.
+
+A synthetic citation graph is served by mock_s2.py, the fetchers are pointed
+at it through S2_API_BASE, and each scenario runs in a fresh process so that
+its peak RSS is its own:
+
+    python benchmarks/bench_crawl.py --papers 50000 --latency-ms 20 --jitter-ms 10
+    python benchmarks/bench_crawl.py crawl_async --throttle-rate 0.05 --error-rate 0.01 --json after.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mock_s2 import DEGREES, SyntheticGraph, start_server
+
+PROCESSING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCENARIOS = ["crawl", "crawl_async", "trending", "conference", "bulk"]
+
+@contextlib.contextmanager
+def record_requests():
+    """Time every HTTP request sent through requests while the block runs, as (seconds, status) pairs."""
+    import requests
+
+    timings = []
+    send = requests.Session.send
+
+    def timed_send(session, request, **kwargs):
+        start = time.perf_counter()
+        response = send(session, request, **kwargs)
+        timings.append((time.perf_counter() - start, response.status_code))
+        return response
+
+    requests.Session.send = timed_send
+    try:
+        yield timings
+    finally:
+        requests.Session.send = send
+
+def run_scenario(name, api_base, options):
+    """Run one scenario against the mock API and measure it. Runs in a fresh worker process."""
+    # Must be set before the fetchers are imported, they read it once
+    os.environ["S2_API_BASE"] = api_base
+    for directory in ["", "trending", "scholar_api"]:
+        sys.path.append(os.path.join(PROCESSING_DIR, directory))
+    from rate_limit import TokenBucket
+    from network_citations import SemanticScholarClient
+    from trending_papers import fetch_trending_cs_papers
+    from cs_conf import fetch_cs_conference_papers
+    from bulk_search import iter_bulk_search
+
+    limiter = TokenBucket(rate=options["rate"], burst=options["burst"])
+    output = sys.stdout if options["verbose"] else open(os.devnull, "w")
+
+    with record_requests() as timings, contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        start = time.perf_counter()
+        if name in ("crawl", "crawl_async"):
+            client = SemanticScholarClient(limiter=limiter)
+            root, depth = options["root"], options["depth"]
+            if name == "crawl":
+                network = client.build_citation_network(root, max_depth=depth, direction="citations")
+            else:
+                import asyncio
+                network = asyncio.run(client.build_citation_network_async(
+                    root, max_depth=depth, direction="citations", max_concurrency=options["concurrency"]
+                ))
+            papers = len(network["papers"])
+        elif name == "trending":
+            papers = len(fetch_trending_cs_papers(options["max_papers"], limiter=limiter))
+        elif name == "conference":
+            papers = len(fetch_cs_conference_papers(options["max_papers"], limiter=limiter))
+        else:
+            papers = sum(1 for _ in iter_bulk_search(max_papers=options["max_papers"], limiter=limiter))
+        elapsed = time.perf_counter() - start
+
+    latencies = np.array([seconds for seconds, _ in timings]) * 1000
+    statuses = [status for _, status in timings]
+    return {
+        "scenario": name,
+        "papers": papers,
+        "seconds": round(elapsed, 3),
+        "papers_per_sec": round(papers / elapsed, 1) if elapsed else None,
+        "requests": len(timings),
+        "requests_per_paper": round(len(timings) / papers, 4) if papers else None,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+        "throttled": statuses.count(429),
+        "server_errors": sum(1 for status in statuses if status >= 500),
+        # ru_maxrss is in KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+def print_report(results):
+    columns = ["scenario", "papers", "seconds", "papers_per_sec", "requests", "requests_per_paper",
+               "p50_ms", "p99_ms", "throttled", "server_errors", "peak_rss_mb"]
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[column]).rjust(width) for column, width in zip(columns, widths)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Semantic Scholar fetchers against a local mock API.")
+    parser.add_argument("scenarios", nargs="*", default=SCENARIOS,
+                        help=f"scenarios to run among {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--papers", type=int, default=20000, help="number of papers in the synthetic graph")
+    parser.add_argument("--mean-degree", type=int, default=10, help="mean number of references per paper")
+    parser.add_argument("--degree", choices=DEGREES, default="powerlaw", help="degree distribution of the graph")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the graph generator")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="fixed delay of every response")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="mean exponential jitter added to the delay")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--root-rank", type=int, default=200,
+                        help="crawl from the paper with this citation rank (default: 200)")
+    parser.add_argument("--depth", type=int, default=2, help="depth of the crawl scenarios (default: 2)")
+    parser.add_argument("--concurrency", type=int, default=8, help="workers of the crawl_async scenario")
+    parser.add_argument("--max-papers", type=int, default=1000, help="papers fetched by the search scenarios")
+    parser.add_argument("--rate", type=float, default=1000.0,
+                        help="client rate limit in requests/s, high by default to measure the fetch layer itself")
+    parser.add_argument("--burst", type=int, default=50, help="client rate limiter burst")
+    parser.add_argument("--json", metavar="FILE", help="also save the results to FILE")
+    parser.add_argument("--verbose", action="store_true", help="show the fetchers' own output")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    graph = SyntheticGraph(args.papers, args.mean_degree, args.degree, args.seed)
+    server = start_server(graph, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                          throttle_rate=args.throttle_rate, error_rate=args.error_rate)
+    api_base = f"http://127.0.0.1:{server.server_port}/graph/v1"
+    print(f"Mock API with {graph.size} papers and {graph.edge_count} citations at {api_base} "
+          f"(built in {time.perf_counter() - start:.1f}s)")
+
+    options = {
+        "root": graph.paper_ids[int(graph.by_citations[min(args.root_rank, graph.size - 1)])],
+        "depth": args.depth,
+        "concurrency": args.concurrency,
+        "max_papers": args.max_papers,
+        "rate": args.rate,
+        "burst": args.burst,
+        "verbose": args.verbose
+    }
+    results = []
+    for name in args.scenarios:
+        # A fresh process per scenario, so that peak RSS and imports are not shared
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            results.append(executor.submit(run_scenario, name, api_base, options).result())
+        print(f"{name}: {results[-1]['papers']} papers in {results[-1]['seconds']}s")
+    server.shutdown()
+
+    print()
+    print_report(results)
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key not in ("json", "verbose")}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+        print(f"\nResults saved to {args.json}")
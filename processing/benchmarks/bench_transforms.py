@@ -0,0 +1,255 @@
+"""
+Micro-benchmarks and regression gate for the in-memory network transforms.
+
+Every function runs on seeded synthetic networks from 1k to 1M connections.
+Its best time over a few repeats and its peak traced memory are recorded:
+
+    python benchmarks/bench_transforms.py --save --sizes 1k 10k 100k 1M  # record baselines.json
+    python benchmarks/bench_transforms.py --compare                      # exit 1 on a regression past 50%
+    python benchmarks/bench_transforms.py --compare --sizes 1M           # large crawls, about ten minutes
+    python benchmarks/bench_transforms.py --sizes 1k 10k --functions save_to_csv read_network_csv
+
+Timings depend on the machine, so baselines should be recorded on the
+machine the comparison runs on. Even there, runs of the larger sizes vary
+by a third on a shared host, so the default threshold only catches real
+slowdowns, such as an accidental quadratic loop or a lost index.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Shared helpers live in the parent processing/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from citation_graph import CitationGraph
+from network_citations import (
+    extract_author_collaboration_network, read_network_csv, save_to_csv, save_to_json,
+    author_graph, top_author_graph
+)
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000, "1M": 1000000}
+DEFAULT_SIZES = ["1k", "10k", "100k"]
+
+def synthetic_network(edges, seed=0, mean_degree=4):
+    """
+    Seeded synthetic network in the {"papers", "connections"} format of the crawler.
+
+    There is one crawled paper per `mean_degree` connections. Authors are
+    drawn from a pool with a heavy tail, so that some authors collaborate a
+    lot, and a tenth of the connections point to papers that were not crawled,
+    as on the last level of a real crawl.
+    """
+    rng = random.Random(seed)
+    paper_count = max(edges // mean_degree, 2)
+    author_pool = max(paper_count // 2, 10)
+    paper_ids = [f"{rng.getrandbits(160):040x}" for _ in range(paper_count)]
+
+    papers = {}
+    for i, paper_id in enumerate(paper_ids):
+        authors = {f"Author {int(author_pool * rng.random() ** 2)}" for _ in range(rng.randint(1, 8))}
+        papers[paper_id] = {
+            "title": f"Synthetic paper {i}",
+            "authors": sorted(authors),
+            "year": rng.randint(1970, 2024),
+            "venue": f"Venue {rng.randint(0, 200)}",
+            "url": f"https://www.semanticscholar.org/paper/{paper_id}"
+        }
+
+    connections = []
+    for _ in range(edges):
+        source = paper_ids[rng.randrange(paper_count)]
+        target = paper_ids[rng.randrange(paper_count)] if rng.random() < 0.9 else f"{rng.getrandbits(160):040x}"
+        connections.append({"source": source, "target": target})
+    return {"papers": papers, "connections": connections}
+
+def benchmarks(network, directory):
+    """
+    The benchmarked functions, as name -> (setup, run) pairs.
+
+    setup prepares the inputs outside the measurement and returns the
+    arguments of run.
+    """
+    prefix = os.path.join(directory, "network")
+
+    def write_csv():
+        save_to_csv(network, prefix)
+        return (f"{prefix}_papers.csv", f"{prefix}_connections.csv")
+
+    def author_network():
+        return (extract_author_collaboration_network(network),)
+
+    return {
+        "extract_author_collaboration_network": (lambda: (network,), extract_author_collaboration_network),
+        "save_to_json": (lambda: (network, f"{prefix}.json"), save_to_json),
+        "save_to_csv": (lambda: (network, prefix), save_to_csv),
+        "read_network_csv": (write_csv, read_network_csv),
+        "citation_graph": (lambda: (network,),
+                           lambda data: CitationGraph.from_network(data, crawled_only=True).to_networkx()),
+        "author_graph": (author_network, author_graph),
+        "top_author_graph": (author_network, top_author_graph)
+    }
+
+def measure(setup, run, repeat=5):
+    """
+    Best wall time of `repeat` runs, and the peak memory traced during one more run, in MB.
+
+    The garbage collector is paused during the timed runs, as timeit does,
+    so that collections triggered by earlier allocations do not add noise.
+    """
+    quiet = io.StringIO()
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(quiet):
+            args = setup()
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                run(*args)
+                best = min(best, time.perf_counter() - start)
+            finally:
+                gc.enable()
+
+    with contextlib.redirect_stdout(quiet):
+        args = setup()
+        tracemalloc.start()
+        try:
+            run(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"seconds": round(best, 5), "peak_mb": round(peak / 1024 ** 2, 3)}
+
+def calibrate(repeat=5):
+    """
+    Best time of a fixed pure-Python workload, in seconds.
+
+    Saved with the baselines; comparisons scale the baseline times by the
+    ratio of the two calibrations, so that a machine that is busier or
+    slower than when the baselines were recorded is not reported as a
+    regression of every function.
+    """
+    def workload():
+        table = {}
+        for i in range(200000):
+            key = f"paper {i * 7919 % 200000}"
+            table[key] = table.get(key, 0) + 1
+        return sorted(table.items())
+
+    return measure(lambda: (), workload, repeat)["seconds"]
+
+def run_benchmarks(sizes=DEFAULT_SIZES, functions=None, repeat=5, seed=0):
+    """Run the selected functions on every size; returns {function: {size: measurement}}."""
+    results = {}
+    for size in sizes:
+        network = synthetic_network(SIZES[size], seed)
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (setup, run) in benchmarks(network, directory).items():
+                if functions and name not in functions:
+                    continue
+                results.setdefault(name, {})[size] = measure(setup, run, repeat)
+                result = results[name][size]
+                print(f"{name:<40} {size:>5}  {result['seconds'] * 1000:10.1f} ms  {result['peak_mb']:9.1f} MB")
+    return results
+
+def compare(results, baselines, threshold=0.5, memory_threshold=0.25, min_seconds=0.005, speed=1.0):
+    """
+    List the regressions of `results` against `baselines`.
+
+    A function regresses when its time grows by more than `threshold` and by
+    more than `min_seconds` (to ignore the noise of very short runs), or when
+    its peak memory grows by more than `memory_threshold`. Baseline times are
+    first multiplied by `speed`, the current calibration over the saved one.
+
+    Returns:
+        List of (function, size, message), empty if nothing regressed
+    """
+    regressions = []
+    for name, by_size in results.items():
+        for size, result in by_size.items():
+            baseline = baselines.get(name, {}).get(size)
+            if baseline is None:
+                continue  # Reported by missing_baselines
+            expected = baseline["seconds"] * speed
+            if result["seconds"] - expected > min_seconds and result["seconds"] > expected * (1 + threshold):
+                regressions.append((name, size, f"{expected * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms"))
+            if result["peak_mb"] > baseline["peak_mb"] * (1 + memory_threshold) and result["peak_mb"] - baseline["peak_mb"] > 1:
+                regressions.append((name, size, f"{baseline['peak_mb']:.1f} MB -> {result['peak_mb']:.1f} MB peak memory"))
+    return regressions
+
+def missing_baselines(results, baselines):
+    """List the (function, size) pairs of `results` that have no baseline to be compared with."""
+    return [
+        (name, size) for name, by_size in results.items() for size in by_size
+        if size not in baselines.get(name, {})
+    ]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory network transforms.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=DEFAULT_SIZES,
+                        help="network sizes in connections (default: 1k 10k 100k)")
+    parser.add_argument("--functions", nargs="+", help="only run these functions")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per function, the best one is kept")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the network generator")
+    parser.add_argument("--baselines", default=BASELINES_FILE, help="baselines JSON file")
+    parser.add_argument("--save", action="store_true", help="record the results as the new baselines")
+    parser.add_argument("--compare", action="store_true", help="fail if a function regressed past the threshold or has no baseline")
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown, as a fraction (default: 0.5)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="allowed growth of the peak memory, as a fraction (default: 0.25)")
+    args = parser.parse_args()
+
+    # Calibrated before and after the run, since the machine load can drift during it
+    calibration = calibrate()
+    results = run_benchmarks(args.sizes, args.functions, args.repeat, args.seed)
+    calibration = round((calibration + calibrate()) / 2, 5)
+
+    if args.compare:
+        with open(args.baselines, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        speed = calibration / saved["calibration"] if saved.get("calibration") else 1.0
+        print(f"Machine speed relative to the baselines: {1 / speed:.2f}x")
+        # An unchecked size would pass silently, so it fails the gate until it is recorded with --save
+        missing = missing_baselines(results, saved["results"])
+        for name, size in missing:
+            print(f"ERROR: No baseline for {name} at {size}, record it with --save")
+        if missing:
+            sys.exit(1)
+        regressions = compare(results, saved["results"], args.threshold, args.memory_threshold, speed=speed)
+        if regressions:
+            # A slow spell of the host can outlast the repeats of one function, so
+            # suspected regressions are measured again and only kept if they persist
+            print(f"Measuring {len(regressions)} suspected regressions again")
+            for name, size in sorted({(name, size) for name, size, _ in regressions}):
+                retry = run_benchmarks([size], [name], args.repeat, args.seed)[name][size]
+                results[name][size] = {key: min(value, retry[key]) for key, value in results[name][size].items()}
+            regressions = compare(results, saved["results"], args.threshold, args.memory_threshold, speed=speed)
+        for name, size, message in regressions:
+            print(f"REGRESSION: {name} at {size}: {message}")
+        if regressions:
+            sys.exit(1)
+        print("No regression")
+
+    if args.save:
+        saved = {"results": {}}
+        if os.path.exists(args.baselines):
+            with open(args.baselines, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        # Only the measured functions and sizes are replaced
+        for name, by_size in results.items():
+            saved["results"].setdefault(name, {}).update(by_size)
+        saved["calibration"] = calibration
+        saved["machine"] = {"python": platform.python_version(), "platform": platform.platform(),
+                            "processor": platform.processor() or platform.machine()}
+        with open(args.baselines, "w", encoding="utf-8") as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+        print(f"Baselines saved to {args.baselines}")
@@ -0,0 +1,228 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+# The real API returns at most this many nested citations or references per paper
+MAX_NESTED = 1000
+DEGREES = ["uniform", "powerlaw"]
+VENUES = ["NeurIPS", "ICML", "SIGMOD", "VLDB", "OSDI", "SOSP", "STOC", "FOCS", "CVPR", "ACL", ""]
+
+class SyntheticGraph:
+    """
+    Seeded synthetic citation graph served by the mock API.
+
+    Every paper cites a number of older papers drawn from `degree`: "uniform"
+    gives each paper between 0 and 2 * mean_degree references, cited papers
+    chosen uniformly; "powerlaw" draws heavy-tailed reference counts and
+    makes papers cite popular papers more often, as real citation graphs do.
+    Citations and references are stored as CSR arrays, so graphs of millions
+    of edges stay cheap.
+    """
+
+    def __init__(self, papers=10000, mean_degree=10, degree="powerlaw", seed=0):
+        if degree not in DEGREES:
+            raise ValueError(f"Degree distribution must be one of {', '.join(DEGREES)}")
+        rng = np.random.default_rng(seed)
+        self.size = papers
+        self.paper_ids = [f"{i:040x}" for i in range(papers)]
+        self.index = {paper_id: i for i, paper_id in enumerate(self.paper_ids)}
+        self.years = rng.integers(1970, 2025, papers)
+
+        if degree == "uniform":
+            out_degree = rng.integers(0, 2 * mean_degree + 1, papers)
+            weights = None
+        else:
+            out_degree = np.minimum(rng.pareto(2.0, papers) * mean_degree, 50 * mean_degree).astype(np.int64)
+            weights = 1.0 / np.arange(1, papers + 1) ** 0.8
+            weights /= weights.sum()
+        sources = np.repeat(np.arange(papers), out_degree)
+        targets = rng.choice(papers, size=len(sources), p=weights)
+        keep = sources != targets
+        sources, targets = sources[keep], targets[keep]
+        self.edge_count = len(sources)
+
+        self.ref_indptr, self.ref_indices = self._csr(sources, targets, papers)
+        self.cit_indptr, self.cit_indices = self._csr(targets, sources, papers)
+        self.citation_count = np.diff(self.cit_indptr)
+        # Search results come most cited first
+        self.by_citations = np.argsort(-self.citation_count, kind="stable")
+
+    @staticmethod
+    def _csr(keys, values, n):
+        order = np.argsort(keys, kind="stable")
+        return np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=n))]), values[order]
+
+    def paper(self, i, fields):
+        """The API record of paper i, restricted to the requested fields."""
+        paper_id = self.paper_ids[i]
+        record = {"paperId": paper_id}
+        for field in fields:
+            if field == "title":
+                record["title"] = f"Synthetic paper {i}"
+            elif field == "abstract":
+                record["abstract"] = f"Abstract of synthetic paper {i}."
+            elif field == "year":
+                record["year"] = int(self.years[i])
+            elif field == "venue":
+                record["venue"] = VENUES[i % len(VENUES)]
+            elif field == "url":
+                record["url"] = f"https://www.semanticscholar.org/paper/{paper_id}"
+            elif field == "authors":
+                record["authors"] = [
+                    {"authorId": str(i * 7 % 5003 + k), "name": f"Author {i * 7 % 5003 + k}"}
+                    for k in range(1 + i % 4)
+                ]
+            elif field == "citationCount":
+                record["citationCount"] = int(self.citation_count[i])
+            elif field == "influentialCitationCount":
+                record["influentialCitationCount"] = int(self.citation_count[i]) // 10
+            elif field.lower() == "publicationtypes":
+                record["publicationTypes"] = ["Conference" if i % 2 else "JournalArticle"]
+            elif field == "fieldsOfStudy":
+                record["fieldsOfStudy"] = ["Computer Science"]
+            elif field in ("citations", "references"):
+                indptr, indices = (self.cit_indptr, self.cit_indices) if field == "citations" else (self.ref_indptr, self.ref_indices)
+                linked = indices[indptr[i]:indptr[i + 1]][:MAX_NESTED].tolist()
+                record[field] = [{"paperId": self.paper_ids[j]} for j in linked]
+        return record
+
+class MockS2Handler(BaseHTTPRequestHandler):
+    """Serves /graph/v1/paper/{id}, /paper/batch, /paper/search and /paper/search/bulk from the server's graph."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so client connection pools are exercised
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._serve("GET")
+
+    def do_POST(self):
+        self._serve("POST")
+
+    def _serve(self, method):
+        server = self.server
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)) if method == "POST" else b""
+        with server.lock:
+            server.requests += 1
+
+        delay = server.latency + (random.expovariate(1.0 / server.jitter) if server.jitter > 0 else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < server.throttle_rate:
+            return self._send(429, {"message": "Too Many Requests"}, {"Retry-After": str(server.retry_after)})
+        if roll < server.throttle_rate + server.error_rate:
+            return self._send(503, {"message": "Service Unavailable"})
+
+        graph = server.graph
+        fields = [field for field in query.get("fields", "title").split(",") if field]
+        path = url.path[len("/graph/v1"):] if url.path.startswith("/graph/v1") else url.path
+
+        if path == "/paper/batch" and method == "POST":
+            ids = json.loads(body or b"{}").get("ids", [])
+            return self._send(200, [
+                graph.paper(graph.index[paper_id], fields) if paper_id in graph.index else None
+                for paper_id in ids
+            ])
+
+        if path == "/paper/search/bulk":
+            start = int(query.get("token") or 0)
+            stop = min(start + 1000, graph.size)
+            page = {"total": graph.size, "data": [graph.paper(int(i), fields) for i in graph.by_citations[start:stop]]}
+            if stop < graph.size:
+                page["token"] = str(stop)
+            return self._send(200, page)
+
+        if path == "/paper/search":
+            offset = int(query.get("offset", 0))
+            limit = min(int(query.get("limit", 10)), 100)
+            stop = min(offset + limit, graph.size)
+            page = {"total": graph.size, "offset": offset, "data": [graph.paper(int(i), fields) for i in graph.by_citations[offset:stop]]}
+            if stop < graph.size:
+                page["next"] = stop
+            return self._send(200, page)
+
+        if path.startswith("/paper/") and method == "GET":
+            paper_id = path[len("/paper/"):]
+            if paper_id in graph.index:
+                return self._send(200, graph.paper(graph.index[paper_id], fields))
+            return self._send(404, {"error": "Paper not found"})
+
+        self._send(404, {"error": f"Unknown endpoint {url.path}"})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_server(graph, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, throttle_rate=0.0, error_rate=0.0,
+                 retry_after=0.2):
+    """
+    Serve a synthetic graph in a background thread.
+
+    Args:
+        graph: SyntheticGraph to serve
+        host: Interface to listen on
+        port: Port to listen on (default: any free port)
+        latency: Fixed delay added to every response, in seconds
+        jitter: Mean of an exponential delay added on top of `latency`, in seconds
+        throttle_rate: Fraction of requests answered with 429 and a Retry-After of `retry_after` seconds
+        error_rate: Fraction of requests answered with 503
+
+    Returns:
+        The running server; its API root is f"http://{host}:{server.server_port}/graph/v1",
+        and server.requests counts the requests received
+    """
+    server = ThreadingHTTPServer((host, port), MockS2Handler)
+    server.daemon_threads = True
+    server.graph = graph
+    server.latency = latency
+    server.jitter = jitter
+    server.throttle_rate = throttle_rate
+    server.error_rate = error_rate
+    server.retry_after = retry_after
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve a synthetic Semantic Scholar API. Point the fetchers at it with "
+                    "S2_API_BASE=http://HOST:PORT/graph/v1."
+    )
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    parser.add_argument("--papers", type=int, default=10000, help="number of papers in the graph")
+    parser.add_argument("--mean-degree", type=int, default=10, help="mean number of references per paper")
+    parser.add_argument("--degree", choices=DEGREES, default="powerlaw", help="degree distribution")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the graph generator")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixed delay of every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="mean exponential jitter added to the delay")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    graph = SyntheticGraph(args.papers, args.mean_degree, args.degree, args.seed)
+    server = start_server(graph, port=args.port, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                          throttle_rate=args.throttle_rate, error_rate=args.error_rate)
+    print(f"Serving {graph.size} papers and {graph.edge_count} citations at http://127.0.0.1:{server.server_port}/graph/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
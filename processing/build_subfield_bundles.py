@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+
+from network_citations import read_network_csv, extract_author_collaboration_network
+from citation_graph import CitationGraph
+from graph_layout import cached_layout
+from prune_network import prune_network, RANKINGS
+
+SUBFIELDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "website", "src", "data", "subfields")
+BUNDLE_VERSION = 1
+
+def sunburst_selection(papers, max_papers=50, max_per_venue=10):
+    """
+    Pick the papers shown in the venue sunburst, as graphs.js used to do in the browser.
+
+    The largest venues come first, with at most `max_per_venue` papers each
+    and `max_papers` in total. The spotlight paper (the first one) is always
+    included, under "Unknown Venue" if it has none.
+
+    Parameters:
+    - papers: List of paper dictionaries, spotlight first
+
+    Returns:
+    - List of (venue name, list of paper indexes) pairs
+    """
+    venue_map = {}
+    for i, paper in enumerate(papers):
+        venue = paper["venue"] or ""
+        if venue.strip():
+            venue_map.setdefault(venue, []).append(i)
+
+    main_venue = papers[0]["venue"] if (papers[0]["venue"] or "").strip() else "Unknown Venue"
+    sorted_venues = sorted(venue_map.items(), key=lambda item: len(item[1]), reverse=True)
+
+    total = 0
+    selection = []
+    main_added = False
+    for venue, indexes in sorted_venues:
+        if total >= max_papers:
+            break
+        chosen = indexes[:min(max_per_venue, max_papers - total)]
+        total += len(chosen)
+        main_added = main_added or 0 in chosen
+        if chosen:
+            selection.append((venue, chosen))
+
+    if not main_added:
+        for venue, chosen in selection:
+            if venue == main_venue:
+                chosen.append(0)
+                break
+        else:
+            others = [i for i in venue_map.get(main_venue, []) if i != 0][:max_per_venue - 1]
+            selection.append((main_venue, [0] + others))
+
+    return selection
+
+def author_selection(papers, author_network, limit=100):
+    """
+    Pick the authors shown in the co-author graph: the `limit` authors with the most papers, plus the main author.
+
+    Returns:
+    - Tuple of (list of (author, paper indexes), list of (i, j, weight) links between them, index of the main author)
+    """
+    index = {paper_id: i for i, paper_id in enumerate(papers)}
+    ranked = sorted(author_network["author_papers"].items(), key=lambda item: len(item[1]), reverse=True)
+    top = [(author, [index[p] for p in paper_ids]) for author, paper_ids in ranked[:limit]]
+
+    spotlight_authors = next(iter(papers.values()))["authors"]
+    main_author = spotlight_authors[0] if spotlight_authors else "unknown"
+    if main_author not in {author for author, _ in top}:
+        top.append((main_author, [index[p] for p in author_network["author_papers"].get(main_author, [])]))
+
+    position = {author: i for i, (author, _) in enumerate(top)}
+    links = [
+        (position[a], position[b], weight)
+        for (a, b), weight in author_network["collaborations"].items()
+        if a in position and b in position
+    ]
+    return top, links, position[main_author]
+
+def build_bundle(network_data, max_authors=100):
+    """
+    Pre-aggregate the data drawn by the subfield explorer into one compact dictionary.
+
+    Papers are referred to by int indexes into the bundle's own paper table,
+    which only holds the papers shown by the website, spotlight first. Venue
+    names are stored once and referred to by index.
+
+    Parameters:
+    - network_data: Dictionary with papers and connections, spotlight paper first
+    - max_authors: Number of authors in the co-author graph
+
+    Returns:
+    - Dictionary ready to be saved as JSON
+    """
+    papers = list(network_data["papers"].values())
+
+    graph = CitationGraph.from_network(network_data)
+    in_degree = graph.in_degree()
+    out_degree = graph.out_degree()
+
+    sunburst = sunburst_selection(papers)
+    author_network = extract_author_collaboration_network(network_data, max_authors_per_paper=None)
+    authors, links, main_author = author_selection(network_data["papers"], author_network, max_authors)
+
+    # Only the papers drawn somewhere are shipped, renumbered in order of first use
+    shipped = {0: 0}
+    for _, indexes in sunburst:
+        for i in indexes:
+            shipped.setdefault(i, len(shipped))
+    for _, indexes in authors:
+        for i in indexes:
+            shipped.setdefault(i, len(shipped))
+    order = sorted(shipped, key=shipped.get)
+
+    venues = []
+    venue_index = {}
+    for i in order:
+        venue = papers[i]["venue"] or ""
+        if venue not in venue_index:
+            venue_index[venue] = len(venues)
+            venues.append(venue)
+
+    # Start the co-author force simulation from settled positions
+    pos = cached_layout(len(authors), [a for a, _, _ in links], [b for _, b, _ in links])
+
+    spotlight = papers[0]
+    return {
+        "version": BUNDLE_VERSION,
+        "spotlight": {
+            "title": spotlight["title"],
+            "authors": spotlight["authors"],
+            "year": spotlight["year"],
+            "venue": spotlight["venue"],
+            "url": spotlight["url"]
+        },
+        "stats": {
+            "papers": len(papers),
+            "connections": graph.edge_count,
+            "authors": len(author_network["author_papers"]),
+            "max_citations": int(in_degree[:len(papers)].max()) if papers else 0,
+            "mean_citations": round(float(in_degree[:len(papers)].mean()), 3) if papers else 0
+        },
+        "venues": venues,
+        "papers": {
+            "title": [papers[i]["title"] for i in order],
+            "url": [papers[i]["url"] for i in order],
+            "year": [papers[i]["year"] for i in order],
+            "venue": [venue_index[papers[i]["venue"] or ""] for i in order],
+            "citations": [int(in_degree[i]) for i in order],
+            "references": [int(out_degree[i]) for i in order]
+        },
+        "sunburst": [
+            {"venue": venue, "papers": [shipped[i] for i in indexes]}
+            for venue, indexes in sunburst
+        ],
+        "authors": {
+            "main": main_author,
+            "name": [author for author, _ in authors],
+            "papers": [[shipped[i] for i in indexes] for _, indexes in authors],
+            "x": [round(x, 4) for x in pos[:, 0].tolist()],
+            "y": [round(y, 4) for y in pos[:, 1].tolist()]
+        },
+        "links": [value for link in links for value in link]
+    }
+
+def build_subfield_bundles(subfields_dir=SUBFIELDS_DIR, max_authors=100, top_k=None, by="in_degree"):
+    """
+    Write a bundle.json next to the papers.csv and connections.csv of every subfield.
+
+    If top_k is given, oversized crawls are first pruned to their top_k papers ranked `by`.
+    """
+    for name in sorted(os.listdir(subfields_dir)):
+        directory = os.path.join(subfields_dir, name)
+        papers_csv = os.path.join(directory, "papers.csv")
+        connections_csv = os.path.join(directory, "connections.csv")
+        if not (os.path.exists(papers_csv) and os.path.exists(connections_csv)):
+            continue
+
+        network_data = read_network_csv(papers_csv, connections_csv)
+        if not network_data["papers"]:
+            print(f"WARNING: No papers for subfield {name}, skipping.")
+            continue
+        if top_k is not None and len(network_data["papers"]) > top_k:
+            network_data = prune_network(network_data, top_k, by=by)
+
+        bundle = build_bundle(network_data, max_authors)
+        bundle_file = os.path.join(directory, "bundle.json")
+        with open(bundle_file, "w", encoding="utf-8") as f:
+            json.dump(bundle, f, ensure_ascii=False, separators=(",", ":"))
+        print(f"{name}: {len(network_data['papers'])} papers -> {os.path.getsize(bundle_file) // 1024} KB bundle")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the pre-aggregated data bundles of the subfield explorer.")
+    parser.add_argument("--subfields-dir", default=SUBFIELDS_DIR,
+                        help="directory holding one papers.csv/connections.csv directory per subfield")
+    parser.add_argument("--max-authors", type=int, default=100,
+                        help="number of authors in the co-author graph (default: 100)")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="prune each crawl to its top-k papers first (default: keep all papers)")
+    parser.add_argument("--by", choices=RANKINGS, default="in_degree", help="ranking used by --top-k")
+    args = parser.parse_args()
+
+    build_subfield_bundles(args.subfields_dir, args.max_authors, args.top_k, args.by)
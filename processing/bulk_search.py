@@ -0,0 +1,100 @@
+import json
+import os
+
+import requests
+from tqdm import tqdm
+
+from response_cache import CacheMiss
+from rate_limit import API_BASE, request_json
+from crawl_metrics import PAPERS, shared_metrics
+
+BULK_SEARCH_URL = f"{API_BASE}/paper/search/bulk"
+
+def iter_bulk_search(query="", fields=None, filters=None, sort=None, max_papers=None,
+                     cache=None, limiter=None, max_retries=10):
+    """
+    Stream papers from the /paper/search/bulk endpoint.
+
+    Unlike /paper/search, the bulk endpoint is not capped at 1,000 results and
+    does not re-rank between pages: each response carries a continuation token
+    for the next one, and papers are yielded as soon as their page arrives.
+
+    Args:
+        query: Optional text query matched against titles and abstracts
+        fields: List of paper fields to return
+        filters: Optional dict of extra parameters, e.g. year, fieldsOfStudy, publicationTypes
+        sort: Optional sort order, e.g. "citationCount:desc"
+        max_papers: Stop after this many papers (default: everything the query matches)
+        cache: Optional ResponseCache shared with the other fetchers
+        limiter: Optional TokenBucket, defaults to the one shared by all fetchers
+        max_retries: Maximum number of attempts per page
+
+    Yields:
+        Paper records as returned by the API
+    """
+    params = dict(filters or {})
+    if query:
+        params["query"] = query
+    if fields:
+        params["fields"] = ",".join(fields)
+    if sort:
+        params["sort"] = sort
+
+    yielded = 0
+    token = None
+    while True:
+        page_params = dict(params, token=token) if token else params
+        try:
+            data = request_json(requests, "GET", BULK_SEARCH_URL, params=page_params, limiter=limiter,
+                                max_retries=max_retries, cache=cache)
+        except CacheMiss:
+            print(f"Page after {yielded} papers is not cached, stopping in cache-only mode")
+            return
+
+        if data is None:
+            print(f"Failed to fetch data after {max_retries} retries, stopping after {yielded} papers")
+            return
+
+        page = data.get("data") or []
+        shared_metrics().inc(PAPERS, len(page), source="bulk_search", status="fetched")
+        for paper in page:
+            yield paper
+            yielded += 1
+            if max_papers is not None and yielded >= max_papers:
+                return
+
+        token = data.get("token")
+        if not token:
+            # No more papers to fetch
+            return
+
+def write_jsonl(records, filename, total=None):
+    """
+    Write records to a JSON-lines file as they arrive.
+
+    Args:
+        records: Iterable of JSON-serialisable records, e.g. iter_bulk_search(...)
+        filename: Output path
+        total: Optional expected number of records for the progress bar
+
+    Returns:
+        Number of records written
+    """
+    os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
+
+    count = 0
+    with open(filename, "w", encoding="utf-8") as f, tqdm(total=total, unit="paper") as pbar:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+            pbar.update(1)
+
+    print(f"{count} records saved to {filename}")
+    return count
+
+def read_jsonl(filename):
+    """Lazily read the records of a JSON-lines file."""
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,246 @@
+import numpy as np
+
+from crawl_state import PaperIdTable
+
+def gather_csr(indptr, indices, nodes):
+    """Return the concatenated adjacency lists of `nodes` in a CSR structure."""
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=indices.dtype)
+    # Offset of every output slot inside the adjacency list it comes from
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return indices[np.repeat(starts, counts) + offsets]
+
+def compress_csr(keys, values, n):
+    """Build (indptr, indices) grouping `values` by `keys`, keeping their order inside each group."""
+    order = np.argsort(keys, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=indptr[1:])
+    return indptr, values[order].astype(np.int32)
+
+class CitationGraph:
+    """
+    Compact directed citation graph backed by int arrays.
+
+    Nodes are dense int indexes: the crawled papers come first, in crawl
+    order, followed by the papers that are only linked to. Out-edges are
+    stored in CSR form (out_indptr, out_indices) and in-edges in CSC form
+    (in_indptr, in_indices), so degrees, neighbourhoods and the analytics
+    below are computed with NumPy instead of Python dictionaries. Edges
+    point from the citing paper to the cited one, and duplicates are dropped.
+
+    A networkx.DiGraph is only built on request by to_networkx().
+    """
+
+    def __init__(self, paper_ids, sources, targets, papers=None):
+        """
+        Args:
+            paper_ids: List of paper IDs, indexed by node
+            sources: Int array of citing nodes
+            targets: Int array of cited nodes
+            papers: Optional dict mapping paper ID to its fields
+        """
+        self.paper_ids = list(paper_ids)
+        self.papers = papers or {}
+        n = len(self.paper_ids)
+
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        keys = np.unique(sources * n + targets) if len(sources) else np.empty(0, dtype=np.int64)
+        sources, targets = keys // max(n, 1), keys % max(n, 1)
+
+        # Keys are sorted by source already, so the CSR order is the key order
+        self.out_indptr, self.out_indices = compress_csr(sources, targets, n)
+        self.in_indptr, self.in_indices = compress_csr(targets, sources, n)
+        self._index = None
+
+    @classmethod
+    def from_network(cls, network_data, crawled_only=False):
+        """
+        Build the graph of a {"papers", "connections"} network dictionary.
+
+        Args:
+            network_data: Dictionary with papers and connections
+            crawled_only: Drop the edges to papers that were linked to but not crawled
+        """
+        ids = PaperIdTable()
+        for paper_id in network_data["papers"]:
+            ids.intern(paper_id)
+
+        sources = []
+        targets = []
+        for conn in network_data["connections"]:
+            if crawled_only and (conn["source"] not in ids or conn["target"] not in ids):
+                continue
+            sources.append(ids.intern(conn["source"]))
+            targets.append(ids.intern(conn["target"]))
+
+        return cls(ids.paper_ids, sources, targets, papers=network_data["papers"])
+
+    @classmethod
+    def from_crawl_state(cls, state):
+        """Build the graph of a CrawlState without going through its network dictionary."""
+        sources = np.frombuffer(state.edge_sources, dtype=np.int32) if state.edge_count else []
+        targets = np.frombuffer(state.edge_targets, dtype=np.int32) if state.edge_count else []
+        return cls(state.ids.paper_ids, sources, targets)
+
+    @classmethod
+    def from_tables(cls, papers_table, connections_table):
+        """
+        Build the graph of the tables returned by read_network_tables.
+
+        The dictionary indexes of the connections table are the node indexes,
+        so no paper ID is looked up.
+        """
+        source = connections_table.column("source").combine_chunks()
+        target = connections_table.column("target").combine_chunks()
+        dictionary = source.dictionary if len(source) else papers_table.column("paper_id").combine_chunks().dictionary
+        return cls(
+            dictionary.to_pylist(),
+            source.indices.to_numpy(zero_copy_only=False),
+            target.indices.to_numpy(zero_copy_only=False)
+        )
+
+    @property
+    def node_count(self):
+        return len(self.paper_ids)
+
+    @property
+    def edge_count(self):
+        return len(self.out_indices)
+
+    def index_of(self, paper_id):
+        """Return the node index of a paper ID."""
+        if self._index is None:
+            self._index = {paper_id: i for i, paper_id in enumerate(self.paper_ids)}
+        return self._index[paper_id]
+
+    def out_degree(self):
+        """Number of papers each node cites."""
+        return np.diff(self.out_indptr)
+
+    def in_degree(self):
+        """Number of papers citing each node."""
+        return np.diff(self.in_indptr)
+
+    def successors(self, node):
+        return self.out_indices[self.out_indptr[node]:self.out_indptr[node + 1]]
+
+    def predecessors(self, node):
+        return self.in_indices[self.in_indptr[node]:self.in_indptr[node + 1]]
+
+    def pagerank(self, damping=0.85, tol=1.0e-6, max_iter=100):
+        """
+        PageRank of every node by power iteration, as nx.pagerank computes it.
+
+        The rank of nodes without out-edges is spread uniformly over the graph.
+
+        Returns:
+            Float array of ranks summing to 1
+        """
+        n = self.node_count
+        if n == 0:
+            return np.empty(0)
+
+        out_degree = self.out_degree()
+        sources = np.repeat(np.arange(n), out_degree)
+        dangling = out_degree == 0
+        inv_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            spread = rank * inv_degree
+            new_rank = np.bincount(self.out_indices, weights=spread[sources], minlength=n)
+            new_rank = damping * (new_rank + rank[dangling].sum() / n) + (1.0 - damping) / n
+            error = np.abs(new_rank - rank).sum()
+            rank = new_rank
+            if error < n * tol:
+                break
+        return rank
+
+    def core_number(self):
+        """
+        Core number of every node, ignoring edge directions (degree = in + out), as nx.core_number.
+
+        Nodes are peeled level by level: at level k every node left with fewer
+        than k + 1 edges is removed together, and its neighbours lose the
+        edges it took with it.
+        """
+        n = self.node_count
+        degree = (self.out_degree() + self.in_degree()).astype(np.int64)
+        core = np.zeros(n, dtype=np.int64)
+        alive = np.ones(n, dtype=bool)
+
+        k = 0
+        remaining = n
+        while remaining:
+            peel = np.flatnonzero(alive & (degree <= k))
+            if len(peel) == 0:
+                k = int(degree[alive].min())
+                continue
+            core[peel] = k
+            alive[peel] = False
+            remaining -= len(peel)
+
+            neighbours = np.concatenate([
+                gather_csr(self.out_indptr, self.out_indices, peel),
+                gather_csr(self.in_indptr, self.in_indices, peel)
+            ])
+            neighbours = neighbours[alive[neighbours]]
+            degree -= np.bincount(neighbours, minlength=n)
+        return core
+
+    def bfs_distances(self, source, direction="out"):
+        """
+        Hop distance from `source` to every node.
+
+        Args:
+            source: Node index or paper ID to start from
+            direction: "out" follows references, "in" follows citations, "both" ignores directions
+
+        Returns:
+            Int array of distances, -1 for unreachable nodes
+        """
+        if direction not in ["out", "in", "both"]:
+            raise ValueError("Direction must be 'out', 'in' or 'both'")
+        if not isinstance(source, (int, np.integer)):
+            source = self.index_of(source)
+
+        distances = np.full(self.node_count, -1, dtype=np.int32)
+        distances[source] = 0
+        frontier = np.array([source])
+        depth = 0
+        while len(frontier):
+            depth += 1
+            reached = np.zeros(self.node_count, dtype=bool)
+            if direction in ["out", "both"]:
+                reached[gather_csr(self.out_indptr, self.out_indices, frontier)] = True
+            if direction in ["in", "both"]:
+                reached[gather_csr(self.in_indptr, self.in_indices, frontier)] = True
+            frontier = np.flatnonzero(reached & (distances < 0))
+            distances[frontier] = depth
+        return distances
+
+    def edges(self):
+        """Return the (sources, targets) int arrays of all edges."""
+        return np.repeat(np.arange(self.node_count), self.out_degree()), self.out_indices
+
+    def to_networkx(self):
+        """Build the equivalent networkx.DiGraph, with paper IDs as nodes and the paper fields as attributes."""
+        import networkx as nx
+
+        G = nx.DiGraph()
+        for paper_id in self.paper_ids:
+            paper = self.papers.get(paper_id)
+            if paper:
+                G.add_node(paper_id, title=paper["title"], year=paper["year"])
+            else:
+                G.add_node(paper_id)
+        sources, targets = self.edges()
+        G.add_edges_from(zip(
+            (self.paper_ids[i] for i in sources.tolist()),
+            (self.paper_ids[i] for i in targets.tolist())
+        ))
+        return G
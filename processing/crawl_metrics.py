@@ -0,0 +1,381 @@
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Metric names, shared by request_json, the response cache and the crawlers
+REQUESTS = "s2_requests_total"              # labels: method, status ("error" for connection errors)
+RETRIES = "s2_retries_total"                # labels: reason (throttled, server_error, connection_error, invalid_json)
+THROTTLED = "s2_throttled_total"
+RESPONSE_BYTES = "s2_response_bytes_total"
+REQUEST_SECONDS = "s2_request_seconds"      # histogram of HTTP round trips, labels: method
+WAIT_SECONDS = "s2_wait_seconds_total"      # labels: phase (breaker, rate_limit, backoff, http, parse)
+CACHE_LOOKUPS = "s2_cache_lookups_total"    # labels: result (hit, miss, expired)
+CACHE_BYTES = "s2_cache_bytes_written_total"
+PAPERS = "s2_papers_total"                  # labels: source, status (fetched, skipped, retried)
+FRONTIER = "s2_crawl_frontier"              # papers left on the current level
+DEPTH = "s2_crawl_depth"
+PAPERS_PER_SECOND = "s2_papers_per_second"
+
+class NullMetrics:
+    """
+    Metrics sink used while instrumentation is disabled.
+
+    Every method does nothing, so instrumented code only pays for a method
+    call. Code that needs extra work to compute a value, like timing a phase,
+    checks `enabled` first.
+    """
+
+    enabled = False
+    tracing = False
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def set_gauge(self, name, value, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def trace(self, span):
+        pass
+
+class CrawlMetrics:
+    """
+    In-process registry of counters, gauges and histograms, with optional request traces.
+
+    Metrics are identified by a name and keyword labels, as in Prometheus.
+    Updates take a lock, so the registry can be shared by the crawler's
+    threads. The registry can be read at any time as a JSON snapshot
+    (snapshot), in the Prometheus text format (to_prometheus) or as a
+    one-line summary of the crawl (progress_line).
+
+    When `trace_path` is given, every request attempt is also appended to it
+    as a JSON line with its URL, status and the time spent in each phase.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_path=None, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started = time.monotonic()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}  # key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        self._trace = None
+        if trace_path:
+            os.makedirs(os.path.dirname(trace_path) if os.path.dirname(trace_path) else '.', exist_ok=True)
+            self._trace = open(trace_path, "a", encoding="utf-8")
+        self._last_rate = (self.started, 0)
+
+    @property
+    def tracing(self):
+        return self._trace is not None
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+    def inc(self, name, value=1, **labels):
+        """Add `value` to a counter."""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to its current value."""
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        """Record a value, usually a duration in seconds, in a histogram."""
+        key = self._key(name, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(self.buckets) + 2)
+            histogram[index] += 1
+            histogram[-1] += value
+
+    def trace(self, span):
+        """Append a span, a JSON-serialisable dict, to the trace file if tracing is on."""
+        if self._trace is None:
+            return
+        line = json.dumps(span, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._trace.write(line)
+
+    def close(self):
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+    def total(self, name, **labels):
+        """Sum of a counter over every label set matching `labels`."""
+        wanted = {(key, str(value)) for key, value in labels.items()}
+        with self._lock:
+            return sum(value for (counter, key_labels), value in self.counters.items()
+                       if counter == name and wanted <= set(key_labels))
+
+    def gauge(self, name, default=None, combine=sum):
+        """Combine the values of a gauge over its label sets, or return `default` if it was never set."""
+        with self._lock:
+            values = [value for (gauge, _), value in self.gauges.items() if gauge == name]
+        return combine(values) if values else default
+
+    def quantile(self, name, q):
+        """Estimate a quantile of a histogram, merged over its label sets, from its buckets."""
+        with self._lock:
+            merged = [0] * (len(self.buckets) + 1)
+            for (histogram, _), counts in self.histograms.items():
+                if histogram == name:
+                    merged = [a + b for a, b in zip(merged, counts)]
+        count = sum(merged)
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(merged):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower  # Past the last bucket, only a lower bound is known
+                # Linear interpolation inside the bucket, as Prometheus' histogram_quantile
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def update_throughput(self):
+        """Set the papers/s gauge from the papers counted since the last call, and return it."""
+        now = time.monotonic()
+        papers = self.total(PAPERS, status="fetched")
+        since, papers_then = self._last_rate
+        rate = (papers - papers_then) / (now - since) if now > since else 0.0
+        self._last_rate = (now, papers)
+        self.set_gauge(PAPERS_PER_SECOND, round(rate, 2))
+        return rate
+
+    def snapshot(self):
+        """Return every metric as a JSON-serialisable dict."""
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            gauges = [{"name": name, "labels": dict(labels), "value": value}
+                      for (name, labels), value in sorted(self.gauges.items())]
+            histograms = []
+            for (name, labels), counts in sorted(self.histograms.items()):
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                histograms.append({"name": name, "labels": dict(labels), "buckets": buckets,
+                                   "count": cumulative, "sum": round(counts[-1], 6)})
+        return {
+            "timestamp": time.time(),
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": histograms
+        }
+
+    def to_prometheus(self):
+        """Return every metric in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        def labels_text(labels, extra=None):
+            labels = dict(labels, **(extra or {}))
+            if not labels:
+                return ""
+            escaped = (f'{key}="{_escape(value)}"' for key, value in labels.items())
+            return "{" + ",".join(escaped) + "}"
+
+        for metric in snapshot["counters"]:
+            declare(metric["name"], "counter")
+            lines.append(f"{metric['name']}{labels_text(metric['labels'])} {metric['value']}")
+        for metric in snapshot["gauges"]:
+            declare(metric["name"], "gauge")
+            lines.append(f"{metric['name']}{labels_text(metric['labels'])} {metric['value']}")
+        for metric in snapshot["histograms"]:
+            name = metric["name"]
+            declare(name, "histogram")
+            for bound, count in metric["buckets"].items():
+                lines.append(f"{name}_bucket{labels_text(metric['labels'], {'le': bound})} {count}")
+            lines.append(f"{name}_sum{labels_text(metric['labels'])} {metric['sum']}")
+            lines.append(f"{name}_count{labels_text(metric['labels'])} {metric['count']}")
+        return "\n".join(lines) + "\n"
+
+    def progress_line(self):
+        """One-line summary of the run: papers, throughput, frontier, requests and where the time went."""
+        elapsed = time.monotonic() - self.started
+        papers = self.total(PAPERS, status="fetched")
+        parts = [f"{elapsed:7.1f}s", f"{papers} papers ({self.update_throughput():.1f}/s)"]
+
+        frontier = self.gauge(FRONTIER)
+        if frontier is not None:
+            parts.append(f"frontier {frontier} at depth {self.gauge(DEPTH, 0, max)}")
+
+        requests = self.total(REQUESTS)
+        parts.append(f"{requests} requests, {self.total(RETRIES)} retries, {self.total(THROTTLED)} throttled")
+        p50, p99 = self.quantile(REQUEST_SECONDS, 0.5), self.quantile(REQUEST_SECONDS, 0.99)
+        if p50 is not None:
+            parts.append(f"p50 {p50 * 1000:.0f} ms, p99 {p99 * 1000:.0f} ms")
+
+        lookups = self.total(CACHE_LOOKUPS)
+        if lookups:
+            parts.append(f"cache {100 * self.total(CACHE_LOOKUPS, result='hit') / lookups:.0f}% hits")
+
+        waits = {phase: self.total(WAIT_SECONDS, phase=phase)
+                 for phase in ["rate_limit", "backoff", "breaker", "http", "parse"]}
+        spent = sum(waits.values())
+        if spent:
+            parts.append("time " + " ".join(f"{phase} {100 * seconds / spent:.0f}%"
+                                            for phase, seconds in waits.items() if seconds))
+        return " | ".join(parts)
+
+    def write_snapshot(self, path):
+        _write_atomic(path, json.dumps(self.snapshot(), indent=2))
+
+    def write_prometheus(self, path):
+        _write_atomic(path, self.to_prometheus())
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _write_atomic(path, text):
+    """Write a file next to its destination and swap it in, so scrapers never read half a file."""
+    os.makedirs(os.path.dirname(path) if os.path.dirname(path) else '.', exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+_shared_metrics = NullMetrics()
+
+def shared_metrics():
+    """Return the process-wide metrics registry, a NullMetrics unless enable_metrics was called."""
+    return _shared_metrics
+
+def enable_metrics(trace_path=None):
+    """Start collecting metrics in a fresh process-wide CrawlMetrics and return it."""
+    global _shared_metrics
+    _shared_metrics = CrawlMetrics(trace_path=trace_path)
+    return _shared_metrics
+
+def disable_metrics():
+    """Stop collecting metrics; the previous registry keeps its values."""
+    global _shared_metrics
+    if isinstance(_shared_metrics, CrawlMetrics):
+        _shared_metrics.close()
+    _shared_metrics = NullMetrics()
+
+class MetricsReporter:
+    """
+    Reports a CrawlMetrics registry every `interval` seconds from a background thread.
+
+    Each tick prints the progress line to `stream` (stderr by default, so it
+    does not mix with the data written to stdout) and rewrites the JSON
+    snapshot and Prometheus text file if their paths are given. A last report
+    is made and the trace file is closed when the reporter stops. Use it as a
+    context manager around a crawl.
+
+    Args:
+        metrics: CrawlMetrics to report
+        interval: Seconds between two reports
+        progress: Print the progress line
+        snapshot_path: Optional JSON snapshot file
+        prometheus_path: Optional Prometheus text file, e.g. for node_exporter's textfile collector
+        stream: Stream the progress line is printed to
+    """
+
+    def __init__(self, metrics, interval=5.0, progress=True, snapshot_path=None, prometheus_path=None, stream=None):
+        self.metrics = metrics
+        self.interval = interval
+        self.progress = progress
+        self.snapshot_path = snapshot_path
+        self.prometheus_path = prometheus_path
+        self.stream = stream or sys.stderr
+        self._stop = threading.Event()
+        self._thread = None
+
+    def report(self):
+        if self.progress:
+            print(f"[metrics] {self.metrics.progress_line()}", file=self.stream, flush=True)
+        if self.snapshot_path:
+            self.metrics.write_snapshot(self.snapshot_path)
+        if self.prometheus_path:
+            self.metrics.write_prometheus(self.prometheus_path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except OSError as e:
+                print(f"WARNING: Could not write metrics: {e}", file=self.stream)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the reporting thread, make a last report and close the trace file."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        try:
+            self.report()
+        finally:
+            self.metrics.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def add_metrics_arguments(parser):
+    """Add the --metrics-dir, --progress, --trace and --metrics-interval options to a command line parser."""
+    parser.add_argument("--metrics-dir", metavar="DIR",
+                        help="write metrics.json and metrics.prom to DIR during the run")
+    parser.add_argument("--progress", action="store_true", help="print a progress line to stderr during the run")
+    parser.add_argument("--trace", action="store_true",
+                        help="also record every request attempt in trace.jsonl (requires --metrics-dir)")
+    parser.add_argument("--metrics-interval", type=float, default=5.0,
+                        help="seconds between two metric reports (default: 5)")
+
+def reporter_from_args(args):
+    """
+    Enable metrics as asked by the add_metrics_arguments options.
+
+    Returns:
+        A MetricsReporter to run the instrumented code in, or None if metrics stay disabled
+    """
+    if not args.metrics_dir and not args.progress:
+        if args.trace:
+            print("WARNING: --trace requires --metrics-dir, not tracing")
+        return None
+    directory = args.metrics_dir
+    metrics = enable_metrics(os.path.join(directory, "trace.jsonl") if directory and args.trace else None)
+    return MetricsReporter(
+        metrics, interval=args.metrics_interval, progress=args.progress,
+        snapshot_path=os.path.join(directory, "metrics.json") if directory else None,
+        prometheus_path=os.path.join(directory, "metrics.prom") if directory else None
+    )
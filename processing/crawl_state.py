@@ -0,0 +1,259 @@
+import json
+import os
+from array import array
+
+JOURNAL_VERSION = 1
+
+class PaperIdTable:
+    """Interns paper IDs, mapping each hex ID to a dense int index and back."""
+
+    def __init__(self):
+        self._index = {}
+        self.paper_ids = []
+
+    def __len__(self):
+        return len(self.paper_ids)
+
+    def __contains__(self, paper_id):
+        return paper_id in self._index
+
+    def __getitem__(self, index):
+        return self.paper_ids[index]
+
+    def get(self, paper_id):
+        """Return the index of an interned ID, or None."""
+        return self._index.get(paper_id)
+
+    def intern(self, paper_id):
+        """Return the index of a paper ID, assigning the next free one if it is new."""
+        index = self._index.get(paper_id)
+        if index is None:
+            index = len(self.paper_ids)
+            self._index[paper_id] = index
+            self.paper_ids.append(paper_id)
+        return index
+
+class CrawlState:
+    """
+    BFS state of a citation crawl: the partial network, the current level and the visited set.
+
+    Papers of the current level are consumed in order with add_paper,
+    skip_paper or requeue_paper, which moves a paper that could not be
+    fetched for now to the end of its level. Once the last one is consumed,
+    the papers they linked to become the next level. Replaying the same sequence of calls always gives
+    the same state, which is what makes journaled crawls resumable.
+
+    Paper IDs are interned to int indexes as they are discovered, so the
+    visited set is the ID table itself. Levels and edges are kept in
+    array('i') buffers, and paper fields in tuples. The usual
+    {"papers", "connections"} dictionaries are only built by to_network().
+    """
+
+    PAPER_FIELDS = ("title", "authors", "year", "venue", "url")
+
+    def __init__(self, root_paper_id, max_depth, direction):
+        if direction not in ["references", "citations"]:
+            raise ValueError("Direction must be 'references' or 'citations'")
+
+        self.root_paper_id = root_paper_id
+        self.max_depth = max_depth
+        self.direction = direction
+        self.ids = PaperIdTable()
+        self.papers = {}  # index -> tuple of PAPER_FIELDS, in processing order
+        self.edge_sources = array("i")
+        self.edge_targets = array("i")
+        self.depth = 0
+        self.level = array("i", [self.ids.intern(root_paper_id)])
+        self.position = 0
+        self.next_level = array("i")
+        self.retries = {}  # index -> times requeued since the state was built or resumed
+
+    @classmethod
+    def from_journal(cls, journal_path):
+        """Rebuild the state of a crawl by replaying its journal."""
+        header, records = CrawlJournal.read(journal_path)
+        state = cls(header["root"], header["max_depth"], header["direction"])
+
+        for record in records:
+            if state.finished or record["id"] != state.ids[state.level[state.position]]:
+                raise ValueError(f"Journal {journal_path} does not match the crawl it describes")
+            if record["type"] == "paper":
+                state.add_paper(record["id"], record["paper"], record["links"])
+            elif record["type"] == "retry":
+                state.requeue_paper(record["id"])
+            else:
+                state.skip_paper(record["id"])
+
+        # Retries are counted per run, a resumed crawl gets a fresh budget
+        state.retries.clear()
+        return state
+
+    @property
+    def finished(self):
+        return not self.level
+
+    @property
+    def paper_count(self):
+        return len(self.papers)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_sources)
+
+    def pending(self, limit=None):
+        """Return the IDs of the papers of the current level that have not been processed yet."""
+        stop = len(self.level) if limit is None else min(len(self.level), self.position + limit)
+        return [self.ids[index] for index in self.level[self.position:stop]]
+
+    def add_paper(self, paper_id, paper, linked_ids):
+        """Store the next paper of the level and queue the papers it links to."""
+        index = self.level[self.position]
+        self.papers[index] = (
+            paper["title"], tuple(paper["authors"]), paper["year"], paper["venue"], paper["url"]
+        )
+
+        # Edges point from the citing paper to the cited one
+        if self.direction == "references":
+            own, other = self.edge_sources, self.edge_targets
+        else:  # citations
+            own, other = self.edge_targets, self.edge_sources
+
+        for connected_id in linked_ids:
+            known = len(self.ids)
+            connected = self.ids.intern(connected_id)
+            own.append(index)
+            other.append(connected)
+
+            # Papers seen for the first time go to the next level
+            if connected == known:
+                self.next_level.append(connected)
+
+        self._advance()
+
+    def skip_paper(self, paper_id):
+        """Move past the next paper of the level without storing it."""
+        self._advance()
+
+    def requeue_paper(self, paper_id):
+        """Move the next paper of the level to the end of the level, to be fetched again."""
+        index = self.level[self.position]
+        self.level.append(index)
+        self.retries[index] = self.retries.get(index, 0) + 1
+        self._advance()
+
+    def _advance(self):
+        self.position += 1
+        if self.position == len(self.level):
+            self.level = self.next_level
+            self.next_level = array("i")
+            self.position = 0
+            self.depth += 1
+
+    def to_network(self):
+        """Export the crawl as the {"papers", "connections"} dictionary used by the save and plot helpers."""
+        paper_ids = self.ids.paper_ids
+        papers = {}
+        for index, fields in self.papers.items():
+            paper = dict(zip(self.PAPER_FIELDS, fields))
+            paper["authors"] = list(paper["authors"])
+            papers[paper_ids[index]] = paper
+
+        connections = [
+            {"source": paper_ids[source], "target": paper_ids[target]}
+            for source, target in zip(self.edge_sources, self.edge_targets)
+        ]
+        return {
+            "papers": papers,
+            "connections": connections
+        }
+
+class CrawlJournal:
+    """
+    Append-only journal of a crawl, one JSON record per line.
+
+    The first line describes the crawl (root paper, depth and direction), and
+    every following line records one processed paper in crawl order: its
+    stored fields and the IDs it links to, the fact that it was skipped
+    because it does not exist, or a retry when fetching it failed.
+    A torn last line left behind by a crash is ignored when reading.
+    """
+
+    def __init__(self, path, sync_every=100):
+        self.path = path
+        self.sync_every = sync_every
+        self._unsynced = 0
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def create(cls, path, root_paper_id, max_depth, direction):
+        """Start the journal of a new crawl. Refuses to overwrite an existing journal."""
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            raise FileExistsError(f"Journal {path} already exists, resume it instead of starting over")
+        os.makedirs(os.path.dirname(path) if os.path.dirname(path) else '.', exist_ok=True)
+
+        journal = cls(path)
+        journal._append({
+            "type": "crawl",
+            "version": JOURNAL_VERSION,
+            "root": root_paper_id,
+            "max_depth": max_depth,
+            "direction": direction
+        })
+        journal.sync()
+        return journal
+
+    @classmethod
+    def reopen(cls, path):
+        """Open the journal of an interrupted crawl for appending, dropping a torn last line."""
+        with open(path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+        return cls(path)
+
+    @staticmethod
+    def read(path):
+        """Return the crawl header and the list of paper records of a journal."""
+        header = None
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Torn write at the end of the journal
+                record = json.loads(line)
+                if header is None:
+                    header = record
+                else:
+                    records.append(record)
+
+        if not header or header.get("type") != "crawl":
+            raise ValueError(f"{path} is not a crawl journal")
+        if header.get("version") != JOURNAL_VERSION:
+            raise ValueError(f"Unsupported journal version {header.get('version')} in {path}")
+        return header, records
+
+    def record_paper(self, paper_id, paper, linked_ids):
+        self._append({"type": "paper", "id": paper_id, "paper": paper, "links": linked_ids})
+
+    def record_skip(self, paper_id):
+        self._append({"type": "skip", "id": paper_id})
+
+    def record_retry(self, paper_id):
+        self._append({"type": "retry", "id": paper_id})
+
+    def _append(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """Flush buffered records and make them durable on disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        self.sync()
+        self._file.close()
@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+
+from response_cache import ResponseCache
+from crawl_metrics import add_metrics_arguments, reporter_from_args
+from paper_store import PaperStore
+from network_citations import SemanticScholarClient, save_to_csv
+from build_subfield_bundles import SUBFIELDS_DIR, build_bundle
+
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "subfields_manifest.json")
+
+def load_manifest(path=MANIFEST_FILE, names=None):
+    """
+    Read the subfield crawl manifest.
+
+    Each entry gives the subfield directory name, the root paper ID, the crawl
+    depth and the direction ("references" or "citations"), as asked by
+    network_citations.main().
+
+    Args:
+        path: JSON manifest file
+        names: Only keep these subfields (default: all)
+
+    Returns:
+        List of manifest entries
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if names:
+        unknown = set(names) - {entry["name"] for entry in manifest}
+        if unknown:
+            raise ValueError(f"Subfields not in the manifest: {', '.join(sorted(unknown))}")
+        manifest = [entry for entry in manifest if entry["name"] in names]
+    return manifest
+
+def save_subfield(network_data, directory):
+    """
+    Write papers.csv and connections.csv of a subfield.
+
+    Both files are written next to the old ones first and swapped in once
+    complete, so an interrupted refresh never leaves a half-written dataset.
+    """
+    prefix = os.path.join(directory, "crawl")
+    save_to_csv(network_data, prefix)
+    os.replace(f"{prefix}_papers.csv", os.path.join(directory, "papers.csv"))
+    os.replace(f"{prefix}_connections.csv", os.path.join(directory, "connections.csv"))
+
+def save_bundle(network_data, directory):
+    """Write the bundle.json of a subfield, swapped in once complete like the CSV files."""
+    temporary = os.path.join(directory, "crawl_bundle.json")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(build_bundle(network_data), f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary, os.path.join(directory, "bundle.json"))
+
+def crawl_subfields(manifest, subfields_dir=SUBFIELDS_DIR, max_concurrency=8, bundles=True, cache=None, store=None):
+    """
+    Crawl every subfield of the manifest in one scheduled run.
+
+    The crawls share one client, hence one connection pool, rate limiter and
+    response cache, and are advanced together by build_citation_networks so
+    that papers reached from several roots are fetched once.
+
+    Args:
+        manifest: Entries from load_manifest
+        subfields_dir: Directory holding one directory per subfield
+        max_concurrency: Number of requests kept in flight
+        bundles: Also rebuild the bundle.json read by the website
+        cache: Optional ResponseCache
+        store: Optional PaperStore the networks are also upserted into, one dataset per subfield
+
+    Returns:
+        Dictionary mapping each subfield name to its network data
+    """
+    client = SemanticScholarClient(max_retries=20, timeout=15, cache=cache)
+    networks = client.build_citation_networks(
+        [(entry["root"], entry["depth"], entry["direction"]) for entry in manifest],
+        max_concurrency=max_concurrency
+    )
+
+    for entry, network_data in zip(manifest, networks):
+        name = entry["name"]
+        if not network_data["papers"]:
+            print(f"WARNING: No papers for subfield {name}, keeping the previous data.")
+            continue
+
+        directory = os.path.join(subfields_dir, name)
+        os.makedirs(directory, exist_ok=True)
+        save_subfield(network_data, directory)
+        if bundles:
+            save_bundle(network_data, directory)
+        if store:
+            store.upsert_network(network_data, f"subfields/{name}")
+        print(f"{name}: {len(network_data['papers'])} papers, {len(network_data['connections'])} connections")
+
+    return dict(zip([entry["name"] for entry in manifest], networks))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the citation networks of all subfields in one run.")
+    parser.add_argument("names", nargs="*", help="subfields to crawl (default: every subfield of the manifest)")
+    parser.add_argument("--manifest", default=MANIFEST_FILE, help="JSON manifest of root papers, depths and directions")
+    parser.add_argument("--subfields-dir", default=SUBFIELDS_DIR, help="directory holding one directory per subfield")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of requests kept in flight (default: 8)")
+    parser.add_argument("--no-bundles", action="store_true", help="do not rebuild the website bundles")
+    parser.add_argument("--store", metavar="SQLITE", help="also upsert the crawled papers into this paper store")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest, args.names)
+    reporter = reporter_from_args(args)
+    if reporter:
+        reporter.start()
+    store = PaperStore(args.store) if args.store else None
+    try:
+        crawl_subfields(manifest, args.subfields_dir, args.concurrency, not args.no_bundles,
+                        ResponseCache.from_env(), store)
+    finally:
+        if reporter:
+            reporter.stop()
+        if store:
+            store.close()
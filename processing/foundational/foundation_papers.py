@@ -1,8 +1,30 @@
 import requests
 import json
-import time
+import os
+import re
+import sys
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
 from tqdm import tqdm
 
+# Shared helpers live in the parent processing/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from response_cache import ResponseCache, CacheMiss
+from rate_limit import API_BASE, request_json, shared_limiter
+from network_citations import SemanticScholarClient
+
+SEARCH_URL = f"{API_BASE}/paper/search"
+PAPER_FIELDS = "paperId,title,year,citationCount,fieldsOfStudy,authors"
+ID_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "foundational_ids.json")
+
+# A candidate matches if its normalised title is this similar to the curated one...
+MIN_SIMILARITY = 0.85
+# ...and it was published at most this many years apart, when both years are known
+MAX_YEAR_DISTANCE = 5
+YEAR_PENALTY = 0.02  # Score lost per year of distance
+UNKNOWN_YEAR_PENALTY = 0.05
+
 # Handpicked foundational CS papers with known publication years and summaries
 foundation_papers = [
     {
@@ -67,42 +89,123 @@ foundation_papers = [
     }
 ]
 
-def fetch_foundation_papers(papers):
-    base_url = "https://api.semanticscholar.org/graph/v1/paper/search"
-    fields = "paperId,title,year,citationCount,fieldsOfStudy,authors"
-    headers = {
-        "User-Agent": "FoundationalPaperFetcher/1.0"
+def normalize_title(title):
+    """Lowercase a title and strip its accents, punctuation and extra whitespace."""
+    title = unicodedata.normalize("NFKD", title or "")
+    title = "".join(c for c in title if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", title).split())
+
+def score_candidate(paper, candidate):
+    """
+    Score a search result against a curated paper, or return None if it cannot be the same paper.
+
+    The score is the similarity of the normalised titles, minus a penalty
+    growing with the distance between publication years. A result without a
+    year is kept with a small fixed penalty.
+    """
+    similarity = SequenceMatcher(None, normalize_title(paper["title"]),
+                                 normalize_title(candidate.get("title"))).ratio()
+    if similarity < MIN_SIMILARITY:
+        return None
+    if paper.get("year") is None or candidate.get("year") is None:
+        return similarity - UNKNOWN_YEAR_PENALTY
+    distance = abs(candidate["year"] - paper["year"])
+    if distance > MAX_YEAR_DISTANCE:
+        return None
+    return similarity - YEAR_PENALTY * distance
+
+def best_match(paper, candidates):
+    """Best scoring candidate, ties broken by citation count then paper ID so that the choice is deterministic."""
+    scored = [
+        (score, candidate.get("citationCount") or 0, candidate["paperId"])
+        for candidate in candidates
+        if candidate.get("paperId") and (score := score_candidate(paper, candidate)) is not None
+    ]
+    if not scored:
+        return None
+    return min(scored, key=lambda item: (-item[0], -item[1], item[2]))[2]
+
+def _id_key(paper):
+    return f"{normalize_title(paper['title'])}|{paper.get('year')}"
+
+def load_id_cache(path=ID_CACHE_PATH):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_id_cache(ids, path=ID_CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(ids, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+def search_paper(session, paper, cache=None, limiter=None):
+    """Search Semantic Scholar for a curated paper and return the ID of the best match, or None."""
+    params = {
+        "query": paper["title"],
+        "fields": "paperId,title,year,citationCount",
+        "limit": 10
     }
+    try:
+        data = request_json(session, "GET", SEARCH_URL, params=params,
+                            headers={"User-Agent": "FoundationalPaperFetcher/1.0"},
+                            limiter=limiter, max_retries=5, cache=cache)
+    except CacheMiss:
+        print(f"Not cached, skipping in cache-only mode: {paper['title']}")
+        return None
 
-    enriched = []
+    if data is None:
+        print(f"Failed to fetch: {paper['title']}")
+        return None
+    return best_match(paper, data.get("data", []))
+
+def resolve_paper_ids(papers, cache=None, limiter=None, max_workers=8, id_cache_path=ID_CACHE_PATH):
+    """
+    Find the Semantic Scholar ID of every curated paper.
+
+    Titles already resolved by an earlier run are read from the local ID
+    cache; the others are searched concurrently, all workers sharing one
+    session and the rate limiter.
+
+    Returns:
+        List with one paper ID, or None if no result matched, per paper
+    """
+    limiter = limiter or shared_limiter()
+    ids = load_id_cache(id_cache_path) if id_cache_path else {}
+    todo = [paper for paper in papers if _id_key(paper) not in ids]
+
+    if todo:
+        session = requests.Session()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            found = list(tqdm(
+                executor.map(lambda paper: search_paper(session, paper, cache, limiter), todo),
+                total=len(todo), desc="Matching titles"
+            ))
+        for paper, paper_id in zip(todo, found):
+            # Misses are not cached, so they are searched again on the next run
+            if paper_id:
+                ids[_id_key(paper)] = paper_id
+        if id_cache_path:
+            save_id_cache(ids, id_cache_path)
 
-    for paper in tqdm(papers):
-        params = {
-            "query": paper["title"],
-            "fields": fields,
-            "limit": 10
-        }
-
-        success = False
-        retries = 0
-        while not success and retries < 5:
-            try:
-                response = requests.get(base_url, params=params, headers=headers)
-                response.raise_for_status()
-                success = True
-            except requests.exceptions.RequestException as e:
-                wait = 2 ** retries
-                print(f"Retry in {wait}s for '{paper['title']}': {e}")
-                time.sleep(wait)
-                retries += 1
-
-        if not success:
-            print(f"Failed to fetch: {paper['title']}")
-            continue
-
-        results = response.json().get("data", [])
-        match = next((r for r in results if abs(r.get("year") - paper["year"]) < 5), None)
+    return [ids.get(_id_key(paper)) for paper in papers]
 
+def fetch_foundation_papers(papers, cache=None, limiter=None, max_workers=8, id_cache_path=ID_CACHE_PATH):
+    """
+    Enrich the curated papers with their Semantic Scholar metadata and citation counts.
+
+    Titles are matched concurrently (see resolve_paper_ids), then the matched
+    papers are fetched together through /paper/batch, so refreshing the
+    citation counts of a resolved list costs a single request.
+    """
+    paper_ids = resolve_paper_ids(papers, cache, limiter, max_workers, id_cache_path)
+
+    client = SemanticScholarClient(max_retries=5, cache=cache, limiter=limiter)
+    details = client.fetch_papers_batch(sorted({p for p in paper_ids if p}), fields=PAPER_FIELDS)
+
+    enriched = []
+    for paper, paper_id in zip(papers, paper_ids):
+        match = details.get(paper_id) if paper_id else None
         if match:
             enriched.append({
                 "title": match.get("title", paper["title"]),
@@ -111,19 +214,17 @@ def fetch_foundation_papers(papers):
                 "citationCount": match.get("citationCount", 0),
                 "authors": [a["name"] for a in match.get("authors", [])],
                 "fieldsOfStudy": match.get("fieldsOfStudy", []),
-                "paperId": match.get("paperId")
+                "paperId": match.get("paperId", paper_id)
             })
         else:
-            print(f"No year-matching result for '{paper['title']}' ({paper['year']})")
-
-        time.sleep(1)  
+            print(f"No matching result for '{paper['title']}' ({paper.get('year')})")
 
     return enriched
 
 if __name__ == "__main__":
-    results = fetch_foundation_papers(foundation_papers)
+    results = fetch_foundation_papers(foundation_papers, cache=ResponseCache.from_env())
 
     with open("foundational_papers.json", "w") as f:
         json.dump(results, f, indent=2)
 
-    print(f"\nEnriched data saved: {len(results)} papers → foundational_papers_enriched.json")
+    print(f"\nEnriched data saved: {len(results)} papers → foundational_papers.json")
\ No newline at end of file
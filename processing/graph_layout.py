@@ -0,0 +1,236 @@
+import hashlib
+import os
+
+import numpy as np
+
+LAYOUT_VERSION = 1
+DEFAULT_LAYOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "layouts")
+
+def _grid_repulsion(pos, mass, k, cells_per_side, chunk_size=512):
+    """
+    Approximate repulsive forces, Barnes-Hut style, on a uniform grid.
+
+    Nodes are binned into cells summarised by their total mass and centre of
+    mass. A node is pushed away from the centres of its own cell (without
+    itself) and of the 8 cells around it. The push from every farther cell is
+    computed once for the centre of the node's cell and shared by all the
+    nodes in it, so a step costs O(n + cells^2) instead of O(n^2).
+    """
+    low = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - low).max()), 1e-9)
+    cell_xy = np.minimum((pos - low) / span * cells_per_side, cells_per_side - 1).astype(np.int64)
+    cell = cell_xy[:, 0] * cells_per_side + cell_xy[:, 1]
+
+    cell_count = cells_per_side * cells_per_side
+    cell_mass = np.bincount(cell, weights=mass, minlength=cell_count)
+    cell_sum = np.stack([
+        np.bincount(cell, weights=mass * pos[:, 0], minlength=cell_count),
+        np.bincount(cell, weights=mass * pos[:, 1], minlength=cell_count)
+    ], axis=1)
+    centres = cell_sum / np.maximum(cell_mass, 1e-12)[:, None]
+
+    # Far field, between the occupied cells that are not neighbours
+    occupied = np.flatnonzero(cell_mass > 0)
+    occupied_xy = np.stack([occupied // cells_per_side, occupied % cells_per_side], axis=1)
+    far = np.zeros((cell_count, 2))
+    for start in range(0, len(occupied), chunk_size):
+        rows = occupied[start:start + chunk_size]
+        delta = centres[rows, None, :] - centres[None, occupied, :]
+        weight = cell_mass[None, occupied] / np.maximum((delta ** 2).sum(axis=2), 1e-4)
+        near = np.abs(occupied_xy[start:start + chunk_size, None, :] - occupied_xy[None, :, :]).max(axis=2) <= 1
+        weight[near] = 0.0
+        far[rows] = (delta * weight[:, :, None]).sum(axis=1)
+    force = far[cell]
+
+    # Near field, from the node's own cell without the node itself and the cells around it
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            x = cell_xy[:, 0] + dx
+            y = cell_xy[:, 1] + dy
+            inside = (x >= 0) & (x < cells_per_side) & (y >= 0) & (y < cells_per_side)
+            other = np.where(inside, x * cells_per_side + y, 0)
+            other_mass = np.where(inside, cell_mass[other], 0.0)
+            other_sum = cell_sum[other]
+            if dx == 0 and dy == 0:
+                other_mass = other_mass - mass
+                other_sum = other_sum - mass[:, None] * pos
+            centre = other_sum / np.maximum(other_mass, 1e-12)[:, None]
+            delta = pos - centre
+            weight = np.maximum(other_mass, 0.0) / np.maximum((delta ** 2).sum(axis=1), 1e-4)
+            force += delta * weight[:, None]
+    return force * (k * k) * mass[:, None]
+
+def _force_directed(pos, mass, sources, targets, weights, iterations, gravity=0.05, max_cells_per_side=32):
+    """Refine positions with Fruchterman-Reingold forces (ideal edge length 1), cooling linearly."""
+    n = len(pos)
+    if n < 2:
+        return pos
+    k = 1.0
+    cells_per_side = int(min(max_cells_per_side, max(1, np.sqrt(n) / 2)))
+    temperature = 0.1 * np.sqrt(mass.sum())
+
+    for i in range(iterations):
+        force = _grid_repulsion(pos, mass, k, cells_per_side)
+
+        # Springs pull linked nodes together with a force of d^2 / k
+        delta = pos[targets] - pos[sources]
+        distance = np.sqrt((delta ** 2).sum(axis=1))
+        pull = delta * (weights * distance / k)[:, None]
+        for axis in range(2):
+            force[:, axis] += np.bincount(sources, weights=pull[:, axis], minlength=n)
+            force[:, axis] -= np.bincount(targets, weights=pull[:, axis], minlength=n)
+
+        # Weak gravity keeps disconnected components in view
+        force -= gravity * mass[:, None] * (pos - pos.mean(axis=0))
+
+        length = np.sqrt((force ** 2).sum(axis=1))
+        step = temperature * (1 - i / iterations)
+        pos = pos + force * (np.minimum(length, step) / np.maximum(length, 1e-12))[:, None]
+    return pos
+
+def _coarsen(n, sources, targets, weights, mass, rng):
+    """
+    Merge every node with a random neighbour.
+
+    Each node proposes to one of its neighbours and joins the cluster of
+    the smaller of the two indexes.
+
+    Returns:
+        (labels mapping nodes to coarse nodes, coarse node count, coarse edges, coarse weights, coarse mass)
+    """
+    both_sources = np.concatenate([sources, targets])
+    both_targets = np.concatenate([targets, sources])
+    # Random priorities pick one neighbour per node
+    order = np.lexsort((rng.random(len(both_sources)), both_sources))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = both_sources[order][1:] != both_sources[order][:-1]
+    chosen = order[first]
+
+    parent = np.arange(n)
+    parent[both_sources[chosen]] = np.minimum(both_sources[chosen], both_targets[chosen])
+    # Follow one more hop so that chains collapse onto the same representative
+    parent = parent[parent]
+    representatives, labels = np.unique(parent, return_inverse=True)
+    coarse_n = len(representatives)
+
+    coarse_sources = labels[sources]
+    coarse_targets = labels[targets]
+    keep = coarse_sources != coarse_targets
+    low = np.minimum(coarse_sources[keep], coarse_targets[keep])
+    high = np.maximum(coarse_sources[keep], coarse_targets[keep])
+    keys, inverse = np.unique(low * coarse_n + high, return_inverse=True)
+    coarse_weights = np.bincount(inverse.ravel(), weights=weights[keep], minlength=len(keys))
+    coarse_mass = np.bincount(labels, weights=mass, minlength=coarse_n)
+    return labels, coarse_n, keys // coarse_n, keys % coarse_n, coarse_weights, coarse_mass
+
+def compute_layout(n, sources, targets, iterations=60, refine_iterations=20, seed=0, min_nodes=50):
+    """
+    Multilevel force-directed layout of a graph.
+
+    The graph is coarsened by repeatedly merging neighbouring nodes until it
+    has fewer than `min_nodes` nodes. The coarsest graph is laid out with
+    `iterations` force-directed steps, then every level is placed at the
+    position of its coarse node and refined with `refine_iterations` steps.
+    Repulsion uses a grid approximation, so one step costs O(n + cells^2)
+    instead of O(n^2). Edge directions are ignored.
+
+    Args:
+        n: Number of nodes
+        sources: Int array of edge sources
+        targets: Int array of edge targets
+        iterations: Force-directed steps on the coarsest graph
+        refine_iterations: Force-directed steps on each finer level
+        seed: Random seed, the same seed always gives the same layout
+        min_nodes: Size below which the graph is no longer coarsened
+
+    Returns:
+        Float array of shape (n, 2), centred and scaled to [-1, 1]
+    """
+    rng = np.random.default_rng(seed)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+    weights = np.ones(len(sources))
+    mass = np.ones(n)
+
+    levels = []
+    current_n = n
+    while current_n > min_nodes and len(sources):
+        labels, coarse_n, coarse_sources, coarse_targets, coarse_weights, coarse_mass = _coarsen(
+            current_n, sources, targets, weights, mass, rng
+        )
+        if coarse_n > 0.9 * current_n:
+            break
+        levels.append((labels, current_n, sources, targets, weights, mass))
+        current_n, sources, targets, weights, mass = coarse_n, coarse_sources, coarse_targets, coarse_weights, coarse_mass
+
+    pos = rng.random((current_n, 2)) * np.sqrt(current_n)
+    pos = _force_directed(pos, mass, sources, targets, weights, iterations)
+
+    for labels, fine_n, sources, targets, weights, mass in reversed(levels):
+        # Finer levels take up more room, spread the coarse positions accordingly
+        pos = pos[labels] * np.sqrt(fine_n / len(pos)) + rng.normal(scale=0.1, size=(fine_n, 2))
+        pos = _force_directed(pos, mass, sources, targets, weights, refine_iterations)
+
+    if n == 0:
+        return np.empty((0, 2))
+    pos = pos - (pos.max(axis=0) + pos.min(axis=0)) / 2
+    return pos / max(float(np.abs(pos).max()), 1e-12)
+
+def graph_hash(n, sources, targets, **params):
+    """Content hash of a graph and the layout parameters, independent of the edge order."""
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    keys = np.unique(np.minimum(sources, targets) * max(n, 1) + np.maximum(sources, targets))
+    digest = hashlib.sha256()
+    digest.update(repr((LAYOUT_VERSION, n, sorted(params.items()))).encode("utf-8"))
+    digest.update(keys.astype("<i8").tobytes())
+    return digest.hexdigest()
+
+def cached_layout(n, sources, targets, cache_dir=DEFAULT_LAYOUT_DIR, **params):
+    """
+    Return compute_layout(n, sources, targets, **params), reusing the positions saved by an earlier call.
+
+    Layouts are stored as .npy files named after graph_hash(). Pass
+    cache_dir=None to always recompute.
+    """
+    if cache_dir is None:
+        return compute_layout(n, sources, targets, **params)
+
+    path = os.path.join(cache_dir, f"{graph_hash(n, sources, targets, **params)}.npy")
+    if os.path.exists(path):
+        return np.load(path)
+
+    pos = compute_layout(n, sources, targets, **params)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, pos)
+    os.replace(tmp_path, path)
+    return pos
+
+def networkx_layout(G, **params):
+    """Cached layout of a networkx graph, as the {node: (x, y)} dictionary expected by nx.draw_*."""
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+    pos = cached_layout(len(nodes), edges[:, 0], edges[:, 1], **params)
+    return {node: pos[i] for i, node in enumerate(nodes)}
+
+def add_layout(network_data, **params):
+    """
+    Store layout positions as "x" and "y" in every paper of the network dictionary.
+
+    The layout covers the crawled papers and the edges between them, so the
+    exported coordinates match what is drawn.
+    """
+    from citation_graph import CitationGraph
+
+    graph = CitationGraph.from_network(network_data, crawled_only=True)
+    sources, targets = graph.edges()
+    pos = cached_layout(graph.node_count, sources, targets, **params)
+    for paper_id, (x, y) in zip(graph.paper_ids, pos.tolist()):
+        network_data["papers"][paper_id]["x"] = round(x, 5)
+        network_data["papers"][paper_id]["y"] = round(y, 5)
+    return network_data
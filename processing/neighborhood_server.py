@@ -0,0 +1,423 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from citation_graph import CitationGraph, compress_csr, gather_csr
+from prune_network import top_k
+
+MAX_HOPS = 3
+MAX_NODES = 2000
+# Responses smaller than this are sent as they are, gzip would barely shrink them
+MIN_GZIP_BYTES = 1024
+# Endpoints whose answers only depend on the query, so they are cached here and by clients
+CACHED_PATHS = ["/neighborhood", "/ego"]
+
+class NeighborhoodIndex:
+    """
+    Read-only in-memory indexes answering the neighborhood queries of the server.
+
+    The citation graph is a CitationGraph (CSR out-edges and CSC in-edges),
+    and authorship is kept as two more CSR structures, author -> papers and
+    paper -> authors, so a query only touches the nodes it returns. Paper
+    fields are kept in lists indexed by node, and authors are looked up by
+    case-insensitive name.
+    """
+
+    def __init__(self, network_data):
+        """
+        Args:
+            network_data: Dictionary with papers and connections, e.g. from read_network_csv
+        """
+        self.graph = CitationGraph.from_network(network_data)
+        n = self.graph.node_count
+        papers = network_data["papers"]
+        fields = [papers.get(paper_id) or {} for paper_id in self.graph.paper_ids]
+        self.titles = [paper.get("title") for paper in fields]
+        self.years = [paper.get("year") for paper in fields]
+        self.venues = [paper.get("venue") or None for paper in fields]
+        self.urls = [paper.get("url") for paper in fields]
+        self.in_degree = self.graph.in_degree()
+        self.out_degree = self.graph.out_degree()
+        self.degree = self.in_degree + self.out_degree
+        if n:
+            self.graph.index_of(self.graph.paper_ids[0])  # Builds the ID lookup once, before serving
+
+        self.author_names = []
+        self._author_index = {}
+        author_keys = []
+        paper_keys = []
+        for node, paper in enumerate(fields):
+            for name in dict.fromkeys(paper.get("authors") or []):
+                key = name.lower()
+                author = self._author_index.get(key)
+                if author is None:
+                    author = self._author_index[key] = len(self.author_names)
+                    self.author_names.append(name)
+                author_keys.append(author)
+                paper_keys.append(node)
+        author_keys = np.array(author_keys, dtype=np.int64)
+        paper_keys = np.array(paper_keys, dtype=np.int64)
+        self.author_indptr, self.author_papers = compress_csr(author_keys, paper_keys, len(self.author_names))
+        self.paper_indptr, self.paper_authors = compress_csr(paper_keys, author_keys, n)
+
+    @classmethod
+    def from_subfields(cls, subfields_dir):
+        """Merge the papers.csv/connections.csv crawls of every subfield into one index."""
+        from network_citations import read_network_csv
+
+        network_data = {"papers": {}, "connections": []}
+        for name in sorted(os.listdir(subfields_dir)):
+            directory = os.path.join(subfields_dir, name)
+            if not os.path.exists(os.path.join(directory, "papers.csv")):
+                continue
+            subfield = read_network_csv(os.path.join(directory, "papers.csv"), os.path.join(directory, "connections.csv"))
+            network_data["papers"].update(subfield["papers"])
+            network_data["connections"].extend(subfield["connections"])
+        return cls(network_data)
+
+    @classmethod
+    def from_store(cls, path):
+        """Build the index of everything in a paper store."""
+        from paper_store import PaperStore
+
+        with PaperStore(path) as store:
+            return cls(store.to_network())
+
+    def stats(self):
+        return {
+            "papers": self.graph.node_count,
+            "connections": self.graph.edge_count,
+            "authors": len(self.author_names)
+        }
+
+    def neighborhood(self, paper_id, hops=1, limit=100, direction="both"):
+        """
+        The `limit` most connected papers within `hops` citations of a paper, and the citations between them.
+
+        Args:
+            paper_id: Center paper
+            hops: Maximum hop distance from the center
+            limit: Maximum number of papers returned, the center included
+            direction: "out" follows references, "in" follows citations, "both" ignores directions
+
+        Returns:
+            Dictionary in the columnar layout of the subfield bundles: paper
+            fields as parallel lists, the center first, and the citations as a
+            flat list of (citing, cited) index pairs. None if the paper is unknown.
+        """
+        if direction not in ["out", "in", "both"]:
+            raise ValueError("Direction must be 'out', 'in' or 'both'")
+        try:
+            center = self.graph.index_of(paper_id)
+        except KeyError:
+            return None
+
+        graph = self.graph
+        visited = np.zeros(graph.node_count, dtype=bool)
+        visited[center] = True
+        frontier = np.array([center])
+        found = []
+        found_hops = []
+        for hop in range(1, hops + 1):
+            reached = []
+            if direction in ["out", "both"]:
+                reached.append(gather_csr(graph.out_indptr, graph.out_indices, frontier))
+            if direction in ["in", "both"]:
+                reached.append(gather_csr(graph.in_indptr, graph.in_indices, frontier))
+            frontier = np.unique(np.concatenate(reached))
+            frontier = frontier[~visited[frontier]]
+            if not len(frontier):
+                break
+            visited[frontier] = True
+            found.append(frontier)
+            found_hops.append(np.full(len(frontier), hop, dtype=np.int32))
+
+        candidates = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        candidate_hops = np.concatenate(found_hops) if found_hops else np.empty(0, dtype=np.int32)
+        total = len(candidates) + 1
+        if len(candidates) > limit - 1:
+            # Most connected first, the closest breaking ties
+            chosen = top_k(self.degree[candidates] - candidate_hops / (MAX_HOPS + 1), limit - 1)
+            candidates, candidate_hops = candidates[chosen], candidate_hops[chosen]
+        nodes = np.concatenate([[center], candidates]).astype(np.int64)
+        hop_of = [0] + candidate_hops.tolist()
+
+        # Citations between the selected papers, in local indexes, found by binary search
+        # so that the cost follows the size of the answer rather than of the graph
+        order = np.argsort(nodes)
+        sorted_nodes = nodes[order]
+        counts = graph.out_indptr[nodes + 1] - graph.out_indptr[nodes]
+        sources = np.repeat(np.arange(len(nodes)), counts)
+        targets = gather_csr(graph.out_indptr, graph.out_indices, nodes)
+        slots = np.minimum(np.searchsorted(sorted_nodes, targets), len(nodes) - 1)
+        kept = sorted_nodes[slots] == targets
+        links = np.column_stack([sources[kept], order[slots[kept]]]).ravel()
+
+        node_list = nodes.tolist()
+        return {
+            "center": paper_id,
+            "hops": hops,
+            "direction": direction,
+            "total": total,
+            "papers": {
+                "id": [graph.paper_ids[i] for i in node_list],
+                "title": [self.titles[i] for i in node_list],
+                "url": [self.urls[i] for i in node_list],
+                "year": [self.years[i] for i in node_list],
+                "venue": [self.venues[i] for i in node_list],
+                "citations": self.in_degree[nodes].tolist(),
+                "references": self.out_degree[nodes].tolist(),
+                "hop": hop_of
+            },
+            "links": links.tolist()
+        }
+
+    def ego(self, author, limit=50):
+        """
+        Co-author ego network of an author: the `limit` closest co-authors and the collaborations between them.
+
+        Co-authors are ranked by the number of papers written with the
+        author. Collaborations count every paper two selected authors share.
+
+        Returns:
+            Dictionary in the layout of the bundle's co-author graph: author
+            names and paper counts as parallel lists, the author first, and the
+            collaborations as a flat list of (i, j, papers) triples. None if
+            the author is unknown.
+        """
+        main = self._author_index.get(author.lower())
+        if main is None:
+            return None
+
+        papers = self.author_papers[self.author_indptr[main]:self.author_indptr[main + 1]]
+        coauthors, shared = np.unique(gather_csr(self.paper_indptr, self.paper_authors, papers), return_counts=True)
+        others = coauthors != main
+        coauthors, shared = coauthors[others], shared[others]
+        total = len(coauthors) + 1
+        if len(coauthors) > limit - 1:
+            chosen = top_k(shared.astype(np.float64), limit - 1)
+            coauthors, shared = coauthors[chosen], shared[chosen]
+        members = np.concatenate([[main], coauthors]).astype(np.int64)
+
+        # Selected authors of every paper they wrote, as sorted (paper, local index) keys
+        n = len(members)
+        counts = self.author_indptr[members + 1] - self.author_indptr[members]
+        order = np.argsort(members)
+        sorted_members = members[order]
+        papers_used = np.unique(gather_csr(self.author_indptr, self.author_papers, members))
+        sizes = self.paper_indptr[papers_used + 1] - self.paper_indptr[papers_used]
+        paper_of = np.repeat(np.arange(len(papers_used), dtype=np.int64), sizes)
+        authors = gather_csr(self.paper_indptr, self.paper_authors, papers_used)
+        slots = np.minimum(np.searchsorted(sorted_members, authors), n - 1)
+        kept = sorted_members[slots] == authors
+        memberships = np.unique(paper_of[kept] * n + order[slots[kept]])
+        paper_of, local = memberships // n, memberships % n
+
+        # Every paper adds one to the pairs of its selected authors. Papers with the same
+        # number of them are paired up together, from the upper triangle of that size
+        starts = np.flatnonzero(np.r_[True, paper_of[1:] != paper_of[:-1]])
+        group_sizes = np.diff(np.r_[starts, len(paper_of)])
+        pair_keys = [np.empty(0, dtype=np.int64)]
+        for size in np.unique(group_sizes[group_sizes > 1]):
+            block = local[starts[group_sizes == size][:, None] + np.arange(size)]
+            first, second = np.triu_indices(size, k=1)
+            pair_keys.append((block[:, first] * n + block[:, second]).ravel())
+        pairs, shared_papers = np.unique(np.concatenate(pair_keys), return_counts=True)
+        links = np.column_stack([pairs // n, pairs % n, shared_papers]).ravel()
+
+        return {
+            "main": self.author_names[main],
+            "total": total,
+            "authors": {
+                "name": [self.author_names[a] for a in members.tolist()],
+                "papers": counts.tolist(),
+                "shared": [len(papers)] + shared.tolist()
+            },
+            "links": links.tolist()
+        }
+
+class ResponseLRU:
+    """
+    Thread-safe LRU cache of encoded responses.
+
+    Each entry keeps the JSON body, its gzip encoding (compressed once, when
+    the entry is created) and its ETag.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def encode_response(payload):
+    """Encode a payload as (body, gzip body or None, ETag)."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    compressed = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= MIN_GZIP_BYTES else None
+    etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+    return body, compressed, etag
+
+class NeighborhoodHandler(BaseHTTPRequestHandler):
+    """
+    Serves the server's NeighborhoodIndex as JSON:
+
+    - GET /neighborhood?paper=ID&hops=1&limit=100&direction=both
+    - GET /ego?author=NAME&limit=50
+    - GET /stats
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        key = (url.path, tuple(sorted(query.items())))
+        cached = url.path in CACHED_PATHS
+
+        entry = self.server.responses.get(key) if cached else None
+        if entry is None:
+            try:
+                status, payload = self._answer(url.path, query)
+            except ValueError as e:
+                status, payload = 400, {"error": str(e)}
+            entry = (status,) + encode_response(payload)
+            if status == 200 and cached:
+                self.server.responses.put(key, entry)
+        self._send(*entry, cached=cached)
+
+    def _answer(self, path, query):
+        index = self.server.index
+        if path == "/neighborhood":
+            if "paper" not in query:
+                raise ValueError("Missing paper parameter")
+            hops = _bounded_int(query, "hops", 1, 1, MAX_HOPS)
+            limit = _bounded_int(query, "limit", 100, 1, MAX_NODES)
+            result = index.neighborhood(query["paper"], hops, limit, query.get("direction", "both"))
+            return (200, result) if result else (404, {"error": f"Unknown paper {query['paper']}"})
+        if path == "/ego":
+            if "author" not in query:
+                raise ValueError("Missing author parameter")
+            result = index.ego(query["author"], _bounded_int(query, "limit", 50, 1, MAX_NODES))
+            return (200, result) if result else (404, {"error": f"Unknown author {query['author']}"})
+        if path == "/stats":
+            responses = self.server.responses
+            return 200, dict(index.stats(), cache_hits=responses.hits, cache_misses=responses.misses)
+        return 404, {"error": f"Unknown endpoint {path}"}
+
+    def _send(self, status, body, compressed, etag, cached=True):
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if compressed is not None and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = compressed
+            encoding = "gzip"
+        else:
+            encoding = None
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        # The website is served from another port during development
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if status == 200:
+            self.send_header("ETag", etag)
+            # /stats changes with every request, clients have to revalidate it
+            self.send_header("Cache-Control", "max-age=3600" if cached else "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+def _bounded_int(query, name, default, low, high):
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+def start_server(index, host="127.0.0.1", port=8001, cache_size=1024, verbose=False):
+    """
+    Serve a NeighborhoodIndex in a background thread.
+
+    Args:
+        index: NeighborhoodIndex to query
+        host: Interface to listen on
+        port: Port to listen on (0 for any free port)
+        cache_size: Number of responses kept in the LRU cache
+        verbose: Log every request to stderr
+
+    Returns:
+        The running server, stopped with server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), NeighborhoodHandler)
+    server.daemon_threads = True
+    server.index = index
+    server.responses = ResponseLRU(cache_size)
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    from build_subfield_bundles import SUBFIELDS_DIR
+
+    parser = argparse.ArgumentParser(description="Serve k-hop paper neighborhoods and co-author ego networks locally.")
+    parser.add_argument("--store", metavar="SQLITE",
+                        help="load every paper of this paper store (default: the subfield crawls)")
+    parser.add_argument("--subfields-dir", default=SUBFIELDS_DIR,
+                        help="directory holding one papers.csv/connections.csv directory per subfield")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8001, help="port to listen on (default: 8001)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="number of cached responses (default: 1024)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = NeighborhoodIndex.from_store(args.store) if args.store else NeighborhoodIndex.from_subfields(args.subfields_dir)
+    stats = index.stats()
+    print(f"Indexed {stats['papers']} papers, {stats['connections']} connections and {stats['authors']} authors "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    server = start_server(index, args.host, args.port, args.cache_size, args.verbose)
+    print(f"Serving on http://{args.host}:{server.server_port}/ (/neighborhood, /ego, /stats)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,201 +1,486 @@
 import requests
 import json
-import time
 import os
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
-from collections import defaultdict
 import csv
+from response_cache import ResponseCache, CacheMiss
+from crawl_state import CrawlState, CrawlJournal
+from rate_limit import API_BASE, request_json, shared_limiter, shared_breaker, CircuitOpen
+from crawl_metrics import PAPERS, FRONTIER, DEPTH, shared_metrics, add_metrics_arguments, reporter_from_args
+from citation_graph import CitationGraph
+from graph_layout import networkx_layout, add_layout
+
+_NOT_FOUND = object()  # Returned by request_json for 404s, which are not worth retrying
 
 class SemanticScholarClient:
-    BASE_URL = "https://api.semanticscholar.org/graph/v1/paper/"
-    
-    def __init__(self, max_retries=20, timeout=10, delay_between_requests=1):
+    BASE_URL = f"{API_BASE}/paper/"
+    BATCH_URL = f"{API_BASE}/paper/batch"
+    BATCH_SIZE = 500  # Maximum number of IDs accepted by /paper/batch
+    PAPER_FIELDS = "title,authors,year,venue,url"
+    CRAWL_FIELDS = "title,authors,year,venue,url,citations,references"
+    PAPER_RETRIES = 2  # Times a paper that failed to fetch goes back to the end of its level
+    
+    def __init__(self, max_retries=20, timeout=10, cache=None, limiter=None, breaker=None):
         self.max_retries = max_retries
         self.timeout = timeout
-        self.delay_between_requests = delay_between_requests
         self.session = requests.Session()
+        # Optional ResponseCache shared with the other fetchers
+        self.cache = cache
+        # Rate limiter and circuit breaker, shared with the other fetchers unless given
+        self.limiter = limiter or shared_limiter()
+        self.breaker = breaker or shared_breaker()
+        # IDs the API answered 404 for, the only papers a crawl skips for good
+        self.not_found = set()
         
-    def fetch_paper_data(self, paper_id):
-        """Fetch paper data from Semantic Scholar API with retry logic."""
-        url = f"{self.BASE_URL}{paper_id}?fields=title,authors,year,venue,url,citations,references"
+    def fetch_paper_data(self, paper_id, fields=CRAWL_FIELDS):
+        """Fetch paper data from Semantic Scholar API through the shared rate limiter."""
+        try:
+            paper_data = self._request("GET", self._paper_url(paper_id, fields), cache=self.cache,
+                                       not_found=_NOT_FOUND)
+        except CacheMiss:
+            print(f"Paper {paper_id} is not cached, skipping in cache-only mode")
+            return None
         
-        retry_count = 0
-        success = False
+        if paper_data is _NOT_FOUND:
+            print(f"Paper {paper_id} does not exist")
+            self.not_found.add(paper_id)
+            return None
+        if paper_data is None:
+            print(f"Failed to fetch data for paper ID: {paper_id}")
+        return paper_data
+
+    def fetch_papers_batch(self, paper_ids, fields=CRAWL_FIELDS):
+        """
+        Fetch many papers through the /paper/batch endpoint.
         
-        while not success and retry_count < self.max_retries:
-            try:
-                response = self.session.get(url, timeout=self.timeout)
-                response.raise_for_status()  # Raise exception for 4XX/5XX responses
-                success = True
-                # Successful response, return the data
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                retry_count += 1
-                wait_time = min(self.delay_between_requests * (2 ** retry_count), 60)  # Cap at 60 seconds
-                print(f"Attempt {retry_count} failed: {str(e)}")
-                print(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-        
-        print(f"Failed to fetch data for paper ID: {paper_id} after {self.max_retries} attempts")
-        return None
+        IDs are sent in POSTs of up to BATCH_SIZE. Papers that come back missing,
+        either as null entries or because a whole batch failed, are retried one
+        by one with fetch_paper_data.
+        
+        Parameters:
+        - paper_ids: List of paper IDs to fetch
+        - fields: Comma-separated fields to request for each paper
+        
+        Returns:
+        - Dictionary mapping each paper ID to its data, or None if it could not be fetched
+        """
+        results = {}
+        missing = []
+        
+        for start in range(0, len(paper_ids), self.BATCH_SIZE):
+            chunk = paper_ids[start:start + self.BATCH_SIZE]
+            cached, uncached = self._lookup_batch(chunk, fields)
+            results.update(cached)
+            if not uncached:
+                continue
+            if self._offline():
+                print(f"{len(uncached)} papers are not cached, skipping them in cache-only mode")
+                results.update(dict.fromkeys(uncached))
+                continue
+            
+            batch = self._post_batch(uncached, fields)
+            self._collect_batch(uncached, batch, results, missing)
+        
+        if missing:
+            print(f"Retrying {len(missing)} papers missing from batch responses one by one...")
+        for paper_id in missing:
+            results[paper_id] = self.fetch_paper_data(paper_id, fields)
+        
+        return results
+
+    def _post_batch(self, paper_ids, fields):
+        """POST a single /paper/batch request, returning the list of results."""
+        batch = self._request("POST", self.BATCH_URL, params={"fields": fields}, json_body={"ids": paper_ids})
+        if batch is None:
+            print(f"Failed to fetch a batch of {len(paper_ids)} papers")
+        elif self.cache and isinstance(batch, list) and len(batch) == len(paper_ids):
+            for paper_id, paper_data in zip(paper_ids, batch):
+                if paper_data:
+                    self.cache.set("GET", self._paper_url(paper_id, fields), None, None, paper_data)
+        return batch
+
+    def _request(self, method, url, params=None, json_body=None, cache=None, not_found=None):
+        return request_json(
+            self.session, method, url, params=params, json_body=json_body,
+            limiter=self.limiter, breaker=self.breaker,
+            max_retries=self.max_retries, timeout=self.timeout, cache=cache, not_found=not_found
+        )
+
+    def _lookup_batch(self, paper_ids, fields):
+        """Split a batch into papers served from the cache and IDs that still need a request."""
+        cached = {}
+        uncached = []
+        for paper_id in paper_ids:
+            paper_data = self._cache_get(self._paper_url(paper_id, fields))
+            if paper_data is not None:
+                cached[paper_id] = paper_data
+            else:
+                uncached.append(paper_id)
+        return cached, uncached
+
+    def _paper_url(self, paper_id, fields):
+        # Batched papers are cached under this URL too, so both fetch paths share entries
+        return f"{self.BASE_URL}{paper_id}?fields={fields}"
+
+    def _cache_get(self, url):
+        if not self.cache:
+            return None
+        try:
+            return self.cache.get("GET", url)
+        except CacheMiss:
+            return None
+
+    def _offline(self):
+        return bool(self.cache and self.cache.cache_only)
+
+    def _collect_batch(self, paper_ids, batch, results, missing):
+        """Sort a /paper/batch response into fetched papers and IDs that need a retry."""
+        if not isinstance(batch, list) or len(batch) != len(paper_ids):
+            # The response is positional, so without a full list nothing can be matched up
+            missing.extend(paper_ids)
+            return
+        
+        for paper_id, paper_data in zip(paper_ids, batch):
+            if paper_data:
+                results[paper_id] = paper_data
+            else:
+                missing.append(paper_id)
     
-    def build_citation_network(self, root_paper_id, max_depth=2, direction="references"):
+    def build_citation_network(self, root_paper_id, max_depth=2, direction="references", journal_path=None):
         """
         Build a citation network starting from a root paper.
         
+        Papers are fetched one BFS level at a time through fetch_papers_batch,
+        so each level costs a handful of requests. Papers on the last level are
+        only fetched with their metadata, since they are not expanded.
+        
         Parameters:
         - root_paper_id: ID of the starting paper
         - max_depth: How many levels deep to explore
         - direction: "references" (papers cited by root) or "citations" (papers citing root)
+        - journal_path: Optional journal file that checkpoints the crawl after every batch,
+          so that it can be continued with resume_citation_network
         
         Returns:
         - Dictionary containing the paper network data
         """
-        if direction not in ["references", "citations"]:
-            raise ValueError("Direction must be 'references' or 'citations'")
+        state = CrawlState(root_paper_id, max_depth, direction)
+        journal = CrawlJournal.create(journal_path, root_paper_id, max_depth, direction) if journal_path else None
+        return self._run_crawl(state, journal)
+
+    async def build_citation_network_async(self, root_paper_id, max_depth=2, direction="references",
+                                           max_concurrency=8, journal_path=None):
+        """
+        Build a citation network with a bounded pool of concurrent fetch workers.
         
-        # Initialize network
-        network = {
-            "papers": {},
-            "connections": []
-        }
+        The crawl runs level by level: every BFS level is split into /paper/batch
+        requests that are fetched by `max_concurrency` workers, while the
+        client's shared rate limiter keeps request starts within the API budget.
+        Connections are expanded in the same order as `build_citation_network`,
+        so both produce the same network for the same API responses.
         
-        # First, make sure we can get the root paper data
-        root_paper_data = self.fetch_paper_data(root_paper_id)
-        if not root_paper_data:
-            print("ERROR: Failed to fetch root paper data after multiple attempts. Exiting.")
-            return network  # Return empty network
-        
-        # Store root paper info
-        network["papers"][root_paper_id] = {
-            "title": root_paper_data.get("title", "Unknown"),
-            "authors": [author.get("name", "Unknown Author") for author in root_paper_data.get("authors", [])],
-            "year": root_paper_data.get("year"),
-            "venue": root_paper_data.get("venue"),
-            "url": root_paper_data.get("url")
-        }
+        Parameters:
+        - root_paper_id: ID of the starting paper
+        - max_depth: How many levels deep to explore
+        - direction: "references" (papers cited by root) or "citations" (papers citing root)
+        - max_concurrency: Number of requests kept in flight
+        - journal_path: Optional journal file that checkpoints the crawl after every batch
         
-        # Queue of papers to process: (paper_id, depth)
-        queue = [(root_paper_id, 0)]
-        processed_ids = set([root_paper_id])
+        Returns:
+        - Dictionary containing the paper network data
+        """
+        state = CrawlState(root_paper_id, max_depth, direction)
+        journal = CrawlJournal.create(journal_path, root_paper_id, max_depth, direction) if journal_path else None
+        return await self._run_crawl_async(state, journal, max_concurrency)
+
+    def build_citation_networks(self, crawls, max_concurrency=8):
+        """
+        Build several citation networks at once, sharing the fetched papers between them.
         
-        while queue:
-            current_id, depth = queue.pop(0)
-            print(f"Processing paper {current_id} at depth {depth}")
-            
-            # We already have the root paper data
-            if current_id != root_paper_id:
-                # Fetch paper data
-                paper_data = self.fetch_paper_data(current_id)
-                if not paper_data:
-                    print(f"WARNING: Failed to get data for paper {current_id}, skipping...")
-                    continue
-                    
-                # Store paper info
-                network["papers"][current_id] = {
-                    "title": paper_data.get("title", "Unknown"),
-                    "authors": [author.get("name", "Unknown Author") for author in paper_data.get("authors", [])],
-                    "year": paper_data.get("year"),
-                    "venue": paper_data.get("venue"),
-                    "url": paper_data.get("url")
-                }
-            else:
-                paper_data = root_paper_data
-            
-            # Stop expanding if we've reached max depth
-            if depth >= max_depth:
-                continue
+        All crawls advance one BFS level at a time together. The papers that
+        every crawl needs on its current level are pooled, so a paper reached
+        from several roots is fetched once, and the pooled IDs are fetched as
+        /paper/batch requests by `max_concurrency` threads drawing from the
+        client's rate limiter. Each crawl then consumes its own level in order,
+        so every network is the one build_citation_network would return.
+        
+        Parameters:
+        - crawls: List of (root_paper_id, max_depth, direction) tuples
+        - max_concurrency: Number of requests kept in flight
+        
+        Returns:
+        - List with the network data of each crawl, in the order of `crawls`
+        """
+        states = [CrawlState(root_paper_id, max_depth, direction) for root_paper_id, max_depth, direction in crawls]
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            active = [state for state in states if not state.finished]
+            while active:
+                # Papers expanded by any crawl need the connections, the others only the metadata
+                wanted = {}
+                requested = 0
+                for state in active:
+                    fields = self._level_fields(state)
+                    level = state.pending()
+                    requested += len(level)
+                    for paper_id in level:
+                        if wanted.get(paper_id) != self.CRAWL_FIELDS:
+                            wanted[paper_id] = fields
+                print(f"Fetching {len(wanted)} papers for {len(active)} crawls ({requested} requested)")
                 
-            # Process connections based on direction
-            if direction == "references":
-                connections = paper_data.get("references", [])
-            else:  # citations
-                connections = paper_data.get("citations", [])
+                fetched = {}
+                for fields in [self.CRAWL_FIELDS, self.PAPER_FIELDS]:
+                    paper_ids = [paper_id for paper_id, wanted_fields in wanted.items() if wanted_fields == fields]
+                    chunks = [paper_ids[start:start + self.BATCH_SIZE] for start in range(0, len(paper_ids), self.BATCH_SIZE)]
+                    for results in executor.map(lambda chunk: self.fetch_papers_batch(chunk, fields), chunks):
+                        fetched.update(results)
                 
-            # Check if we have valid connections
-            if not connections:
-                print(f"No {direction} found for paper {current_id}")
-                continue
+                for state in active:
+                    self._apply_fetched(state, state.pending(), fetched)
+                active = [state for state in active if not state.finished]
+        
+        networks = [state.to_network() for state in states]
+        for network in networks:
+            self._report_network(network)
+        return networks
+
+    def resume_citation_network(self, journal_path, max_concurrency=1):
+        """
+        Continue a crawl from its journal.
+        
+        The journal is replayed to rebuild the partial network, the visited set
+        and the frontier, and the crawl goes on from the first paper it had not
+        processed yet. Finished crawls are returned as they are.
+        
+        Parameters:
+        - journal_path: Journal written by a crawl started with `journal_path`
+        - max_concurrency: Continue with the concurrent crawler if greater than 1
+        
+        Returns:
+        - Dictionary containing the paper network data
+        """
+        state = CrawlState.from_journal(journal_path)
+        print(f"Resuming crawl of {state.root_paper_id}: {state.paper_count} papers recovered, "
+              f"{len(state.level) - state.position} left at depth {state.depth}")
+        
+        journal = CrawlJournal.reopen(journal_path)
+        if max_concurrency > 1:
+            return asyncio.run(self._run_crawl_async(state, journal, max_concurrency))
+        return self._run_crawl(state, journal)
+
+    def _run_crawl(self, state, journal=None):
+        """Drive a crawl state to the end, one batch of the current level at a time."""
+        try:
+            while not state.finished:
+                chunk = state.pending(self.BATCH_SIZE)
                 
-            for connection in connections:
-                connected_id = connection.get("paperId")
-                if not connected_id:
+                if state.depth == 0:
+                    # First, make sure we can get the root paper data
+                    fetched = {state.root_paper_id: self.fetch_paper_data(state.root_paper_id)}
+                    if not fetched[state.root_paper_id]:
+                        print("ERROR: Failed to fetch root paper data after multiple attempts. Exiting.")
+                        return state.to_network()  # Return empty network
+                else:
+                    print(f"Fetching {len(chunk)} papers at depth {state.depth}")
+                    fetched = self.fetch_papers_batch(chunk, self._level_fields(state))
+                
+                if not self._apply_fetched(state, chunk, fetched, journal):
+                    break
+        finally:
+            if journal:
+                journal.close()
+        
+        network = state.to_network()
+        self._report_network(network)
+        return network
+
+    async def _run_crawl_async(self, state, journal, max_concurrency):
+        """Drive a crawl state to the end, fetching each level with concurrent workers."""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        pending = asyncio.Queue()
+        
+        async def worker():
+            while True:
+                chunk, fields, done = await pending.get()
+                results = {}
+                try:
+                    cached, uncached = self._lookup_batch(chunk, fields)
+                    results.update(cached)
+                    if uncached and self._offline():
+                        results.update(dict.fromkeys(uncached))
+                    elif uncached:
+                        # Requests wait for the shared rate limiter inside the executor threads
+                        batch = await loop.run_in_executor(executor, self._post_batch, uncached, fields)
+                        missing = []
+                        self._collect_batch(uncached, batch, results, missing)
+                        for paper_id in missing:
+                            results[paper_id] = await loop.run_in_executor(
+                                executor, self.fetch_paper_data, paper_id, fields
+                            )
+                except CircuitOpen as e:
+                    # Stop the crawl rather than retrying every remaining paper
+                    done.set_exception(e)
+                    continue
+                except Exception as e:
+                    # Papers left out of the results are retried later in the level
+                    print(f"WARNING: Unexpected error while fetching {len(chunk)} papers: {e}")
+                done.set_result(results)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+        chunks = []
+        try:
+            while not state.finished:
+                if state.depth == 0:
+                    root_data = await loop.run_in_executor(
+                        executor, self.fetch_paper_data, state.root_paper_id
+                    )
+                    if not root_data:
+                        print("ERROR: Failed to fetch root paper data after multiple attempts. Exiting.")
+                        return state.to_network()  # Return empty network
+                    self._apply_fetched(state, [state.root_paper_id], {state.root_paper_id: root_data}, journal)
                     continue
-                    
-                # Add to network connections
-                if direction == "references":
-                    network["connections"].append({
-                        "source": current_id,
-                        "target": connected_id
-                    })
-                else:  # citations
-                    network["connections"].append({
-                        "source": connected_id,
-                        "target": current_id
-                    })
                 
-                # Add to processing queue if not already processed
-                if connected_id not in processed_ids:
-                    queue.append((connected_id, depth + 1))
-                    processed_ids.add(connected_id)
+                level = state.pending()
+                fields = self._level_fields(state)
+                print(f"Fetching {len(level)} papers at depth {state.depth}")
+                chunks = []
+                for start in range(0, len(level), self.BATCH_SIZE):
+                    chunk = level[start:start + self.BATCH_SIZE]
+                    done = loop.create_future()
+                    pending.put_nowait((chunk, fields, done))
+                    chunks.append((chunk, done))
                 
-            # Respect rate limits
-            time.sleep(self.delay_between_requests)
+                # Chunks are applied and journaled in level order as soon as they arrive,
+                # so a crash only loses the chunks that were still in flight
+                for chunk, done in chunks:
+                    if not self._apply_fetched(state, chunk, await done, journal):
+                        break
+                else:
+                    continue
+                break
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # Chunks left behind by a stopped crawl: drop their results and errors
+            for _, done in chunks:
+                if done.done() and not done.cancelled():
+                    done.exception()
+                else:
+                    done.cancel()
+            # Requests not started yet would keep drawing from the shared limiter
+            executor.shutdown(wait=False, cancel_futures=True)
+            if journal:
+                journal.close()
+        
+        network = state.to_network()
+        self._report_network(network)
+        return network
+
+    def _level_fields(self, state):
+        # Papers on the last level are never expanded, so their connections are not needed
+        return self.CRAWL_FIELDS if state.depth < state.max_depth else self.PAPER_FIELDS
+
+    def _apply_fetched(self, state, paper_ids, fetched, journal=None):
+        """
+        Feed fetched papers of the current level to the crawl state, in level order.
+        
+        Papers the API does not know are skipped. Papers that failed for any
+        other reason go back to the end of the level, up to PAPER_RETRIES times.
+        After that a journaled crawl stops, leaving them for a resumed run,
+        while an unjournaled one skips them.
+        
+        Returns:
+        - False if the crawl has to stop, True otherwise
+        """
+        depth = state.depth
+        added = skipped = retried = 0
+        complete = True
+        for current_id in paper_ids:
+            print(f"Processing paper {current_id} at depth {depth}")
+            paper_data = fetched.get(current_id)
+            if not paper_data:
+                retries = state.retries.get(state.ids.get(current_id), 0)
+                if current_id not in self.not_found and retries < self.PAPER_RETRIES:
+                    print(f"WARNING: Failed to get data for paper {current_id}, retrying it later...")
+                    state.requeue_paper(current_id)
+                    retried += 1
+                    if journal:
+                        journal.record_retry(current_id)
+                    continue
+                if current_id not in self.not_found and journal:
+                    print(f"ERROR: Failed to get data for paper {current_id} after {retries + 1} tries, "
+                          f"stopping the crawl. Resume it from {journal.path} later.")
+                    complete = False
+                    break
+                print(f"WARNING: Failed to get data for paper {current_id}, skipping...")
+                state.skip_paper(current_id)
+                skipped += 1
+                if journal:
+                    journal.record_skip(current_id)
+                continue
+            
+            # Stop expanding if we've reached max depth
+            paper = self._paper_record(paper_data)
+            linked_ids = self._linked_ids(current_id, paper_data, state.direction) if depth < state.max_depth else []
+            state.add_paper(current_id, paper, linked_ids)
+            added += 1
+            if journal:
+                journal.record_paper(current_id, paper, linked_ids)
         
+        if journal:
+            journal.sync()
+        
+        metrics = shared_metrics()
+        metrics.inc(PAPERS, added, source="crawl", status="fetched")
+        metrics.inc(PAPERS, skipped, source="crawl", status="skipped")
+        metrics.inc(PAPERS, retried, source="crawl", status="retried")
+        metrics.set_gauge(FRONTIER, len(state.level) - state.position, root=state.root_paper_id)
+        metrics.set_gauge(DEPTH, min(state.depth, state.max_depth), root=state.root_paper_id)
+        return complete
+
+    def _paper_record(self, paper_data):
+        """Return the fields of a fetched paper that are kept in the network."""
+        return {
+            "title": paper_data.get("title", "Unknown"),
+            "authors": [author.get("name", "Unknown Author") for author in paper_data.get("authors", [])],
+            "year": paper_data.get("year"),
+            "venue": paper_data.get("venue"),
+            "url": paper_data.get("url")
+        }
+
+    def _linked_ids(self, current_id, paper_data, direction):
+        """Return the IDs of the papers a fetched paper is connected to, in API order."""
+        # Process connections based on direction
+        connections = paper_data.get(direction) or []
+        
+        # Check if we have valid connections
+        if not connections:
+            print(f"No {direction} found for paper {current_id}")
+            return []
+        
+        return [connection.get("paperId") for connection in connections if connection.get("paperId")]
+
+    def _report_network(self, network):
         # Verify we have some data before returning
         if not network["papers"]:
             print("WARNING: No papers were successfully processed. Network is empty.")
         else:
             print(f"Successfully processed {len(network['papers'])} papers with {len(network['connections'])} connections.")
-            
-        return network
         
-    def extract_author_collaboration_network(self, citation_network):
+    def extract_author_collaboration_network(self, citation_network, max_authors_per_paper=100):
         """
         Extract author collaboration network from citation network.
         
         Returns a dictionary mapping author pairs to collaboration count.
         """
-        collaborations = defaultdict(int)
-        author_papers = defaultdict(list)
-        
-        # Check if we have papers to process
-        if not citation_network["papers"]:
-            print("WARNING: No papers in citation network, cannot extract author collaborations.")
-            return {
-                "collaborations": {},
-                "author_papers": {}
-            }
-        
-        # Collect all papers for each author
-        for paper_id, paper_info in citation_network["papers"].items():
-            authors = paper_info["authors"]
-            
-            if not authors:
-                continue
-                
-            # Record each author's papers
-            for author in authors:
-                if author:  # Skip empty authors
-                    author_papers[author].append(paper_id)
-            
-            # Record collaborations within papers
-            for i in range(len(authors)):
-                for j in range(i+1, len(authors)):
-                    # Skip if either author is empty
-                    if not authors[i] or not authors[j]:
-                        continue
-                        
-                    # Use tuple to ensure order doesn't matter
-                    author_pair = tuple(sorted([authors[i], authors[j]]))
-                    collaborations[author_pair] += 1
-        
-        return {
-            "collaborations": dict(collaborations),
-            "author_papers": dict(author_papers)
-        }
+        return extract_author_collaboration_network(citation_network, max_authors_per_paper)
 
 def save_to_json(data, filename):
     """Save data to a JSON file."""
@@ -218,11 +503,14 @@ def save_to_csv(data, filename):
         print("WARNING: No paper data to save to CSV.")
         return
     
+    # Layout positions are only written if add_layout was run
+    has_layout = all("x" in info for info in data["papers"].values())
+    
     # Save papers data
     papers_file = f"{filename}_papers.csv"
     with open(papers_file, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
-        writer.writerow(["paper_id", "title", "authors", "year", "venue", "url"])
+        writer.writerow(["paper_id", "title", "authors", "year", "venue", "url"] + (["x", "y"] if has_layout else []))
         for paper_id, info in data["papers"].items():
             writer.writerow([
                 paper_id,
@@ -231,7 +519,7 @@ def save_to_csv(data, filename):
                 info["year"],
                 info["venue"],
                 info["url"]
-            ])
+            ] + ([info["x"], info["y"]] if has_layout else []))
     
     # Save connections data
     connections_file = f"{filename}_connections.csv"
@@ -249,25 +537,16 @@ def visualize_citation_network(network_data, output_file="citation_network.png")
         print("WARNING: Not enough data to visualize citation network.")
         return None
     
-    G = nx.DiGraph()
-    
-    # Add nodes (papers)
-    for paper_id, paper_info in network_data["papers"].items():
-        G.add_node(paper_id, title=paper_info["title"], year=paper_info["year"])
-    
-    # Add edges (citations)
-    for connection in network_data["connections"]:
-        source = connection["source"]
-        target = connection["target"]
-        if source in network_data["papers"] and target in network_data["papers"]:
-            G.add_edge(source, target)
+    # Only edges between crawled papers are drawn
+    graph = CitationGraph.from_network(network_data, crawled_only=True)
+    G = graph.to_networkx()
     
     if not G.nodes():
         print("WARNING: No nodes to visualize in citation network.")
         return None
     
     plt.figure(figsize=(12, 12))
-    pos = nx.spring_layout(G)
+    pos = networkx_layout(G)
     
     nx.draw_networkx_nodes(G, pos, node_size=100, alpha=0.7)
     nx.draw_networkx_edges(G, pos, alpha=0.3, arrows=True)
@@ -289,12 +568,8 @@ def visualize_citation_network(network_data, output_file="citation_network.png")
     
     return G
 
-def visualize_author_network(author_data, output_file="author_network.png"):
-    """Visualize the author collaboration network using NetworkX."""
-    if not author_data["collaborations"]:
-        print("WARNING: No collaborations to visualize author network.")
-        return None
-    
+def author_graph(author_data):
+    """Build the weighted co-author graph drawn by visualize_author_network."""
     G = nx.Graph()
     
     # Add nodes (authors)
@@ -309,10 +584,64 @@ def visualize_author_network(author_data, output_file="author_network.png"):
     for (author1, author2), weight in author_data["collaborations"].items():
         G.add_edge(author1, author2, weight=weight)
     
+    return G
+
+def top_author_graph(author_data, top_authors=20, min_collaborations=2):
+    """
+    Build the graph drawn by visualize_author_network_better.
+    
+    Parameters:
+    - author_data: Dictionary with collaborations and author_papers
+    - top_authors: Maximum number of authors to keep
+    - min_collaborations: Minimum number of collaborations to keep a connection
+    
+    Returns:
+    - Graph of the top authors with a "papers" node attribute, isolated authors removed
+    """
+    G = nx.Graph()
+    
+    # Filter collaborations by minimum weight
+    filtered_collaborations = {pair: weight for pair, weight in author_data["collaborations"].items() 
+                              if weight >= min_collaborations}
+    
+    if not filtered_collaborations:
+        print(f"WARNING: No collaborations with at least {min_collaborations} papers together.")
+        # Fall back to using all collaborations
+        filtered_collaborations = author_data["collaborations"]
+    
+    # Identify top authors by number of papers
+    author_paper_counts = {author: len(papers) for author, papers in author_data["author_papers"].items()}
+    top_author_list = sorted(author_paper_counts.items(), key=lambda x: x[1], reverse=True)[:top_authors]
+    top_author_set = set(author for author, _ in top_author_list)
+    
+    # Add nodes for top authors
+    for author, paper_count in top_author_list:
+        G.add_node(author, papers=paper_count)
+    
+    # Add edges for collaborations between top authors
+    for (author1, author2), weight in filtered_collaborations.items():
+        if author1 in top_author_set and author2 in top_author_set:
+            G.add_edge(author1, author2, weight=weight)
+    
+    # Remove isolated nodes
+    isolated_nodes = [node for node in G.nodes() if G.degree(node) == 0]
+    G.remove_nodes_from(isolated_nodes)
+    print(f"Removed {len(isolated_nodes)} isolated authors from visualization")
+    
+    return G
+
+def visualize_author_network(author_data, output_file="author_network.png"):
+    """Visualize the author collaboration network using NetworkX."""
+    if not author_data["collaborations"]:
+        print("WARNING: No collaborations to visualize author network.")
+        return None
+    
+    G = author_graph(author_data)
+    
     plt.figure(figsize=(14, 14))
     
-    # Position nodes using force-directed layout
-    pos = nx.spring_layout(G, k=0.3)
+    # Position nodes using the cached force-directed layout
+    pos = networkx_layout(G)
     
     # Node sizes based on number of papers
     node_sizes = [len(author_data["author_papers"].get(author, [])) * 50 for author in G.nodes()]
@@ -350,48 +679,19 @@ def visualize_author_network_better(author_data, top_authors=20, min_collaborati
         print("WARNING: No collaborations to visualize author network.")
         return None
     
-    G = nx.Graph()
-    
-    # Filter collaborations by minimum weight
-    filtered_collaborations = {pair: weight for pair, weight in author_data["collaborations"].items() 
-                              if weight >= min_collaborations}
-    
-    if not filtered_collaborations:
-        print(f"WARNING: No collaborations with at least {min_collaborations} papers together.")
-        # Fall back to using all collaborations
-        filtered_collaborations = author_data["collaborations"]
-    
-    # Identify top authors by number of papers
-    author_paper_counts = {author: len(papers) for author, papers in author_data["author_papers"].items()}
-    top_author_list = sorted(author_paper_counts.items(), key=lambda x: x[1], reverse=True)[:top_authors]
-    top_author_set = set(author for author, _ in top_author_list)
-    
-    # Add nodes for top authors
-    for author, paper_count in top_author_list:
-        G.add_node(author, papers=paper_count)
-    
-    # Add edges for collaborations between top authors
-    for (author1, author2), weight in filtered_collaborations.items():
-        if author1 in top_author_set and author2 in top_author_set:
-            G.add_edge(author1, author2, weight=weight)
+    G = top_author_graph(author_data, top_authors, min_collaborations)
     
     if not G.nodes():
         print("WARNING: No nodes to visualize in author network.")
         return None
     
-    # Remove isolated nodes
-    isolated_nodes = [node for node in G.nodes() if G.degree(node) == 0]
-    G.remove_nodes_from(isolated_nodes)
-    print(f"Removed {len(isolated_nodes)} isolated authors from visualization")
-    
     plt.figure(figsize=(14, 14))
     
-    # Position nodes using force-directed layout with stronger repulsion for better spacing
-    #pos = nx.spring_layout(G, k=0.5, iterations=100)
-    pos = nx.kamada_kawai_layout(G)  # Often gives more organic layouts
+    # Position nodes using the cached force-directed layout
+    pos = networkx_layout(G)
     
     # Node sizes based on number of papers
-    node_sizes = [author_paper_counts[author] * 30 for author in G.nodes()]
+    node_sizes = [G.nodes[author]["papers"] * 30 for author in G.nodes()]
     
     # Edge widths based on collaboration count
     edge_weights = [G[u][v]['weight'] * 0.8 for u, v in G.edges()]
@@ -446,6 +746,9 @@ def read_network_csv(papers_csv, connections_csv):
                 "venue": row['venue'],
                 "url": row['url']
             }
+            if row.get('x'):
+                network_data["papers"][paper_id]["x"] = float(row['x'])
+                network_data["papers"][paper_id]["y"] = float(row['y'])
     
     # Read connections data
     with open(connections_csv, 'r', encoding='utf-8') as f:
@@ -458,70 +761,309 @@ def read_network_csv(papers_csv, connections_csv):
     
     return network_data
 
-def extract_author_collaboration_network(citation_network):
+def network_to_tables(data):
     """
-    Extract author collaboration network from citation network.
+    Convert network data to a pair of columnar Arrow tables.
     
-    Returns a dictionary mapping author pairs to collaboration count.
+    Paper IDs are dictionary-encoded: every ID is stored once, in a dictionary
+    listing the crawled papers first and the papers that are only linked to
+    after them, and the connections table stores int32 indexes into it.
+    Authors are a list-typed column, so they never need to be re-split.
+    
+    Parameters:
+    - data: Dictionary with papers and connections
+    
+    Returns:
+    - Tuple of (papers table, connections table)
+    """
+    import pyarrow as pa
+    
+    index = {paper_id: i for i, paper_id in enumerate(data["papers"])}
+    sources = []
+    targets = []
+    for conn in data["connections"]:
+        for paper_id, column in ((conn["source"], sources), (conn["target"], targets)):
+            i = index.get(paper_id)
+            if i is None:
+                i = index[paper_id] = len(index)
+            column.append(i)
+    
+    dictionary = pa.array(list(index), type=pa.string())
+    papers = list(data["papers"].values())
+    
+    columns = {
+        "paper_id": pa.DictionaryArray.from_arrays(pa.array(range(len(papers)), type=pa.int32()), dictionary),
+        "title": pa.array([p["title"] for p in papers], type=pa.string()),
+        "authors": pa.array([p["authors"] for p in papers], type=pa.list_(pa.string())),
+        "year": pa.array([p["year"] for p in papers], type=pa.int32()),
+        "venue": pa.array([p["venue"] for p in papers], type=pa.string()).dictionary_encode(),
+        "url": pa.array([p["url"] for p in papers], type=pa.string())
+    }
+    # Layout positions are only written if add_layout was run
+    if papers and all("x" in p for p in papers):
+        columns["x"] = pa.array([p["x"] for p in papers], type=pa.float32())
+        columns["y"] = pa.array([p["y"] for p in papers], type=pa.float32())
+    papers_table = pa.table(columns)
+    connections_table = pa.table({
+        "source": pa.DictionaryArray.from_arrays(pa.array(sources, type=pa.int32()), dictionary),
+        "target": pa.DictionaryArray.from_arrays(pa.array(targets, type=pa.int32()), dictionary)
+    })
+    return papers_table, connections_table
+
+def save_to_arrow(data, filename, format="arrow"):
     """
-    collaborations = defaultdict(int)
-    author_papers = defaultdict(list)
+    Save network data to columnar files.
     
-    # Check if we have papers to process
-    if not citation_network["papers"]:
-        print("WARNING: No papers in citation network, cannot extract author collaborations.")
-        return {
-            "collaborations": {},
-            "author_papers": {}
-        }
+    Writes {filename}_papers and {filename}_connections as Arrow IPC files
+    (".arrow", which can be memory-mapped when loading) or as Parquet files
+    (".parquet", smaller on disk).
     
-    # Collect all papers for each author
-    for paper_id, paper_info in citation_network["papers"].items():
-        authors = paper_info["authors"]
+    Parameters:
+    - data: Dictionary with papers and connections
+    - filename: Output path prefix, as for save_to_csv
+    - format: "arrow" or "parquet"
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    if format not in ["arrow", "parquet"]:
+        raise ValueError("Format must be 'arrow' or 'parquet'")
+    
+    # Create directory if it doesn't exist
+    os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
+    
+    # Check if we have data to save
+    if not data["papers"]:
+        print("WARNING: No paper data to save.")
+        return
+    
+    papers_file = f"{filename}_papers.{format}"
+    connections_file = f"{filename}_connections.{format}"
+    for table, path in zip(network_to_tables(data), (papers_file, connections_file)):
+        if format == "parquet":
+            pq.write_table(table, path)
+        else:
+            with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    
+    print(f"Data saved to {papers_file} and {connections_file}")
+
+def read_network_tables(filename, format="arrow"):
+    """
+    Load the columnar files written by save_to_arrow as Arrow tables.
+    
+    Arrow IPC files are memory-mapped, so the returned tables reference the
+    file pages directly instead of copying them. Parquet files still need to
+    be decoded.
+    
+    Parameters:
+    - filename: Path prefix passed to save_to_arrow
+    - format: "arrow" or "parquet"
+    
+    Returns:
+    - Tuple of (papers table, connections table)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    tables = []
+    for part in ["papers", "connections"]:
+        path = f"{filename}_{part}.{format}"
+        if format == "parquet":
+            tables.append(pq.read_table(path, memory_map=True))
+        else:
+            tables.append(pa.ipc.open_file(pa.memory_map(path, "r")).read_all())
+    return tables[0], tables[1]
+
+def read_network_arrow(filename, format="arrow"):
+    """
+    Read network data from columnar files and construct the network dictionary.
+    
+    Parameters:
+    - filename: Path prefix passed to save_to_arrow
+    - format: "arrow" or "parquet"
+    
+    Returns:
+    - Dictionary with the network structure, as returned by read_network_csv
+    """
+    papers_table, connections_table = read_network_tables(filename, format)
+    
+    columns = {name: papers_table.column(name).to_pylist() for name in papers_table.column_names}
+    network_data = {
+        "papers": {
+            paper_id: {
+                "title": title,
+                "authors": authors or [],
+                "year": year,
+                "venue": venue,
+                "url": url
+            }
+            for paper_id, title, authors, year, venue, url in zip(
+                columns["paper_id"], columns["title"], columns["authors"],
+                columns["year"], columns["venue"], columns["url"]
+            )
+        },
+        "connections": [
+            {"source": source, "target": target}
+            for source, target in zip(
+                connections_table.column("source").to_pylist(),
+                connections_table.column("target").to_pylist()
+            )
+        ]
+    }
+    
+    if "x" in columns:
+        for paper, x, y in zip(network_data["papers"].values(), columns["x"], columns["y"]):
+            paper["x"] = x
+            paper["y"] = y
+    
+    return network_data
+
+def _count_pairs(keys, counts, chunks):
+    """Merge the pair keys buffered in `chunks` into the sorted (keys, counts) totals."""
+    keys = np.concatenate([keys] + chunks)
+    counts = np.concatenate([counts, np.ones(len(keys) - len(counts), dtype=np.int64)])
+    keys, inverse = np.unique(keys, return_inverse=True)
+    return keys, np.bincount(inverse.ravel(), weights=counts, minlength=len(keys)).astype(np.int64)
+
+def extract_author_collaboration_network(citation_network, max_authors_per_paper=100, chunk_size=1000000):
+    """
+    Extract author collaboration network from citation network.
+    
+    Authors are interned to int IDs and the pairs of each paper are taken
+    from the upper triangle of its author list, encoded as one int64 key per
+    pair. Keys are buffered and summed with np.unique every `chunk_size`
+    pairs, so memory depends on the number of distinct pairs, not on the
+    number of papers, and papers can be streamed from an iterator.
+    
+    Parameters:
+    - citation_network: Dictionary with papers and connections, or an iterable
+      of (paper_id, paper_info) pairs, e.g. a generator over a large crawl
+    - max_authors_per_paper: Only the first authors of a paper are paired up,
+      so that papers with thousands of authors do not dominate (None: no cap)
+    - chunk_size: Number of pairs buffered before they are summed
+    
+    Returns a dictionary mapping author pairs to collaboration count.
+    """
+    if isinstance(citation_network, dict):
+        if not citation_network["papers"]:
+            print("WARNING: No papers in citation network, cannot extract author collaborations.")
+            return {
+                "collaborations": {},
+                "author_papers": {}
+            }
+        papers = citation_network["papers"].items()
+    else:
+        papers = citation_network
+    
+    author_ids = {}
+    author_papers = []
+    pair_indices = {}
+    keys = np.empty(0, dtype=np.int64)
+    counts = np.empty(0, dtype=np.int64)
+    chunks = []
+    buffered = 0
+    
+    for paper_id, paper_info in papers:
+        # Intern the paper's authors, skipping empty names and duplicates
+        ids = []
+        for author in paper_info["authors"] or []:
+            if not author:
+                continue
+            author_id = author_ids.get(author)
+            if author_id is None:
+                author_id = author_ids[author] = len(author_papers)
+                author_papers.append([])
+            if not author_papers[author_id] or author_papers[author_id][-1] != paper_id:
+                author_papers[author_id].append(paper_id)
+                ids.append(author_id)
         
-        if not authors:
+        if max_authors_per_paper is not None:
+            ids = ids[:max_authors_per_paper]
+        if len(ids) < 2:
             continue
-            
-        # Record each author's papers
-        for author in authors:
-            if author:  # Skip empty authors
-                author_papers[author].append(paper_id)
-        
-        # Record collaborations within papers
-        for i in range(len(authors)):
-            for j in range(i+1, len(authors)):
-                # Skip if either author is empty
-                if not authors[i] or not authors[j]:
-                    continue
-                    
-                # Use tuple to ensure order doesn't matter
-                author_pair = tuple(sorted([authors[i], authors[j]]))
-                collaborations[author_pair] += 1
+        
+        # Record collaborations within papers, as (smaller ID, larger ID) keys
+        ids = np.array(ids, dtype=np.int64)
+        if len(ids) not in pair_indices:
+            pair_indices[len(ids)] = np.triu_indices(len(ids), 1)
+        first, second = pair_indices[len(ids)]
+        low = np.minimum(ids[first], ids[second])
+        high = np.maximum(ids[first], ids[second])
+        chunks.append((low << 32) | high)
+        buffered += len(low)
+        
+        if buffered >= chunk_size:
+            keys, counts = _count_pairs(keys, counts, chunks)
+            chunks = []
+            buffered = 0
+    
+    if chunks:
+        keys, counts = _count_pairs(keys, counts, chunks)
+    
+    # Pairs are keyed by author names in alphabetical order, as before interning
+    names = list(author_ids)
+    collaborations = {}
+    for low, high, count in zip((keys >> 32).tolist(), (keys & 0xFFFFFFFF).tolist(), counts.tolist()):
+        collaborations[tuple(sorted([names[low], names[high]]))] = count
     
     return {
-        "collaborations": dict(collaborations),
-        "author_papers": dict(author_papers)
+        "collaborations": collaborations,
+        "author_papers": dict(zip(names, author_papers))
     }
 
 def main():
-    # Example: U-Net paper ID on Semantic Scholar
-    paper_id = input("Enter the Semantic Scholar paper ID (or press Enter for U-Net example): ")
-    if not paper_id:
-        paper_id = "204e3073870fae3d05bcbc2f6a8e263d9b72e776"  # attention is all you need paper
-        #"627be67feb084f1266cfc36e5aed3c3e7e6ce5f0" # map reduce paper
-        #"4e9ec92a90c5d571d2f1d496f8df01f0a8f38596" # Bitcoin paper
-        #"6364fdaa0a0eccd823a779fcdd489173f938e91a"  # U-Net paper
-    
-    # Create client
-    client = SemanticScholarClient(max_retries=20, timeout=15, delay_between_requests=1)
-    
-    # Set parameters
-    max_depth = int(input("Enter maximum depth for citation network (default: 1): ") or 1)
-    direction = input("Build network based on 'references' or 'citations'? (default: citations): ") or "citations"
-    
-    # Build citation network
-    print(f"Building {direction} network for paper {paper_id} with depth {max_depth}...")
-    network_data = client.build_citation_network(paper_id, max_depth=max_depth, direction=direction)
+    parser = argparse.ArgumentParser(description="Build a citation network from the Semantic Scholar API.")
+    parser.add_argument("--checkpoint", metavar="JOURNAL",
+                        help="record crawl progress in JOURNAL so that an interrupted crawl can be resumed")
+    parser.add_argument("--resume", metavar="JOURNAL",
+                        help="continue the interrupted crawl recorded in JOURNAL")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    reporter = reporter_from_args(args)
+    
+    # Create client, reusing responses cached by earlier runs
+    client = SemanticScholarClient(max_retries=20, timeout=15, cache=ResponseCache.from_env())
+    
+    if args.resume:
+        header, _ = CrawlJournal.read(args.resume)
+        paper_id, direction = header["root"], header["direction"]
+        concurrency = int(input("Number of concurrent requests (default: 1): ") or 1)
+    else:
+        # Example: U-Net paper ID on Semantic Scholar
+        paper_id = input("Enter the Semantic Scholar paper ID (or press Enter for U-Net example): ")
+        if not paper_id:
+            paper_id = "204e3073870fae3d05bcbc2f6a8e263d9b72e776"  # attention is all you need paper
+            #"627be67feb084f1266cfc36e5aed3c3e7e6ce5f0" # map reduce paper
+            #"4e9ec92a90c5d571d2f1d496f8df01f0a8f38596" # Bitcoin paper
+            #"6364fdaa0a0eccd823a779fcdd489173f938e91a"  # U-Net paper
+        
+        # Set parameters
+        max_depth = int(input("Enter maximum depth for citation network (default: 1): ") or 1)
+        direction = input("Build network based on 'references' or 'citations'? (default: citations): ") or "citations"
+        
+        concurrency = int(input("Number of concurrent requests (default: 1): ") or 1)
+        
+        # Build citation network
+        print(f"Building {direction} network for paper {paper_id} with depth {max_depth}...")
+    
+    if reporter:
+        reporter.start()
+    try:
+        if args.resume:
+            network_data = client.resume_citation_network(args.resume, max_concurrency=concurrency)
+        elif concurrency > 1:
+            network_data = asyncio.run(client.build_citation_network_async(
+                paper_id, max_depth=max_depth, direction=direction,
+                max_concurrency=concurrency, journal_path=args.checkpoint
+            ))
+        else:
+            network_data = client.build_citation_network(
+                paper_id, max_depth=max_depth, direction=direction, journal_path=args.checkpoint
+            )
+    finally:
+        if reporter:
+            reporter.stop()
     
     # Check if we have valid data before proceeding
     if not network_data["papers"]:
@@ -532,7 +1074,10 @@ def main():
     author_network = client.extract_author_collaboration_network(network_data)
     
     # Choose output format
-    output_format = input("Save data as 'json' or 'csv'? (default: csv): ") or "csv"
+    output_format = input("Save data as 'json', 'csv', 'arrow' or 'parquet'? (default: csv): ") or "csv"
+    
+    # Precompute layout positions, exported as x/y columns
+    add_layout(network_data)
     
     # Save data
     base_filename = f"semantic_scholar_{paper_id}_{direction}"
@@ -541,6 +1086,8 @@ def main():
     if output_format.lower() == "json":
         save_to_json(network_data, f"{output_dir}{base_filename}_network.json")
         save_to_json(author_network, f"{output_dir}{base_filename}_author_network.json")
+    elif output_format.lower() in ["arrow", "parquet"]:
+        save_to_arrow(network_data, f"{output_dir}{base_filename}", format=output_format.lower())
     else:
         save_to_csv(network_data, f"{output_dir}{base_filename}")
     
@@ -0,0 +1,492 @@
+import argparse
+import ast
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paper_store.sqlite")
+
+# Outputs of the fetchers loaded by `ingest` when no path is given, relative to processing/
+DEFAULT_SOURCES = [
+    "trending/trending_cs_papers.json",
+    "scholar_api/cs_conference_journals.json",
+    "../website/src/data/archive/cs_conference_journals.csv",
+    "foundational/foundational_papers.json",
+    "../website/src/data/subfields"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id TEXT PRIMARY KEY,
+    title TEXT,
+    abstract TEXT,
+    year INTEGER,
+    venue TEXT,
+    url TEXT,
+    citation_count INTEGER,
+    influential_citation_count INTEGER,
+    fields_of_study TEXT,
+    publication_types TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS papers_year ON papers (year);
+CREATE INDEX IF NOT EXISTS papers_venue ON papers (venue COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS papers_citations ON papers (citation_count);
+
+CREATE TABLE IF NOT EXISTS authors (
+    paper_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    author_id TEXT,
+    PRIMARY KEY (paper_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS authors_name ON authors (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS authors_id ON authors (author_id);
+
+CREATE TABLE IF NOT EXISTS edges (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    PRIMARY KEY (source, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target, source);
+
+CREATE TABLE IF NOT EXISTS datasets (
+    paper_id TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    PRIMARY KEY (paper_id, dataset)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS datasets_dataset ON datasets (dataset);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, abstract, content='papers', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts (rowid, title, abstract) VALUES (new.rowid, new.title, new.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstract) VALUES ('delete', old.rowid, old.title, old.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, abstract ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstract) VALUES ('delete', old.rowid, old.title, old.abstract);
+    INSERT INTO papers_fts (rowid, title, abstract) VALUES (new.rowid, new.title, new.abstract);
+END;
+"""
+
+# New values replace stored ones, except missing values, which never erase what an earlier harvest found
+UPSERT_PAPER = """
+INSERT INTO papers (paper_id, title, abstract, year, venue, url, citation_count, influential_citation_count,
+                    fields_of_study, publication_types, updated)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (paper_id) DO UPDATE SET
+    title = COALESCE(excluded.title, title),
+    abstract = COALESCE(excluded.abstract, abstract),
+    year = COALESCE(excluded.year, year),
+    venue = COALESCE(excluded.venue, venue),
+    url = COALESCE(excluded.url, url),
+    citation_count = COALESCE(excluded.citation_count, citation_count),
+    influential_citation_count = COALESCE(excluded.influential_citation_count, influential_citation_count),
+    fields_of_study = COALESCE(excluded.fields_of_study, fields_of_study),
+    publication_types = COALESCE(excluded.publication_types, publication_types),
+    updated = excluded.updated
+"""
+
+UPSERT_AUTHOR = """
+INSERT INTO authors (paper_id, position, name, author_id) VALUES (?, ?, ?, ?)
+ON CONFLICT (paper_id, position) DO UPDATE SET
+    author_id = CASE WHEN excluded.name = name THEN COALESCE(excluded.author_id, author_id) ELSE excluded.author_id END,
+    name = excluded.name
+"""
+
+class PaperStore:
+    """
+    Local SQLite store of every harvested paper, its authors and its citation edges.
+
+    Papers from all fetchers are merged by Semantic Scholar paper ID, and the
+    datasets table records which harvests each paper appeared in. Papers are
+    indexed by ID, year, venue and citation count, authors by name and
+    author ID, edges in both directions, and titles and abstracts by an FTS5
+    index kept in sync by triggers.
+
+    Writes go through the bulk upsert methods, which take one transaction per
+    call. The store can be shared between threads of the same process.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) if os.path.dirname(path) else '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, statements):
+        """Run (sql, rows) pairs with executemany in a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for sql, rows in statements:
+                    if rows:
+                        self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def upsert_papers(self, records, dataset=None):
+        """
+        Insert or update papers given as Semantic Scholar API records.
+
+        Records need a "paperId" (or "paper_id"). Authors may be API author
+        objects or plain names. A record's author list replaces the stored one
+        when it has any, keeping the author IDs known from earlier harvests.
+        When a paper comes several times, its fields are merged in order and
+        the last author list wins. Papers without an ID are skipped.
+
+        Args:
+            records: Iterable of paper records, e.g. the output of fetch_trending_cs_papers
+            dataset: Optional name of the harvest, recorded in the datasets table
+
+        Returns:
+            Number of papers written
+        """
+        now = time.time()
+        papers, memberships = [], []
+        author_lists = {}  # paper ID -> author rows of its last record that has any
+        for record in records:
+            row = _paper_row(record)
+            if row is None:
+                continue
+            papers.append(row + (now,))
+            paper_authors = _author_rows(row[0], record.get("authors"))
+            if paper_authors:
+                author_lists[row[0]] = paper_authors
+            if dataset:
+                memberships.append((row[0], dataset))
+
+        # One author list per paper, or the trimming DELETE of a shorter duplicate
+        # would drop authors upserted for a longer one
+        authors = [author for paper_authors in author_lists.values() for author in paper_authors]
+        replaced = [(paper_id, len(paper_authors)) for paper_id, paper_authors in author_lists.items()]
+
+        self._write([
+            (UPSERT_PAPER, papers),
+            (UPSERT_AUTHOR, authors),
+            ("DELETE FROM authors WHERE paper_id = ? AND position >= ?", replaced),
+            ("INSERT OR IGNORE INTO datasets (paper_id, dataset) VALUES (?, ?)", memberships)
+        ])
+        return len(papers)
+
+    def upsert_edges(self, connections):
+        """Insert citation edges given as {"source", "target"} dicts; returns how many were given."""
+        edges = [(connection["source"], connection["target"]) for connection in connections
+                 if connection.get("source") and connection.get("target")]
+        self._write([("INSERT OR IGNORE INTO edges (source, target) VALUES (?, ?)", edges)])
+        return len(edges)
+
+    def upsert_network(self, network_data, dataset=None):
+        """
+        Insert or update a crawled network in the {"papers", "connections"} format.
+
+        Returns:
+            (papers, edges) counts
+        """
+        records = (dict(info, paperId=paper_id) for paper_id, info in network_data["papers"].items())
+        return self.upsert_papers(records, dataset), self.upsert_edges(network_data["connections"])
+
+    def get_paper(self, paper_id):
+        """Return a paper with its authors and datasets, or None if it is not stored."""
+        rows = self._query("SELECT * FROM papers WHERE paper_id = ?", (paper_id,))
+        if not rows:
+            return None
+        paper = _paper_dict(rows[0])
+        paper["authors"] = [row["name"] for row in self._query(
+            "SELECT name FROM authors WHERE paper_id = ? ORDER BY position", (paper_id,)
+        )]
+        paper["datasets"] = [row["dataset"] for row in self._query(
+            "SELECT dataset FROM datasets WHERE paper_id = ? ORDER BY dataset", (paper_id,)
+        )]
+        return paper
+
+    def papers_by_author(self, name=None, author_id=None, limit=None):
+        """
+        Return the papers of an author, most cited first, with the datasets they appear in.
+
+        Args:
+            name: Author name, matched case-insensitively
+            author_id: Semantic Scholar author ID, used instead of the name if given
+            limit: Optional maximum number of papers
+        """
+        column, value = ("author_id", author_id) if author_id else ("name", name)
+        collate = " COLLATE NOCASE" if column == "name" else ""
+        sql = (f"SELECT p.*, (SELECT group_concat(dataset, ';') FROM datasets d WHERE d.paper_id = p.paper_id) AS datasets "
+               f"FROM papers p WHERE p.paper_id IN (SELECT paper_id FROM authors WHERE {column} = ?{collate}) "
+               f"ORDER BY p.citation_count DESC, p.year DESC")
+        params = [value]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [_paper_dict(row, split_datasets=True) for row in self._query(sql, params)]
+
+    def search(self, text, limit=20, year_range=None, venue=None, raw=False):
+        """
+        Full-text search over titles and abstracts, best matches first.
+
+        Args:
+            text: Words that must all appear, or an FTS5 query if `raw`
+            limit: Maximum number of results
+            year_range: Optional (start_year, end_year) filter, both inclusive
+            venue: Optional venue filter, case-insensitive
+            raw: Pass `text` to FTS5 as it is, to use its operators (OR, NEAR, prefix*, column:)
+
+        Returns:
+            List of papers, each with its bm25 "rank" (lower is better)
+        """
+        query = text if raw else " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+        if not query:
+            return []
+        sql = ("SELECT p.*, bm25(papers_fts) AS rank FROM papers_fts "
+               "JOIN papers p ON p.rowid = papers_fts.rowid WHERE papers_fts MATCH ?")
+        params = [query]
+        sql, params = _add_filters(sql, params, year_range, venue)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return [_paper_dict(row) for row in self._query(sql, params)]
+
+    def query(self, year_range=None, venue=None, dataset=None, min_citations=None, limit=100):
+        """Return papers matching the given filters, most cited first."""
+        sql = "SELECT p.* FROM papers p WHERE 1"
+        params = []
+        sql, params = _add_filters(sql, params, year_range, venue)
+        if dataset:
+            sql += " AND p.paper_id IN (SELECT paper_id FROM datasets WHERE dataset = ?)"
+            params.append(dataset)
+        if min_citations is not None:
+            sql += " AND p.citation_count >= ?"
+            params.append(min_citations)
+        sql += " ORDER BY p.citation_count DESC LIMIT ?"
+        params.append(limit)
+        return [_paper_dict(row) for row in self._query(sql, params)]
+
+    def references(self, paper_id):
+        """IDs of the papers a paper cites, as far as the crawls saw them."""
+        return [row["target"] for row in self._query("SELECT target FROM edges WHERE source = ?", (paper_id,))]
+
+    def citations(self, paper_id):
+        """IDs of the papers citing a paper, as far as the crawls saw them."""
+        return [row["source"] for row in self._query("SELECT source FROM edges WHERE target = ?", (paper_id,))]
+
+    def to_network(self):
+        """Return the whole store as a {"papers", "connections"} network dictionary."""
+        papers = {row["paper_id"]: {"title": row["title"], "authors": [], "year": row["year"],
+                                    "venue": row["venue"], "url": row["url"]}
+                  for row in self._query("SELECT paper_id, title, year, venue, url FROM papers")}
+        for row in self._query("SELECT paper_id, name FROM authors ORDER BY paper_id, position"):
+            papers[row["paper_id"]]["authors"].append(row["name"])
+        connections = self._query("SELECT source, target FROM edges")
+        return {"papers": papers, "connections": connections}
+
+    def stats(self):
+        """Return the row counts of the store and the number of papers of each dataset."""
+        counts = {table: self._query(f"SELECT COUNT(*) AS n FROM {table}")[0]["n"]
+                  for table in ["papers", "authors", "edges"]}
+        counts["datasets"] = {row["dataset"]: row["n"] for row in self._query(
+            "SELECT dataset, COUNT(*) AS n FROM datasets GROUP BY dataset ORDER BY dataset"
+        )}
+        return counts
+
+def _add_filters(sql, params, year_range, venue):
+    if year_range:
+        sql += " AND p.year BETWEEN ? AND ?"
+        params.extend(year_range)
+    if venue:
+        sql += " AND p.venue = ? COLLATE NOCASE"
+        params.append(venue)
+    return sql, params
+
+def _int_or_none(value):
+    try:
+        return int(float(value)) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+def _text_or_none(value):
+    return value if isinstance(value, str) and value else None
+
+def _json_or_none(value):
+    return json.dumps(value, ensure_ascii=False) if value else None
+
+def _paper_row(record):
+    """Map an API-style record onto the columns of the papers table, or None if it has no ID."""
+    paper_id = record.get("paperId") or record.get("paper_id")
+    if not paper_id:
+        return None
+    return (
+        paper_id,
+        _text_or_none(record.get("title")),
+        # Foundational papers carry a hand-written summary instead of the abstract
+        _text_or_none(record.get("abstract")) or _text_or_none(record.get("summary")),
+        _int_or_none(record.get("year")),
+        _text_or_none(record.get("venue")),
+        _text_or_none(record.get("url")),
+        _int_or_none(record.get("citationCount")),
+        _int_or_none(record.get("influentialCitationCount")),
+        _json_or_none(record.get("fieldsOfStudy")),
+        _json_or_none(record.get("publicationTypes"))
+    )
+
+def _author_rows(paper_id, authors):
+    rows = []
+    for position, author in enumerate(authors or []):
+        if isinstance(author, dict):
+            name, author_id = author.get("name"), author.get("authorId")
+        else:
+            name, author_id = author, None
+        if name:
+            rows.append((paper_id, position, name, author_id))
+    return rows
+
+def _paper_dict(row, split_datasets=False):
+    paper = dict(row)
+    for column in ["fields_of_study", "publication_types"]:
+        if paper.get(column):
+            paper[column] = json.loads(paper[column])
+    if split_datasets:
+        paper["datasets"] = paper["datasets"].split(";") if paper.get("datasets") else []
+    paper.pop("updated", None)
+    return paper
+
+def read_api_csv(path):
+    """
+    Read paper records from a CSV written by pandas from API records, like cs_conference_journals.csv.
+
+    pandas writes nested values with their Python repr, so list and dict
+    columns are parsed back with ast.literal_eval.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            for column in ["authors", "fieldsOfStudy", "publicationTypes"]:
+                value = row.get(column)
+                if value and value[0] in "[{":
+                    try:
+                        row[column] = ast.literal_eval(value)
+                    except (ValueError, SyntaxError):
+                        row[column] = None
+            yield row
+
+def ingest(store, path, dataset=None):
+    """
+    Load the output of any fetcher into the store, recognised by its format.
+
+    - a directory holding papers.csv and connections.csv (a subfield), or
+      whose subdirectories do (all subfields, each its own dataset)
+    - a JSON list of paper records, or a JSON network with "papers" and "connections"
+    - a JSON-lines file of paper records, as written by the bulk harvesters
+    - a CSV of paper records with a paperId column
+
+    Args:
+        store: PaperStore to write to
+        path: File or directory to load
+        dataset: Dataset name (default: the file name, or the subfield directory name)
+
+    Returns:
+        Dictionary mapping each loaded dataset to its (papers, edges) counts
+    """
+    # Imported here, network_citations pulls in the plotting libraries
+    from network_citations import read_network_csv
+    from bulk_search import read_jsonl
+
+    name = dataset or os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+    if os.path.isdir(path):
+        if os.path.exists(os.path.join(path, "papers.csv")):
+            network = read_network_csv(os.path.join(path, "papers.csv"), os.path.join(path, "connections.csv"))
+            return {name: store.upsert_network(network, name)}
+        loaded = {}
+        for child in sorted(os.listdir(path)):
+            if os.path.exists(os.path.join(path, child, "papers.csv")):
+                loaded.update(ingest(store, os.path.join(path, child), f"{name}/{child}"))
+        return loaded
+
+    if path.endswith(".jsonl"):
+        return {name: (store.upsert_papers(read_jsonl(path), name), 0)}
+    if path.endswith(".csv"):
+        return {name: (store.upsert_papers(read_api_csv(path), name), 0)}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "papers" in data:
+        return {name: store.upsert_network(data, name)}
+    return {name: (store.upsert_papers(data, name), 0)}
+
+def print_papers(papers):
+    for paper in papers:
+        venue = f", {paper['venue']}" if paper.get("venue") else ""
+        citations = f", {paper['citation_count']} citations" if paper.get("citation_count") is not None else ""
+        datasets = f"  [{', '.join(paper['datasets'])}]" if paper.get("datasets") else ""
+        print(f"{paper['paper_id']}  {paper.get('title')} ({paper.get('year')}{venue}{citations}){datasets}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local indexed store of every harvested paper.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="SQLite file of the store")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="load fetcher outputs into the store")
+    ingest_parser.add_argument("paths", nargs="*", help="files or directories to load (default: every known harvest)")
+    ingest_parser.add_argument("--dataset", help="dataset name, when loading a single path")
+
+    search_parser = commands.add_parser("search", help="full-text search over titles and abstracts")
+    search_parser.add_argument("text")
+    search_parser.add_argument("--limit", type=int, default=20)
+    search_parser.add_argument("--raw", action="store_true", help="pass the text to FTS5 as a query")
+
+    author_parser = commands.add_parser("author", help="papers of an author across all datasets")
+    author_parser.add_argument("name")
+
+    paper_parser = commands.add_parser("paper", help="show a paper with its authors, datasets and edges")
+    paper_parser.add_argument("paper_id")
+
+    commands.add_parser("stats", help="row counts of the store")
+    args = parser.parse_args()
+
+    with PaperStore(args.store) as store:
+        if args.command == "ingest":
+            here = os.path.dirname(os.path.abspath(__file__))
+            paths = args.paths or [os.path.join(here, source) for source in DEFAULT_SOURCES]
+            for path in paths:
+                if not os.path.exists(path):
+                    print(f"WARNING: {path} does not exist, skipping")
+                    continue
+                start = time.perf_counter()
+                for name, (papers, edges) in ingest(store, path, args.dataset).items():
+                    print(f"{name}: {papers} papers, {edges} edges")
+                print(f"Loaded {path} in {time.perf_counter() - start:.1f}s")
+        elif args.command == "search":
+            print_papers(store.search(args.text, args.limit, raw=args.raw))
+        elif args.command == "author":
+            print_papers(store.papers_by_author(args.name))
+        elif args.command == "paper":
+            paper = store.get_paper(args.paper_id)
+            if paper is None:
+                print(f"Paper {args.paper_id} is not in the store")
+            else:
+                paper["references"] = store.references(args.paper_id)
+                paper["citations"] = store.citations(args.paper_id)
+                print(json.dumps(paper, indent=2, ensure_ascii=False))
+        else:
+            print(json.dumps(store.stats(), indent=2))
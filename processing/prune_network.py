@@ -0,0 +1,104 @@
+import argparse
+
+import numpy as np
+
+from citation_graph import CitationGraph
+from network_citations import read_network_csv, save_to_csv, save_to_arrow
+
+RANKINGS = ["in_degree", "pagerank", "recency"]
+
+def paper_scores(graph, network_data, by="in_degree"):
+    """
+    Score the crawled papers of a graph, higher is better.
+
+    Parameters:
+    - graph: CitationGraph built from network_data
+    - network_data: Dictionary with papers and connections
+    - by: "in_degree" (citations inside the crawl), "pagerank" or "recency" (publication year)
+
+    Returns:
+    - Float array with one score per crawled paper, in network_data["papers"] order
+    """
+    paper_count = len(network_data["papers"])
+    if by == "in_degree":
+        return graph.in_degree()[:paper_count].astype(np.float64)
+    if by == "pagerank":
+        return graph.pagerank()[:paper_count]
+    if by == "recency":
+        return np.array(
+            [paper["year"] if paper["year"] is not None else -np.inf for paper in network_data["papers"].values()],
+            dtype=np.float64
+        )
+    raise ValueError(f"Ranking must be one of {', '.join(RANKINGS)}")
+
+def top_k(scores, k):
+    """Indexes of the k highest scores, best first, ties broken by position. O(n + k log k) with argpartition."""
+    if k >= len(scores):
+        candidates = np.arange(len(scores))
+    else:
+        # Take every paper tied with the k-th score, so the tie break below sees the whole group
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= kth)
+    return candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+
+def prune_network(network_data, k, by="in_degree", root_paper_id=None):
+    """
+    Keep the k best crawled papers and the citations between them.
+
+    The root paper is always kept, on top of the k selected papers if it was
+    not among them. Papers keep their original order, so the root stays
+    first when it was first.
+
+    Parameters:
+    - network_data: Dictionary with papers and connections
+    - k: Number of papers to keep
+    - by: Ranking used to select the papers, see paper_scores
+    - root_paper_id: Paper to keep in any case (default: the first paper)
+
+    Returns:
+    - Dictionary with the network structure, restricted to the selected papers
+    """
+    if not network_data["papers"]:
+        return {"papers": {}, "connections": []}
+
+    graph = CitationGraph.from_network(network_data)
+    paper_count = len(network_data["papers"])
+
+    keep = np.zeros(graph.node_count, dtype=bool)
+    keep[top_k(paper_scores(graph, network_data, by), k)] = True
+    keep[graph.index_of(root_paper_id) if root_paper_id is not None else 0] = True
+
+    # Induced subgraph, selected in one pass over the edge arrays
+    sources, targets = graph.edges()
+    induced = keep[sources] & keep[targets]
+    paper_ids = graph.paper_ids
+
+    print(f"Kept {int(keep.sum())} of {paper_count} papers and {int(induced.sum())} of {graph.edge_count} connections")
+    return {
+        "papers": {
+            paper_ids[i]: network_data["papers"][paper_ids[i]]
+            for i in np.flatnonzero(keep[:paper_count]).tolist()
+        },
+        "connections": [
+            {"source": paper_ids[source], "target": paper_ids[target]}
+            for source, target in zip(sources[induced].tolist(), targets[induced].tolist())
+        ]
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the top-k papers of a citation crawl and the citations between them.")
+    parser.add_argument("papers_csv", help="papers CSV written by save_to_csv")
+    parser.add_argument("connections_csv", help="connections CSV written by save_to_csv")
+    parser.add_argument("output", help="output path prefix, as for save_to_csv")
+    parser.add_argument("-k", "--top-k", type=int, default=500, help="number of papers to keep (default: 500)")
+    parser.add_argument("--by", choices=RANKINGS, default="in_degree", help="ranking used to select papers")
+    parser.add_argument("--root", default=None, help="paper ID to keep in any case (default: the first paper)")
+    parser.add_argument("--format", choices=["csv", "arrow", "parquet"], default="csv", help="output format")
+    args = parser.parse_args()
+
+    network_data = read_network_csv(args.papers_csv, args.connections_csv)
+    pruned = prune_network(network_data, args.top_k, by=args.by, root_paper_id=args.root)
+    if args.format == "csv":
+        save_to_csv(pruned, args.output)
+    else:
+        save_to_arrow(pruned, args.output, format=args.format)
@@ -0,0 +1,337 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from crawl_metrics import (
+    REQUESTS, RETRIES, THROTTLED, RESPONSE_BYTES, REQUEST_SECONDS, WAIT_SECONDS, shared_metrics
+)
+
+# Root of the Semantic Scholar Graph API, overridable with S2_API_BASE (e.g. to run against a local mock server)
+API_BASE = os.environ.get("S2_API_BASE", "https://api.semanticscholar.org/graph/v1").rstrip("/")
+
+class TokenBucket:
+    """
+    Adaptive token bucket shared by every request sent to an API.
+
+    Tokens refill at `rate` per second and up to `burst` requests may start
+    back to back. The bucket is implemented with virtual scheduling: each
+    caller reserves the next free slot under a lock and then sleeps until it,
+    so the same bucket can be shared by many threads. Asyncio crawls draw
+    from it in executor threads.
+
+    The rate adapts to the server: a 429 halves it and honours Retry-After by
+    pausing every caller, while each success raises it again by `increase`,
+    up to `max_rate`.
+    """
+
+    def __init__(self, rate=1.0, burst=1, min_rate=0.05, max_rate=None, increase=0.05):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.increase = increase
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    def _reserve(self):
+        """Reserve the next request slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now, self._paused_until)
+            self._next_slot = slot + 1.0 / self.rate
+            # Up to `burst` slots may be handed out ahead of time
+            wait = max(slot - now - (self.burst - 1) / self.rate, self._paused_until - now, 0.0)
+        return wait
+
+    def acquire(self):
+        """Block the calling thread until a request may start."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttled(self, retry_after=None):
+        """Slow down after a 429, pausing all callers for `retry_after` seconds if the server asked for it."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+class CircuitOpen(Exception):
+    """Raised when a request is refused because its circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Stops traffic to a failing server.
+
+    After `failure_threshold` consecutive 5xx responses or connection errors
+    the circuit opens and callers wait for `cooldown` seconds. Then a single
+    trial request is let through: success closes the circuit again, failure
+    reopens it with a doubled cooldown (capped at `max_cooldown`). Once the
+    cooldown would exceed `max_cooldown`, waiting callers get CircuitOpen so
+    that long outages end the run instead of stalling it forever.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30, max_cooldown=600):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._cooldown = cooldown
+        self._opened_at = None
+        self._probing = False
+
+    def before_request(self):
+        """Return how long the caller must wait before sending, or 0 if it may go now."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            if self._cooldown > self.max_cooldown:
+                raise CircuitOpen(f"Server kept failing for more than {self.max_cooldown} seconds")
+            remaining = self._opened_at + self._cooldown - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self._probing:
+                return 1.0  # Another caller is sending the trial request
+            self._probing = True
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._cooldown = self.base_cooldown
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing:
+                self._probing = False
+                self._cooldown *= 2
+                self._opened_at = time.monotonic()
+            elif self._opened_at is None and self._failures >= self.failure_threshold:
+                print(f"WARNING: {self._failures} server errors in a row, pausing requests for {self._cooldown} seconds")
+                self._opened_at = time.monotonic()
+
+_shared_limiter = None
+_shared_breaker = None
+_shared_lock = threading.Lock()
+
+def shared_limiter():
+    """Return the process-wide bucket used by every Semantic Scholar fetcher (1 request per second)."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucket(rate=1.0)
+        return _shared_limiter
+
+def shared_breaker():
+    """Return the process-wide circuit breaker used by every Semantic Scholar fetcher."""
+    global _shared_breaker
+    with _shared_lock:
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker()
+        return _shared_breaker
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Full-jitter exponential backoff: a random delay below min(cap, base * 2**attempt)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def parse_retry_after(value):
+    """Return the delay in seconds asked for by a Retry-After header, or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def request_json(session, method, url, params=None, json_body=None, headers=None, limiter=None, breaker=None,
+                 max_retries=5, timeout=30, cache=None, not_found=None):
+    """
+    Send an API request through the shared rate limiter and return the decoded JSON.
+
+    - 429 responses slow the limiter down, honour Retry-After and are retried
+    - 5xx responses and connection errors feed the circuit breaker and are
+      retried after a jittered exponential backoff
+    - 404 and other 4xx responses are not retried
+
+    Args:
+        session: requests.Session or the requests module
+        method: HTTP method
+        url: Request URL
+        params: Optional query parameters
+        json_body: Optional JSON body
+        headers: Optional request headers
+        limiter: TokenBucket to draw from (default: shared_limiter())
+        breaker: CircuitBreaker to report to (default: shared_breaker())
+        max_retries: Maximum number of attempts
+        timeout: Timeout of each attempt in seconds
+        cache: Optional ResponseCache consulted before and filled after the request
+        not_found: Value returned for 404 responses, to tell them apart from failures
+
+    Returns:
+        Decoded JSON response, or None if the request failed
+
+    Raises:
+        CacheMiss: In cache-only mode, when the response is not cached
+        CircuitOpen: When the server has been failing for too long
+    """
+    limiter = limiter or shared_limiter()
+    breaker = breaker or shared_breaker()
+    metrics = shared_metrics()
+
+    if cache:
+        cached = cache.get(method, url, params, json_body)
+        if cached is not None:
+            return cached
+
+    for attempt in range(max_retries):
+        # Phase timings are only taken when metrics are collected
+        timer = _RequestTimer(metrics, method, url, attempt) if metrics.enabled else None
+
+        wait = breaker.before_request()
+        while wait > 0:
+            time.sleep(wait)
+            if timer:
+                timer.add("breaker", wait)
+            wait = breaker.before_request()
+        wait = limiter.acquire()
+        if timer:
+            timer.add("rate_limit", wait)
+            timer.start()
+
+        try:
+            response = session.request(method, url, params=params, json=json_body, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            breaker.record_failure()
+            delay = backoff_delay(attempt)
+            if timer:
+                timer.finish("error", retry="connection_error", backoff=delay)
+            print(f"Attempt {attempt + 1} failed: {e}. Retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+            continue
+        if timer:
+            timer.stop("http", len(response.content))
+
+        if response.status_code == 429:
+            breaker.record_success()  # The server is up, only busy
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            limiter.on_throttled(retry_after)
+            # Without a usable Retry-After the limiter has nothing to wait for, so back off here
+            delay = backoff_delay(attempt) if retry_after is None else 0.0
+            if timer:
+                timer.finish(429, retry="throttled", backoff=delay)
+            print(f"Attempt {attempt + 1} rate limited, slowing down to {limiter.rate:.2f} requests/s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+            delay = backoff_delay(attempt)
+            if timer:
+                timer.finish(response.status_code, retry="server_error", backoff=delay)
+            print(f"Attempt {attempt + 1} failed with HTTP {response.status_code}. Retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+            continue
+
+        breaker.record_success()
+        if response.status_code >= 400:
+            if timer:
+                timer.finish(response.status_code)
+            if response.status_code == 404:
+                return not_found
+            print(f"Request to {url} rejected with HTTP {response.status_code}: {response.text[:200]}")
+            return None
+
+        if timer:
+            timer.start()
+        try:
+            data = response.json()
+        except ValueError as e:
+            delay = backoff_delay(attempt)
+            if timer:
+                timer.stop("parse")
+                timer.finish(response.status_code, retry="invalid_json", backoff=delay)
+            print(f"Attempt {attempt + 1} returned invalid JSON: {e}. Retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+            continue
+        if timer:
+            timer.stop("parse")
+            timer.finish(response.status_code)
+
+        limiter.on_success()
+        if cache:
+            cache.set(method, url, params, json_body, data)
+        return data
+
+    print(f"Failed to fetch {url} after {max_retries} attempts")
+    return None
+
+class _RequestTimer:
+    """
+    Times the phases of one request attempt for request_json and reports them to the metrics.
+
+    The phases are the circuit breaker and rate limiter waits, the HTTP round
+    trip, JSON parsing and the backoff before a retry. finish() counts the
+    attempt and, when tracing, writes it as a span.
+    """
+
+    def __init__(self, metrics, method, url, attempt):
+        self.metrics = metrics
+        self.method = method.upper()
+        self.url = url
+        self.attempt = attempt
+        self.started = time.time()
+        self.phases = {}
+        self.size = 0
+        self._phase_start = None
+
+    def add(self, phase, seconds):
+        if seconds > 0:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def start(self):
+        self._phase_start = time.perf_counter()
+
+    def stop(self, phase, size=0):
+        self.add(phase, time.perf_counter() - self._phase_start)
+        self.size += size
+
+    def finish(self, status, retry=None, backoff=0.0):
+        if status == "error":
+            self.stop("http")
+        self.add("backoff", backoff)
+        metrics = self.metrics
+        metrics.inc(REQUESTS, method=self.method, status=status)
+        if "http" in self.phases:
+            metrics.observe(REQUEST_SECONDS, self.phases["http"], method=self.method)
+        if self.size:
+            metrics.inc(RESPONSE_BYTES, self.size)
+        if status == 429:
+            metrics.inc(THROTTLED)
+        if retry:
+            metrics.inc(RETRIES, reason=retry)
+        for phase, seconds in self.phases.items():
+            metrics.inc(WAIT_SECONDS, seconds, phase=phase)
+        if metrics.tracing:
+            metrics.trace({
+                "start": round(self.started, 6), "method": self.method, "url": self.url, "attempt": self.attempt + 1,
+                "status": status, "bytes": self.size, "retry": retry,
+                "phases": {phase: round(seconds, 6) for phase, seconds in self.phases.items()}
+            })
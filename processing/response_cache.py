@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from crawl_metrics import CACHE_LOOKUPS, CACHE_BYTES, shared_metrics
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "responses.sqlite")
+
+class CacheMiss(Exception):
+    """Raised in cache-only mode when a request has no cached response."""
+
+class ResponseCache:
+    """
+    Persistent on-disk cache for JSON API responses.
+
+    Responses live in a single SQLite file and are keyed by a hash of the
+    request method, URL, query parameters and JSON body. Entries expire after
+    `ttl` seconds, and the least recently used entries are evicted once the
+    stored bodies exceed `max_bytes`. In cache-only mode a miss raises
+    CacheMiss instead of letting the caller go to the network.
+
+    The cache can be shared between threads of the same process.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=30 * 24 * 3600, max_bytes=2 * 1024 ** 3, cache_only=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.cache_only = cache_only
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) if os.path.dirname(path) else '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT, created REAL, accessed REAL, size INTEGER, body BLOB)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create the cache configured by environment variables, or None if caching is disabled.
+
+        - S2_NO_CACHE: disable the cache entirely
+        - S2_CACHE_PATH: location of the SQLite file
+        - S2_CACHE_TTL_DAYS: time to live of an entry in days (default: 30)
+        - S2_CACHE_MAX_MB: size cap of the stored responses in MB (default: 2048)
+        - S2_CACHE_ONLY: serve requests from the cache only, never from the network
+        """
+        if os.environ.get("S2_NO_CACHE"):
+            return None
+        return cls(
+            path=os.environ.get("S2_CACHE_PATH", DEFAULT_CACHE_PATH),
+            ttl=float(os.environ.get("S2_CACHE_TTL_DAYS", 30)) * 24 * 3600,
+            max_bytes=int(float(os.environ.get("S2_CACHE_MAX_MB", 2048)) * 1024 ** 2),
+            cache_only=bool(os.environ.get("S2_CACHE_ONLY"))
+        )
+
+    @staticmethod
+    def make_key(method, url, params=None, body=None):
+        """Content address of a request: a hash of its method, URL, parameters and body."""
+        if isinstance(params, dict):
+            params = sorted(
+                [key, [str(v) for v in value] if isinstance(value, (list, tuple)) else str(value)]
+                for key, value in params.items()
+            )
+        canonical = json.dumps([method.upper(), url, params, body], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, method, url, params=None, body=None):
+        """
+        Return the cached JSON response for a request, or None on a miss.
+
+        Expired entries count as misses. In cache-only mode a miss raises CacheMiss.
+        """
+        key = self.make_key(method, url, params, body)
+        now = time.time()
+
+        result = "miss"
+        with self._lock:
+            row = self._conn.execute("SELECT created, size, body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl is not None and now - row[0] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= row[1]
+                row = None
+                result = "expired"
+            if row:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                result = "hit"
+            else:
+                self.misses += 1
+        shared_metrics().inc(CACHE_LOOKUPS, result=result)
+
+        if row:
+            return json.loads(zlib.decompress(row[2]))
+        if self.cache_only:
+            raise CacheMiss(f"No cached response for {method.upper()} {url}")
+        return None
+
+    def set(self, method, url, params, body, data):
+        """Store the JSON response of a request, evicting old entries if the cache is full."""
+        key = self.make_key(method, url, params, body)
+        blob = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, created, accessed, size, body) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, now, now, len(blob), blob)
+            )
+            self._total_bytes += len(blob) - (previous[0] if previous else 0)
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                self._evict()
+        shared_metrics().inc(CACHE_BYTES, len(blob))
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back under 90% of its cap."""
+        target = self.max_bytes * 0.9
+        expired_before = time.time() - self.ttl if self.ttl is not None else None
+        if expired_before is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (expired_before,))
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if self._total_bytes - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._total_bytes -= freed
+
+    def stats(self):
+        """Return the number of entries, stored bytes and hit/miss counts of this session."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Shared helpers live in the parent processing/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from paper_store import PaperStore
+
+def _authors_after(tmp_path, records):
+    with PaperStore(str(tmp_path / "store.sqlite")) as store:
+        store.upsert_papers(records)
+        return store.get_paper("X")["authors"]
+
+def test_duplicate_paper_keeps_its_last_author_list(tmp_path):
+    records = [{"paperId": "X", "authors": ["a", "b"]}, {"paperId": "X", "authors": ["a", "b", "c", "d"]}]
+    assert _authors_after(tmp_path, records) == ["a", "b", "c", "d"]
+
+def test_duplicate_paper_with_a_shorter_last_author_list(tmp_path):
+    records = [{"paperId": "X", "authors": ["a", "b", "c"]}, {"paperId": "X", "authors": ["d"]}]
+    assert _authors_after(tmp_path, records) == ["d"]
+
+def test_duplicate_paper_without_authors_keeps_the_others(tmp_path):
+    records = [{"paperId": "X", "title": "T", "authors": ["a", "b"]}, {"paperId": "X", "authors": []}]
+    assert _authors_after(tmp_path, records) == ["a", "b"]
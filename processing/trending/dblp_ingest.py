@@ -0,0 +1,184 @@
+import argparse
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dblp_store")
+
+# Columns kept from the raw dump, the heavy references and inverted_index columns are never read
+PAPER_COLUMNS = ["id", "title", "year", "n_citation", "doc_type", "reference_count", "venue_id",
+                 "venue_name", "venue_type", "doi", "volume", "issue", "publisher"]
+AUTHOR_COLUMNS = ["author_name", "author_id", "author_org"]
+KEYWORD_COLUMNS = ["keyword", "weight"]
+NUMERIC_COLUMNS = ["year", "n_citation", "reference_count", "venue_id"]
+
+# Tables of the store, each partitioned by year
+TABLES = ["papers", "authors", "keywords"]
+
+def _explode(chunk, columns, name):
+    """
+    Explode parallel ";"-joined columns into one row per item, keeping the paper id, year and position.
+
+    The first column drives the explosion; the others are aligned with it on
+    (paper, position), and missing items become nulls.
+    """
+    def items(column):
+        exploded = chunk[column].str.split(";").explode().dropna()
+        position = exploded.groupby(level=0).cumcount()
+        # The dump spells some missing items "nan"
+        values = exploded.str.strip().replace({"": None, "nan": None})
+        return pd.Series(values.to_numpy(),
+                         index=pd.MultiIndex.from_arrays([exploded.index, position], names=["row", "position"]))
+
+    exploded = items(columns[0]).rename(name).to_frame()
+    for column in columns[1:]:
+        exploded[column] = items(column)
+    exploded = exploded.reset_index()
+    exploded = exploded[exploded[name].notna()]
+
+    rows = exploded.pop("row").to_numpy()
+    exploded.insert(0, "id", chunk["id"].to_numpy()[rows])
+    exploded.insert(1, "year", chunk["year"].to_numpy()[rows])
+    return exploded
+
+def split_chunk(chunk):
+    """Project a raw DBLP chunk on the papers table and normalise its authors and keywords into child tables."""
+    for column in NUMERIC_COLUMNS:
+        chunk[column] = pd.to_numeric(chunk[column], errors="coerce")
+    chunk["id"] = pd.to_numeric(chunk["id"], errors="coerce")
+    chunk = chunk.dropna(subset=["id", "year"])
+    chunk = chunk.astype({"id": "int64", "year": "int32"}).reset_index(drop=True)
+
+    authors = _explode(chunk, AUTHOR_COLUMNS, "author_name")
+    authors["author_id"] = pd.to_numeric(authors["author_id"], errors="coerce").astype("Int64")
+
+    keywords = _explode(chunk, KEYWORD_COLUMNS, "keyword")
+    keywords["weight"] = pd.to_numeric(keywords["weight"], errors="coerce")
+
+    return {
+        "papers": chunk[PAPER_COLUMNS],
+        "authors": authors,
+        "keywords": keywords
+    }
+
+def ingest(dblp_csv, store=STORE_DIR, chunksize=200000):
+    """
+    Stream the raw DBLP CSV dump once into a partitioned Parquet store.
+
+    Only the needed columns are read. Each chunk is written as one file per
+    year in every table, so memory is bounded by the chunk size:
+
+        store/papers/year=2015/part-00000-0.parquet   id, title, n_citation, venue...
+        store/authors/year=2015/...                   id, position, author_name, author_id, author_org
+        store/keywords/year=2015/...                  id, position, keyword, weight
+
+    Args:
+        dblp_csv: Path of the raw dump
+        store: Directory of the store, replaced once the whole dump is ingested
+        chunksize: Number of rows read at a time
+
+    Returns:
+        Number of papers ingested
+    """
+    if os.path.exists(store) and not is_store(store):
+        raise ValueError(f"{store} is not a DBLP store, refusing to replace it")
+
+    # Build the new store next to the old one, which stays readable until the swap
+    parent = os.path.dirname(os.path.abspath(store))
+    os.makedirs(parent, exist_ok=True)
+    building = tempfile.mkdtemp(prefix=".dblp_store-", dir=parent)
+    try:
+        total = _ingest_into(dblp_csv, building, chunksize)
+    except BaseException:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+
+    if os.path.exists(store):
+        old = building + ".old"
+        os.replace(store, old)
+        os.replace(building, store)
+        shutil.rmtree(old)
+    else:
+        os.replace(building, store)
+    return total
+
+def is_store(path):
+    """Whether a directory only holds the tables of a store, so that it is safe to replace."""
+    return os.path.isdir(path) and all(
+        name in TABLES and os.path.isdir(os.path.join(path, name)) for name in os.listdir(path)
+    )
+
+def _ingest_into(dblp_csv, store, chunksize):
+    total = 0
+    reader = pd.read_csv(dblp_csv, usecols=PAPER_COLUMNS + AUTHOR_COLUMNS + KEYWORD_COLUMNS,
+                         dtype=str, chunksize=chunksize)
+    for n, chunk in enumerate(reader):
+        tables = split_chunk(chunk)
+        for name in TABLES:
+            table = pa.Table.from_pandas(tables[name], preserve_index=False)
+            pq.write_to_dataset(
+                table, os.path.join(store, name), partition_cols=["year"],
+                basename_template=f"part-{n:05d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore"
+            )
+        total += len(tables["papers"])
+        print(f"Ingested {total} papers")
+
+    return total
+
+def open_table(name, store=STORE_DIR):
+    """Open a table of the store as a year-partitioned pyarrow dataset."""
+    return ds.dataset(os.path.join(store, name), format="parquet", partitioning="hive")
+
+def _row_filter(years=None, min_year=None, ids=None):
+    expression = None
+    conditions = []
+    if years is not None:
+        conditions.append(ds.field("year").isin(list(years)))
+    if min_year is not None:
+        conditions.append(ds.field("year") > min_year)
+    if ids is not None:
+        conditions.append(ds.field("id").isin(list(ids)))
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def store_years(store=STORE_DIR):
+    """Years present in the store, read from the partition directory names."""
+    return sorted(
+        int(name.split("=", 1)[1])
+        for name in os.listdir(os.path.join(store, "papers"))
+        if name.startswith("year=") and name.split("=", 1)[1].lstrip("-").isdigit()
+    )
+
+def iter_batches(name, columns=None, years=None, min_year=None, ids=None, store=STORE_DIR, batch_size=200000):
+    """
+    Stream a table of the store as DataFrames.
+
+    Only the requested columns are read, and partitions outside `years` or
+    not after `min_year` are skipped without being opened. `ids` restricts
+    the rows to the given paper ids.
+    """
+    dataset = open_table(name, store)
+    for batch in dataset.to_batches(columns=columns, filter=_row_filter(years, min_year, ids), batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+def read_table(name, columns=None, years=None, min_year=None, ids=None, store=STORE_DIR):
+    """Load the selected columns, partitions and paper ids of a table of the store into one DataFrame."""
+    dataset = open_table(name, store)
+    return dataset.to_table(columns=columns, filter=_row_filter(years, min_year, ids)).to_pandas()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest the DBLP CSV dump into a year-partitioned Parquet store.")
+    parser.add_argument("dblp_csv", help="raw DBLP CSV dump")
+    parser.add_argument("--store", default=STORE_DIR, help="directory of the Parquet store")
+    parser.add_argument("--chunksize", type=int, default=200000, help="rows read at a time")
+    args = parser.parse_args()
+
+    ingest(args.dblp_csv, args.store, args.chunksize)
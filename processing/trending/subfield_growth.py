@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dblp_ingest import STORE_DIR, read_table, store_years
+
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "website", "src", "data", "subfield_growth.json")
+
+# Overly general keywords that don't represent specific subfields
+GENERAL_TERMS = ['Computer science', 'Computer', 'Software', 'Computing',
+                 'Information technology', 'Engineering', 'Mathematics', 'Research']
+
+def count_keywords(chunks, min_year=2010):
+    """
+    Count papers and citations per year and keyword over a stream of DBLP rows.
+
+    Each chunk is exploded into one row per (paper, keyword) with vectorized
+    string operations and reduced with a single groupby, so memory depends on
+    the number of distinct (year, keyword) pairs, not on the number of papers.
+
+    Args:
+        chunks: Iterable of DataFrames with year, keyword (";"-joined) and n_citation columns
+        min_year: Only papers published after this year are counted
+
+    Returns:
+        Tuple of (papers per year Series, DataFrame indexed by (year, keyword) with papers, citations
+        and cited columns, cited counting the papers whose citation count is known)
+    """
+    year_totals = []
+    keyword_totals = []
+
+    for chunk in chunks:
+        chunk = chunk[chunk["year"] > min_year]
+        year_totals.append(chunk["year"].value_counts())
+
+        keywords = chunk["keyword"].dropna().astype(str).str.split(";").explode().str.strip()
+        keywords = keywords[keywords != ""]
+        keyword_totals.append(_reduce(pd.DataFrame({
+            "paper": keywords.index,
+            "year": chunk["year"].reindex(keywords.index).to_numpy(),
+            "keyword": keywords.to_numpy(),
+            "citations": chunk["n_citation"].reindex(keywords.index).to_numpy()
+        })))
+
+    return _combine(year_totals, keyword_totals)
+
+def count_store_keywords(store=STORE_DIR, min_year=2010):
+    """
+    Same as count_keywords, reading the Parquet store written by dblp_ingest.py.
+
+    Keywords are already exploded there. Years are processed one partition
+    at a time, and only the id, year, keyword and n_citation columns are read.
+    """
+    year_totals = [read_table("papers", columns=["year"], min_year=min_year, store=store)["year"].value_counts()]
+    keyword_totals = []
+
+    for year in store_years(store):
+        if year <= min_year:
+            continue
+        papers = read_table("papers", columns=["id", "n_citation"], years=[year], store=store)
+        keywords = read_table("keywords", columns=["id", "keyword"], years=[year], store=store)
+        keywords = keywords.merge(papers, on="id", how="left")
+        keyword_totals.append(_reduce(pd.DataFrame({
+            "paper": keywords["id"].to_numpy(),
+            "year": year,
+            "keyword": keywords["keyword"].to_numpy(),
+            "citations": keywords["n_citation"].to_numpy()
+        })))
+
+    return _combine(year_totals, keyword_totals)
+
+def _reduce(exploded):
+    """Papers, citations and cited papers per (year, keyword) of one (paper, year, keyword, citations) frame."""
+    return (
+        exploded.drop_duplicates(["paper", "keyword"])
+        .groupby(["year", "keyword"], sort=False)
+        .agg(papers=("paper", "size"), citations=("citations", "sum"), cited=("citations", "count"))
+    )
+
+def _combine(year_totals, keyword_totals):
+    """Sum the per-chunk counts of count_keywords."""
+    papers_per_year = pd.concat(year_totals).groupby(level=0).sum().sort_index()
+    if not keyword_totals:
+        return papers_per_year, pd.DataFrame(columns=["papers", "citations", "cited"])
+    counts = pd.concat(keyword_totals).groupby(level=[0, 1]).sum()
+    return papers_per_year, counts
+
+def subfield_growth(papers_per_year, counts, top_n=15, min_papers=100, window=3):
+    """
+    Compute the share, growth and citation impact of the most frequent subfields per year.
+
+    Args:
+        papers_per_year: Series of papers per year, from count_keywords
+        counts: (year, keyword) papers and citations, from count_keywords
+        top_n: Number of subfields to keep, general terms excluded
+        min_papers: Minimum papers per year to include the year
+        window: Window of the rolling mean used to smooth the shares
+
+    Returns:
+        Dictionary of year-indexed DataFrames with one column per subfield:
+        share (% of the year's papers), smooth, growth (% change of the share)
+        and avg_citations
+    """
+    keyword_counts = counts["papers"].groupby(level="keyword").sum().sort_values(ascending=False, kind="stable")
+    keyword_counts = keyword_counts[~keyword_counts.index.isin(GENERAL_TERMS)]
+    top_keywords = keyword_counts.head(top_n).index.tolist()
+
+    years = papers_per_year[papers_per_year >= min_papers].index.sort_values()
+    top = counts[counts.index.get_level_values("keyword").isin(top_keywords)]
+    papers = top["papers"].unstack("keyword").reindex(index=years, columns=top_keywords).fillna(0)
+    citations = top["citations"].unstack("keyword").reindex(index=years, columns=top_keywords).fillna(0)
+    cited = top["cited"].unstack("keyword").reindex(index=years, columns=top_keywords).fillna(0)
+
+    share = papers.div(papers_per_year.reindex(years), axis=0) * 100
+    return {
+        "share": share,
+        "smooth": share.rolling(window=window, min_periods=1).mean(),
+        "growth": share.pct_change() * 100,
+        # Averaged over the papers with a citation count, like Series.mean() skipping missing values
+        "avg_citations": (citations / cited.replace(0, np.nan)).fillna(0)
+    }
+
+def to_json(growth):
+    """Serialise the shares in the {"years", "subfields": {keyword: {"raw", "smooth"}}} schema read by the website."""
+    share, smooth = growth["share"], growth["smooth"]
+    return {
+        "years": [float(year) for year in share.index],
+        "subfields": {
+            keyword: {
+                "raw": share[keyword].tolist(),
+                "smooth": smooth[keyword].tolist()
+            }
+            for keyword in share.columns
+        }
+    }
+
+def read_dblp_csv(filename, chunksize=200000):
+    """Stream the year, keyword and n_citation columns of the DBLP CSV dump in chunks."""
+    return pd.read_csv(filename, usecols=["year", "keyword", "n_citation"], chunksize=chunksize,
+                       dtype={"keyword": str})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute the growth of CS subfields from the DBLP dump.")
+    parser.add_argument("dblp_csv", nargs="?", help="DBLP CSV dump with year, keyword and n_citation columns")
+    parser.add_argument("--store", nargs="?", const=STORE_DIR, default=None,
+                        help="read the Parquet store written by dblp_ingest.py instead of the CSV dump")
+    parser.add_argument("-o", "--output", default=OUTPUT_FILE, help="output JSON file (default: the website data)")
+    parser.add_argument("--metrics", metavar="CSV",
+                        help="also save the per-year shares, growth rates and average citations to this CSV")
+    parser.add_argument("--min-year", type=int, default=2010, help="only count papers published after this year")
+    parser.add_argument("--top", type=int, default=15, help="number of subfields (default: 15)")
+    parser.add_argument("--chunksize", type=int, default=200000, help="rows read at a time")
+    args = parser.parse_args()
+    if not args.dblp_csv and not args.store:
+        parser.error("give the DBLP CSV dump or --store")
+
+    if args.store:
+        papers_per_year, counts = count_store_keywords(args.store, args.min_year)
+    else:
+        papers_per_year, counts = count_keywords(read_dblp_csv(args.dblp_csv, args.chunksize), args.min_year)
+    growth = subfield_growth(papers_per_year, counts, top_n=args.top)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(to_json(growth), f, indent=2, ensure_ascii=False)
+    print(f"Growth of {len(growth['share'].columns)} subfields over {len(growth['share'])} years saved to {args.output}")
+
+    if args.metrics:
+        pd.concat(growth, axis=1).to_csv(args.metrics)
+        print(f"Metrics saved to {args.metrics}")
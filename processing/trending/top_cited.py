@@ -0,0 +1,203 @@
+import argparse
+import hashlib
+import heapq
+import json
+import os
+
+import pandas as pd
+
+from dblp_ingest import STORE_DIR, read_table, store_years
+
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "website", "src", "data", "top_cited.json")
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "top_cited_state.json")
+STATE_VERSION = 1
+
+CSV_COLUMNS = ["id", "title", "year", "author_name", "n_citation", "venue_name", "venue_type", "doi", "keyword"]
+
+class TopK:
+    """Bounded min-heap keeping the k most cited papers pushed into it."""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+
+    def push(self, paper):
+        # Ties on citations are broken by id so that results do not depend on the scan order
+        item = (paper["n_citation"], -paper["id"], paper)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def papers(self):
+        """Kept papers, most cited first."""
+        return [paper for _, _, paper in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+class TopCited:
+    """Most cited papers overall and per venue type, each kept in a bounded heap."""
+
+    def __init__(self, k):
+        self.k = k
+        self.overall = TopK(k)
+        self.by_venue_type = {}
+
+    def push(self, paper):
+        self.overall.push(paper)
+        self.by_venue_type.setdefault(paper["venue_type"] or "unknown", TopK(self.k)).push(paper)
+
+    def to_json(self):
+        """Lists sorted most cited first, in the schema read by the website."""
+        return {
+            "top_n": self.k,
+            "overall": self.overall.papers(),
+            "by_venue_type": {venue_type: top.papers() for venue_type, top in sorted(self.by_venue_type.items())}
+        }
+
+def _split(value):
+    """Items of a ";"-joined DBLP field, without blanks and "nan" placeholders."""
+    if not isinstance(value, str):
+        return []
+    return [item.strip() for item in value.split(";") if item.strip() and item.strip().lower() != "nan"]
+
+def filter_papers(df):
+    """Drop books, papers without a venue and rows without a title or citation count."""
+    venue_type = df["venue_type"].fillna("").astype(str).str.strip().str.lower()
+    venue_name = df["venue_name"].fillna("").astype(str).str.strip().str.lower()
+    keep = (venue_type != "book") & ~venue_name.isin(["", "n/a"]) & df["title"].notna() & df["n_citation"].notna()
+    return df[keep]
+
+def candidates(df, k):
+    """Rows that can enter a top k: the k most cited overall and the k most cited of each venue type."""
+    df = df.sort_values(["n_citation", "id"], ascending=[False, True], kind="stable")
+    venue_type = df["venue_type"].fillna("").astype(str).str.strip()
+    keep = venue_type.groupby(venue_type).cumcount().to_numpy() < k
+    keep[:k] = True
+    return df[keep]
+
+def slim_paper(row, authors, keywords):
+    """The fields of a paper shown by the website."""
+    return {
+        "id": int(row["id"]),
+        "title": row["title"],
+        "year": int(row["year"]) if pd.notna(row["year"]) else None,
+        "authors": authors,
+        "n_citation": int(row["n_citation"]),
+        "venue_name": row["venue_name"].strip(),
+        "venue_type": row["venue_type"].strip() if isinstance(row["venue_type"], str) else "",
+        "doi": row["doi"] if isinstance(row["doi"], str) else None,
+        "keywords": keywords
+    }
+
+def top_cited_from_csv(dblp_csv, k=100, chunksize=200000):
+    """
+    Stream the DBLP CSV dump once and keep its most cited papers.
+
+    Each chunk is filtered and cut down to its candidates with vectorized
+    pandas operations; only those are pushed into the heaps, so memory is
+    bounded by the chunk size and k.
+    """
+    top = TopCited(k)
+    for chunk in pd.read_csv(dblp_csv, usecols=CSV_COLUMNS, chunksize=chunksize):
+        for row in candidates(filter_papers(chunk), k).to_dict("records"):
+            top.push(slim_paper(row, _split(row["author_name"]), _split(row["keyword"])))
+    return top.to_json()
+
+def partition_fingerprint(store, year):
+    """
+    Cheap content fingerprint of a year partition: the names and sizes of its files and their Parquet footers.
+
+    Re-ingesting an unchanged dump gives the same fingerprint, so the
+    partition is not scanned again.
+    """
+    digest = hashlib.sha256()
+    for table in ["papers", "authors", "keywords"]:
+        directory = os.path.join(store, table, f"year={year}")
+        for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            path = os.path.join(directory, name)
+            size = os.path.getsize(path)
+            with open(path, "rb") as f:
+                f.seek(max(0, size - 65536))
+                footer = f.read()
+            digest.update(f"{table}/{name}:{size}:".encode("utf-8"))
+            digest.update(footer)
+    return digest.hexdigest()
+
+def top_cited_partition(store, year, k):
+    """Candidates of one year partition, with their authors and keywords read for those papers only."""
+    papers = read_table("papers", columns=["id", "title", "year", "n_citation", "venue_name", "venue_type", "doi"],
+                        years=[year], store=store)
+    papers = candidates(filter_papers(papers), k)
+    if papers.empty:
+        return []
+
+    ids = papers["id"].tolist()
+    authors = read_table("authors", columns=["id", "position", "author_name"], years=[year], ids=ids, store=store)
+    keywords = read_table("keywords", columns=["id", "position", "keyword"], years=[year], ids=ids, store=store)
+    authors = authors.sort_values(["id", "position"]).groupby("id")["author_name"].agg(list)
+    keywords = keywords.sort_values(["id", "position"]).groupby("id")["keyword"].agg(list)
+
+    return [
+        slim_paper(row, authors.get(row["id"], []), keywords.get(row["id"], []))
+        for row in papers.to_dict("records")
+    ]
+
+def top_cited_from_store(store=STORE_DIR, k=100, state_file=STATE_FILE):
+    """
+    Keep the most cited papers of the Parquet store, updating the previous results incrementally.
+
+    The candidates of every year partition are saved in `state_file`
+    together with the partition fingerprint. On the next run only partitions
+    whose fingerprint changed are scanned again, and the final ranking is
+    merged from the saved candidates.
+    """
+    state = {"version": STATE_VERSION, "top_n": k, "partitions": {}}
+    if state_file and os.path.exists(state_file):
+        with open(state_file, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("version") == STATE_VERSION and saved.get("top_n") == k:
+            state = saved
+
+    partitions = {}
+    scanned = 0
+    for year in store_years(store):
+        fingerprint = partition_fingerprint(store, year)
+        previous = state["partitions"].get(str(year))
+        if previous and previous["fingerprint"] == fingerprint:
+            partitions[str(year)] = previous
+            continue
+        partitions[str(year)] = {"fingerprint": fingerprint, "papers": top_cited_partition(store, year, k)}
+        scanned += 1
+    print(f"Scanned {scanned} of {len(partitions)} year partitions")
+
+    if state_file:
+        state["partitions"] = partitions
+        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        with open(state_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    top = TopCited(k)
+    for partition in partitions.values():
+        for paper in partition["papers"]:
+            top.push(paper)
+    return top.to_json()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract the most cited papers of the DBLP dump.")
+    parser.add_argument("dblp_csv", nargs="?", help="DBLP CSV dump")
+    parser.add_argument("--store", nargs="?", const=STORE_DIR, default=None,
+                        help="read the Parquet store written by dblp_ingest.py, only rescanning changed years")
+    parser.add_argument("-k", "--top", type=int, default=100, help="papers kept overall and per venue type (default: 100)")
+    parser.add_argument("-o", "--output", default=OUTPUT_FILE, help="output JSON file (default: the website data)")
+    parser.add_argument("--chunksize", type=int, default=200000, help="rows read at a time from the CSV dump")
+    args = parser.parse_args()
+    if not args.dblp_csv and not args.store:
+        parser.error("give the DBLP CSV dump or --store")
+
+    if args.store:
+        ranked = top_cited_from_store(args.store, args.top)
+    else:
+        ranked = top_cited_from_csv(args.dblp_csv, args.top, args.chunksize)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(ranked, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"{len(ranked['overall'])} most cited papers saved to {args.output}")
@@ -1,21 +1,32 @@
 import requests
-import time
 import json
+import os
+import sys
+import argparse
 import pandas as pd
 from tqdm import tqdm
 
-def fetch_trending_cs_papers(max_papers=1000, year_range=None):
+# Shared helpers live in the parent processing/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from response_cache import ResponseCache, CacheMiss
+from rate_limit import API_BASE, request_json
+from crawl_metrics import PAPERS, shared_metrics, add_metrics_arguments, reporter_from_args
+from bulk_search import iter_bulk_search, write_jsonl
+
+def fetch_trending_cs_papers(max_papers=1000, year_range=None, cache=None, limiter=None):
     """
     Fetch computer science papers with high citation counts
     
     Args:
         max_papers: Maximum number of papers to fetch
         year_range: Optional tuple of (start_year, end_year) to filter papers
+        cache: Optional ResponseCache used to skip pages fetched by earlier runs
+        limiter: Optional TokenBucket, defaults to the one shared by all fetchers
         
     Returns:
         List of papers sorted by citation count
     """
-    base_url = "https://api.semanticscholar.org/graph/v1/paper/search"
+    base_url = f"{API_BASE}/paper/search"
     
     # Fields to fetch
     fields = ["paperId", "title", "abstract", "year", "venue", "publicationTypes", 
@@ -45,53 +56,97 @@ def fetch_trending_cs_papers(max_papers=1000, year_range=None):
                 "sort": "citationCount:desc"  # Sort by highest citation count first
             }
             
-            # Make request with retries for rate limiting
+            # Rate limiting, retries and caching are handled by request_json
             max_retries = 5
-            retry_count = 0
-            success = False
-            
-            while not success and retry_count < max_retries:
-                try:
-                    response = requests.get(base_url, params=params)
-                    response.raise_for_status()
-                    success = True
-                except requests.exceptions.RequestException as e:
-                    retry_count += 1
-                    wait_time = 2 ** retry_count  # Exponential backoff
-                    print(f"Request failed, retrying in {wait_time} seconds: {e}")
-                    time.sleep(wait_time)
+            try:
+                data = request_json(requests, "GET", base_url, params=params, limiter=limiter,
+                                    max_retries=max_retries, cache=cache)
+            except CacheMiss:
+                print(f"Page at offset {offset} is not cached, stopping in cache-only mode")
+                break
             
-            if not success:
+            if data is None:
                 print(f"Failed to fetch data after {max_retries} retries")
                 break
             
-            data = response.json()
             batch = data.get("data", [])
             
             if not batch:
                 # No more papers to fetch
                 break
             
+            shared_metrics().inc(PAPERS, len(batch), source="search", status="fetched")
             all_papers.extend(batch)
             pbar.update(len(batch))
             
             # Increment offset for next request
             offset += len(batch)
-            
-            # Respect rate limiting
-            time.sleep(1)
     
     return all_papers
 
+def stream_trending_cs_papers(filename, max_papers=None, year_range=None, cache=None, limiter=None):
+    """
+    Stream computer science papers sorted by citation count to a JSON-lines file
+    
+    Uses the /paper/search/bulk endpoint, which follows continuation tokens
+    instead of offsets, so it is not capped at 1,000 results and papers are
+    written as they arrive instead of being held in memory.
+    
+    Args:
+        filename: Output JSON-lines file
+        max_papers: Maximum number of papers to fetch (default: all matching papers)
+        year_range: Optional tuple of (start_year, end_year) to filter papers
+        cache: Optional ResponseCache used to skip pages fetched by earlier runs
+        limiter: Optional TokenBucket, defaults to the one shared by all fetchers
+        
+    Returns:
+        Number of papers written
+    """
+    fields = ["paperId", "title", "abstract", "year", "venue", "publicationTypes", 
+             "authors", "citationCount", "fieldsOfStudy"]
+    filters = {"fieldsOfStudy": "Computer Science"}
+    if year_range:
+        start_year, end_year = year_range
+        filters["year"] = f"{start_year}-{end_year}"
+    
+    papers = iter_bulk_search(fields=fields, filters=filters, sort="citationCount:desc",
+                              max_papers=max_papers, cache=cache, limiter=limiter)
+    return write_jsonl(papers, filename, total=max_papers)
+
 if __name__ == "__main__":
     import datetime
     current_year = datetime.datetime.now().year
     
-    # Fetch papers from the last 5 years
-    papers = fetch_trending_cs_papers(
-        max_papers=1000,
-        year_range=(current_year-5, current_year)
-    )
+    parser = argparse.ArgumentParser(description="Fetch highly cited computer science papers.")
+    parser.add_argument("--bulk", metavar="JSONL",
+                        help="stream papers from the bulk search endpoint into this JSON-lines file")
+    parser.add_argument("--max-papers", type=int, default=None,
+                        help="maximum number of papers to stream in --bulk mode (default: all)")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    reporter = reporter_from_args(args)
+    if reporter:
+        reporter.start()
+    
+    try:
+        if args.bulk:
+            stream_trending_cs_papers(
+                args.bulk,
+                max_papers=args.max_papers,
+                year_range=(current_year-5, current_year),
+                cache=ResponseCache.from_env()
+            )
+            sys.exit(0)
+    
+        # Fetch papers from the last 5 years
+        papers = fetch_trending_cs_papers(
+            max_papers=1000,
+            year_range=(current_year-5, current_year),
+            cache=ResponseCache.from_env()
+        )
+    finally:
+        if reporter:
+            reporter.stop()
     
     # Save results to JSON file
     with open("trending_cs_papers.json", "w") as f:
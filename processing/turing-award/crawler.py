@@ -1,28 +1,108 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import re
 import os
 import json
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 from tqdm import tqdm
 
-def fetch_turing_award_winners():
-    base_url = "https://amturing.acm.org/"
-    by_year_url = urljoin(base_url, "byyear.cfm")
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                      'AppleWebKit/537.36 (KHTML, like Gecko) '
-                      'Chrome/122.0.0.0 Safari/537.36'
-    }
+BASE_URL = "https://amturing.acm.org/"
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                  'AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/122.0.0.0 Safari/537.36'
+}
+CACHE_DIR = ".cache"
+
+class ConditionalFetcher:
+    """
+    Pooled HTTP client doing conditional GETs.
+
+    The ETag and Last-Modified validators of every downloaded URL are kept in
+    a JSON manifest along with the local copy of the body. On the next run
+    they are sent back as If-None-Match / If-Modified-Since, and a 304 answer
+    is served from the local copy, so unchanged pages and images cost a
+    request but no transfer. Safe to share between threads.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_workers=8, refresh=False):
+        self.cache_dir = cache_dir
+        self.refresh = refresh
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.downloaded = 0
+        self.not_modified = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(cache_dir, "pages"), exist_ok=True)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path) and not refresh:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    def fetch(self, url, path=None):
+        """
+        Return the body of `url`, downloading it only if it changed since the last run.
 
-    os.makedirs("images", exist_ok=True)
+        The body is stored at `path`, or under the cache directory if no path is given.
+        Returns None if the server answers with an error status.
+        """
+        if path is None:
+            path = os.path.join(self.cache_dir, "pages", hashlib.sha1(url.encode('utf-8')).hexdigest())
+        with self._lock:
+            entry = self.manifest.get(url)
 
-    response = requests.get(by_year_url, headers=headers)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, 'html.parser')
-    winners_data = []
+        headers = {}
+        if entry and os.path.exists(path) and not self.refresh:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
 
-    # Collect all (year, anchor) pairs
+        response = self.session.get(url, headers=headers, timeout=30)
+        if response.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+            with open(path, 'rb') as f:
+                return f.read()
+        if response.status_code != 200:
+            return None
+
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        with self._lock:
+            self.downloaded += 1
+            self.bytes += len(response.content)
+            self.manifest[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'path': path
+            }
+        return response.content
+
+    def is_cached(self, url, path):
+        """Whether `url` was downloaded to `path` by an earlier run."""
+        with self._lock:
+            return url in self.manifest and os.path.exists(path)
+
+    def save_manifest(self):
+        with self._lock:
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=1)
+
+def parse_winner_entries(html):
+    """Collect all (year, name, profile URL) triples of the by-year index page."""
+    soup = BeautifulSoup(html, 'html.parser')
     winner_entries = []
     for li in soup.find_all('li'):
         text = li.get_text(strip=True)
@@ -31,68 +111,106 @@ def fetch_turing_award_winners():
             year = match.group(1)
             anchors = li.find_all('a')
             for anchor in anchors:
-                winner_entries.append((year, anchor))
-
-    # Progress bar for each winner
-    for year, anchor in tqdm(winner_entries, desc="Scraping winners", unit="winner"):
-        name = anchor.get_text(strip=True)
-        profile_rel_link = anchor['href']
-        profile_url = urljoin(base_url, profile_rel_link)
-
-        # Fetch individual profile page
-        profile_response = requests.get(profile_url, headers=headers)
-        profile_response.raise_for_status()
-        profile_soup = BeautifulSoup(profile_response.text, 'html.parser')
-
-        # Extract citation from <div class="citation"><p>...</p></div>
-        citation = ""
-        citation_div = profile_soup.find('div', class_='citation')
-        if citation_div:
-            citation_p = citation_div.find('p')
-            if citation_p:
-                citation = citation_p.get_text(strip=True)
-
-        # Extract country from <div class="description"><span>Country – Year</span></div>
-        country = ""
-        desc_div = profile_soup.find('div', class_='description')
-        if desc_div:
-            span = desc_div.find('span')
-            if span:
-                text = span.get_text(strip=True)
-                country = text.split("–")[0].strip()
-
-        # Extract profile image from the featured-photo section
-        image_url = ""
-        image_filename = ""
-        photo_div = profile_soup.find("div", class_="featured-photo")
-        if photo_div:
-            img_tag = photo_div.find("img")
-            if img_tag and 'src' in img_tag.attrs:
-                image_src = img_tag['src']
-                image_url = urljoin(base_url, image_src)
-                image_filename = os.path.basename(urlparse(image_url).path)
-                image_path = os.path.join("images", image_filename)
-
-                if not os.path.exists(image_path):
-                    img_response = requests.get(image_url, headers=headers)
-                    if img_response.status_code == 200:
-                        with open(image_path, 'wb') as f:
-                            f.write(img_response.content)
-
-        winners_data.append({
-            'year': year,
-            'name': name,
-            'profile_url': profile_url,
-            'citation': citation,
-            'country': country,
-            'image_filename': image_filename
-        })
+                winner_entries.append((year, anchor.get_text(strip=True), urljoin(BASE_URL, anchor['href'])))
+    return winner_entries
+
+def parse_profile(html):
+    """Extract the citation, country and photo URL of a winner's profile page."""
+    profile_soup = BeautifulSoup(html, 'html.parser')
+
+    # Extract citation from <div class="citation"><p>...</p></div>
+    citation = ""
+    citation_div = profile_soup.find('div', class_='citation')
+    if citation_div:
+        citation_p = citation_div.find('p')
+        if citation_p:
+            citation = citation_p.get_text(strip=True)
 
+    # Extract country from <div class="description"><span>Country – Year</span></div>
+    country = ""
+    desc_div = profile_soup.find('div', class_='description')
+    if desc_div:
+        span = desc_div.find('span')
+        if span:
+            text = span.get_text(strip=True)
+            country = text.split("–")[0].strip()
+
+    # Extract profile image from the featured-photo section
+    image_url = ""
+    photo_div = profile_soup.find("div", class_="featured-photo")
+    if photo_div:
+        img_tag = photo_div.find("img")
+        if img_tag and 'src' in img_tag.attrs:
+            image_url = urljoin(BASE_URL, img_tag['src'])
+
+    return citation, country, image_url
+
+def scrape_winner(fetcher, year, name, profile_url, image_dir="images"):
+    """Fetch one winner's profile page and photo, skipping whatever did not change."""
+    html = fetcher.fetch(profile_url)
+    if html is None:
+        raise requests.HTTPError(f"Could not fetch {profile_url}")
+    citation, country, image_url = parse_profile(html)
+
+    image_filename = ""
+    if image_url:
+        image_filename = os.path.basename(urlparse(image_url).path)
+        image_path = os.path.join(image_dir, image_filename)
+        # Photos downloaded before the manifest existed are kept as they are
+        if fetcher.refresh or fetcher.is_cached(image_url, image_path) or not os.path.exists(image_path):
+            fetcher.fetch(image_url, image_path)
+
+    return {
+        'year': year,
+        'name': name,
+        'profile_url': profile_url,
+        'citation': citation,
+        'country': country,
+        'image_filename': image_filename
+    }
+
+def fetch_turing_award_winners(max_workers=8, refresh=False, cache_dir=CACHE_DIR, image_dir="images"):
+    """
+    Scrape every Turing Award winner's profile and photo.
+
+    Profiles are fetched concurrently by `max_workers` threads sharing one
+    pooled session, with conditional requests so that a re-run only downloads
+    the pages and photos that changed, unless `refresh` is set. Winners are
+    returned in index order.
+    """
+    os.makedirs(image_dir, exist_ok=True)
+    fetcher = ConditionalFetcher(cache_dir, max_workers, refresh)
+
+    html = fetcher.fetch(urljoin(BASE_URL, "byyear.cfm"))
+    if html is None:
+        raise requests.HTTPError("Could not fetch the list of winners")
+    winner_entries = parse_winner_entries(html)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(scrape_winner, fetcher, year, name, profile_url, image_dir)
+                for year, name, profile_url in winner_entries
+            ]
+            # Progress bar for each winner
+            winners_data = [
+                future.result()
+                for future in tqdm(futures, desc="Scraping winners", unit="winner")
+            ]
+    finally:
+        fetcher.save_manifest()
+
+    print(f"{fetcher.downloaded} downloaded ({fetcher.bytes // 1024} KB), {fetcher.not_modified} not modified")
     return winners_data
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape the Turing Award winners from amturing.acm.org.")
+    parser.add_argument("--workers", type=int, default=8, help="number of concurrent requests (default: 8)")
+    parser.add_argument("--refresh", action="store_true", help="ignore the manifest and download everything again")
+    args = parser.parse_args()
+
     print("🚀 Starting scrape of Turing Award winners...")
-    winners = fetch_turing_award_winners()
+    winners = fetch_turing_award_winners(args.workers, args.refresh)
 
     with open('turing_award_winners.json', 'w', encoding='utf-8') as f:
         json.dump(winners, f, ensure_ascii=False, indent=4)
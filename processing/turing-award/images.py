@@ -0,0 +1,141 @@
+from PIL import Image, ImageOps
+import os
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
+
+# The website draws portraits in 112px squares (w-28), 224px tiles cover 2x screens
+FORMATS = {
+    'avif': {'quality': 50},
+    'webp': {'quality': 75, 'method': 6},
+}
+SPRITE_TILE = 224
+SPRITE_COLUMNS = 10
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "website", "src", "data", "images")
+
+def content_hash(path):
+    """Short hash of a file's bytes, used to name the sprite so that unchanged inputs are skipped."""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+def square(image, size):
+    """Center-crop an image to a square and resize it, as object-cover does in the browser."""
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    return ImageOps.fit(image, (size, size), Image.LANCZOS)
+
+def make_tile(path):
+    """Crop and resize one portrait to a sprite tile. Runs in a worker process."""
+    with Image.open(path) as image:
+        return square(image, SPRITE_TILE)
+
+def build_sprite(tiles, output_dir, max_workers=None):
+    """
+    Pack square portraits into one atlas per format, so the grid needs a single image request.
+
+    Args:
+        tiles: List of (source image path, content hash), in display order
+        output_dir: Directory where the atlases are written
+        max_workers: Number of worker processes resizing the portraits (default: one per CPU)
+
+    Returns:
+        Tuple of (file name per format, atlas width, atlas height). Atlases are
+        named after the hashes of their tiles and only rebuilt when one changed.
+    """
+    digest = hashlib.sha256(''.join(d for _, d in tiles).encode('utf-8')).hexdigest()[:12]
+    columns = min(SPRITE_COLUMNS, len(tiles))
+    rows = -(-len(tiles) // columns)
+    width, height = columns * SPRITE_TILE, rows * SPRITE_TILE
+    files = {fmt: f"turing-sprite-{digest}.{fmt}" for fmt in FORMATS}
+
+    if all(os.path.exists(os.path.join(output_dir, name)) for name in files.values()):
+        print("Portraits unchanged, keeping the sprite")
+        return files, width, height
+
+    sprite = Image.new('RGB', (width, height), 'white')
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        squares = executor.map(make_tile, [path for path, _ in tiles])
+        for i, tile in enumerate(tqdm(squares, total=len(tiles), desc="Encoding portraits", unit="image")):
+            sprite.paste(tile, ((i % columns) * SPRITE_TILE, (i // columns) * SPRITE_TILE))
+    for fmt, options in FORMATS.items():
+        sprite.save(os.path.join(output_dir, files[fmt]), **options)
+
+    # Only the current atlases are deployed
+    for name in os.listdir(output_dir):
+        if name.startswith("turing-sprite-") and name not in files.values():
+            os.remove(os.path.join(output_dir, name))
+    return files, width, height
+
+def process_images(winners, image_dir="images", output_dir=OUTPUT_DIR, max_workers=None):
+    """
+    Pack the winners' portraits into a sprite and describe each winner's tile in `winners`.
+
+    The sprite is named after the content hashes of its portraits, so it is
+    only encoded again when one of them changed. Portraits are resized over a
+    process pool. Each winner with a portrait gets an "image" entry:
+
+        {"sprite": {"avif": file, "webp": file, "x": ..., "y": ..., "size": 224, "width": ..., "height": ...}}
+
+    Args:
+        winners: List of winner dictionaries from fetch_turing_award_winners, updated in place
+        image_dir: Directory of the downloaded portraits
+        output_dir: Directory where the sprite is written, served by the website
+        max_workers: Number of worker processes (default: one per CPU)
+
+    Returns:
+        The updated list of winners
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    sources = {}
+    for w in winners:
+        path = os.path.join(image_dir, w.get('image_filename') or '')
+        if w.get('image_filename') and os.path.exists(path) and path not in sources:
+            sources[path] = content_hash(path)
+
+    if not sources:
+        return winners
+
+    tiles = list(sources.items())
+    position = {path: i for i, (path, _) in enumerate(tiles)}
+    files, width, height = build_sprite(tiles, output_dir, max_workers)
+    columns = width // SPRITE_TILE
+
+    for w in winners:
+        path = os.path.join(image_dir, w.get('image_filename') or '')
+        if path not in sources:
+            w.pop('image', None)
+            continue
+        i = position[path]
+        w['image'] = {
+            'sprite': {
+                **files,
+                'x': (i % columns) * SPRITE_TILE,
+                'y': (i // columns) * SPRITE_TILE,
+                'size': SPRITE_TILE,
+                'width': width,
+                'height': height
+            }
+        }
+
+    return winners
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Encode the Turing Award portraits for the web, after crawler.py.")
+    parser.add_argument("--winners", default="turing_award_winners.json", help="winners JSON written by crawler.py, updated in place")
+    parser.add_argument("--images", default="images", help="directory of the downloaded portraits")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="directory of the sprite, served by the website")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    with open(args.winners, 'r', encoding='utf-8') as f:
+        winners = json.load(f)
+
+    process_images(winners, args.images, args.output_dir, args.workers)
+
+    with open(args.winners, 'w', encoding='utf-8') as f:
+        # Same layout as prettier, so the website copy can be replaced by this file as is
+        json.dump(winners, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"✅ Image manifest merged into '{args.winners}'")
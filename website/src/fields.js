@@ -91,15 +91,11 @@
     infoPaper.innerHTML = '';
 
     if (d.path != '' && d.path != undefined) {
-      Promise.all([d3.csv(`${d.path}/papers.csv`), d3.csv(`${d.path}/connections.csv`)]).then(
-        ([papersRaw, connections]) => {
-          const sp = papersRaw[0];
-          const authorsList = sp.authors
-            .split(';')
-            .map((s) => s.trim())
-            .join(', ');
-
-          infoPaper.innerHTML = `      
+      d3.json(`${d.path}/bundle.json`).then((bundle) => {
+        const sp = bundle.spotlight;
+        const authorsList = sp.authors.join(', ');
+
+        infoPaper.innerHTML = `      
 <h2 class="text-xl font-semibold text-yellow-600 mt-8">🌟 Paper in the Spotlight</h2>
       <div class="bg-yellow-50 border-l-4 border-yellow-500 p-4 rounded">
         <a href="${sp.url}" target="_blank"
@@ -110,11 +106,10 @@
         <p class="mt-1 text-gray-700"><strong>Venue:</strong> ${sp.venue}</p>
       </div>`;
 
-          loadGraphs(papersRaw, connections);
-          document.getElementById('authors-network-container').classList.remove('hidden');
-          document.getElementById('citation-network-container').classList.remove('hidden');
-        }
-      );
+        loadGraphs(bundle);
+        document.getElementById('authors-network-container').classList.remove('hidden');
+        document.getElementById('citation-network-container').classList.remove('hidden');
+      });
     }
   }
 
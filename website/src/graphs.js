@@ -1,112 +1,25 @@
-function loadGraphs(papersRaw, connections) {
-  const paperIds = new Set();
-  connections.forEach((c) => {
-    paperIds.add(c.source);
-    paperIds.add(c.target);
-  });
-
-  const maxPapers = paperIds.size;
-  const maxAuthors = new Set(
-    papersRaw.flatMap((p) => (p.authors || '').split(';').map((a) => a.trim()))
-  ).size;
-
-  drawPapersByVenueSunburst(papersRaw);
-  drawAuthorGraph(getMainAuthor(papersRaw[0]), papersRaw);
+function loadGraphs(bundle) {
+  drawPapersByVenueSunburst(bundle);
+  drawAuthorGraph(bundle);
 }
 
-function drawPapersByVenueSunburst(papersRaw) {
+// Papers, venues and the sunburst selection are precomputed by processing/build_subfield_bundles.py
+function drawPapersByVenueSunburst(bundle) {
   d3.select('#citation-network').selectAll('*').remove();
 
-  const papers = papersRaw.filter((p) => p.venue?.trim() !== '');
-  const mainPaper = papersRaw[0];
-  const mainPaperId = mainPaper?.paper_id;
-
-  const data = { name: 'root', children: [] };
-  const venueMap = new Map();
-
-  papers.forEach((p) => {
-    if (!venueMap.has(p.venue)) {
-      venueMap.set(p.venue, { name: p.venue, children: [] });
-    }
-    venueMap.get(p.venue).children.push({
-      name: p.title,
-      paper_id: p.paper_id,
-      url: p.url,
-    });
-  });
-
-  if (mainPaper.venue.trim() === '') {
-    mainPaper.venue = 'Unknown Venue';
-  }
-
-  const sortedVenues = Array.from(venueMap.values()).sort(
-    (a, b) => b.children.length - a.children.length
-  );
-
-  let totalPapers = 0;
-  const limitedVenues = [];
-
-  let mainPaperAdded = false;
-
-  for (const venue of sortedVenues) {
-    if (totalPapers >= 50) break;
-
-    const papersFromVenue = [];
-    for (let paper of venue.children) {
-      if (papersFromVenue.length < 10 && totalPapers < 50) {
-        papersFromVenue.push(paper);
-        totalPapers++;
-        if (paper.paper_id === mainPaperId) {
-          mainPaperAdded = true;
-        }
-      }
-    }
-
-    if (papersFromVenue.length > 0) {
-      limitedVenues.push({
-        name: venue.name,
-        children: papersFromVenue,
-      });
-    }
-  }
-
-  if (!mainPaperAdded) {
-    let added = false;
-
-    for (let venue of limitedVenues) {
-      if (venue.name === mainPaper.venue) {
-        venue.children.push({
-          name: mainPaper.title,
-          paper_id: mainPaper.paper_id,
-          url: mainPaper.url,
-        });
-        totalPapers++;
-        added = true;
-        break;
-      }
-    }
+  const mainPaperId = 0; // the spotlight paper comes first in the bundle
 
-    if (!added) {
-      limitedVenues.push({
-        name: mainPaper.venue,
-        children: [
-          {
-            name: mainPaper.title,
-            paper_id: mainPaper.paper_id,
-            url: mainPaper.url,
-          },
-        ].concat(
-          venueMap
-            .get(mainPaper.venue)
-            ?.children.filter((p) => p.paper_id != mainPaperId)
-            .slice(0, 9) || []
-        ),
-      });
-      totalPapers++;
-    }
-  }
-
-  data.children = limitedVenues;
+  const data = {
+    name: 'root',
+    children: bundle.sunburst.map((venue) => ({
+      name: venue.venue,
+      children: venue.papers.map((i) => ({
+        name: bundle.papers.title[i],
+        paper_id: i,
+        url: bundle.papers.url[i],
+      })),
+    })),
+  };
 
   const width = 800;
   const radius = width / 2;
@@ -247,11 +160,7 @@ function drawPapersByVenueSunburst(papersRaw) {
     });
 }
 
-function getMainAuthor(mainPaper) {
-  return mainPaper.authors ? mainPaper.authors.split(';')[0] || 'unknown' : 'unknown';
-}
-
-function drawAuthorGraph(mainAuthor, papersRaw, limit = 100) {
+function drawAuthorGraph(bundle) {
   const WIDTH = 1000;
   const HEIGHT = 600;
   const COLOR_NODE = '#007acc';
@@ -261,46 +170,36 @@ function drawAuthorGraph(mainAuthor, papersRaw, limit = 100) {
   d3.select('#authors-network').html('');
   d3.selectAll('.author-tooltip').remove();
 
-  const authorsMap = new Map(); // author → paper-count
-  const authorToPapers = new Map(); // author → [{title,url}]
-  const coauthorLinks = new Map(); // "A|B" → weight
-
-  papersRaw.forEach((p) => {
-    const title = p.title || 'Untitled';
-    const url = p.url || '#';
-    const authors = (p.authors || '')
-      .split(';')
-      .map((a) => a.trim())
-      .filter(Boolean);
-
-    authors.forEach((a) => {
-      authorsMap.set(a, (authorsMap.get(a) || 0) + 1);
-      (authorToPapers.get(a) || authorToPapers.set(a, []).get(a)).push({ title, url });
-    });
-
-    for (let i = 0; i < authors.length; ++i) {
-      for (let j = i + 1; j < authors.length; ++j) {
-        const key = [authors[i], authors[j]].sort().join('|');
-        coauthorLinks.set(key, (coauthorLinks.get(key) || 0) + 1);
-      }
-    }
-  });
-
-  const topAuthors = Array.from(authorsMap, ([id, count]) => ({ id, count }))
-    .sort((a, b) => b.count - a.count)
-    .slice(0, limit);
+  // Top authors, their links and settled positions are precomputed by processing/build_subfield_bundles.py
+  const { name, papers, x, y } = bundle.authors;
+  const mainAuthor = name[bundle.authors.main];
+
+  const topAuthors = name.map((id, i) => ({
+    id,
+    count: Math.max(papers[i].length, 1),
+    x: WIDTH / 2 + (x[i] * WIDTH) / 3,
+    y: HEIGHT / 2 + (y[i] * HEIGHT) / 3,
+  }));
+
+  const authorToPapers = new Map(
+    name.map((id, i) => [
+      id,
+      papers[i].map((p) => ({
+        title: bundle.papers.title[p] || 'Untitled',
+        url: bundle.papers.url[p] || '#',
+      })),
+    ])
+  );
 
-  if (!topAuthors.some((a) => a.id === mainAuthor)) {
-    topAuthors.push({ id: mainAuthor, count: authorsMap.get(mainAuthor) || 1 });
+  const links = [];
+  for (let i = 0; i < bundle.links.length; i += 3) {
+    links.push({
+      source: name[bundle.links[i]],
+      target: name[bundle.links[i + 1]],
+      value: bundle.links[i + 2],
+    });
   }
 
-  const topIds = new Set(topAuthors.map((a) => a.id));
-
-  const links = Array.from(coauthorLinks, ([key, value]) => {
-    const [source, target] = key.split('|');
-    return { source, target, value };
-  }).filter((l) => topIds.has(l.source) && topIds.has(l.target));
-
   const svg = d3
     .select('#authors-network')
     .append('svg')
@@ -420,7 +319,8 @@ function drawAuthorGraph(mainAuthor, papersRaw, limit = 100) {
         .distance(100)
     )
     .force('charge', d3.forceManyBody().strength(-300))
-    .force('center', d3.forceCenter(WIDTH / 2, HEIGHT / 2));
+    .force('center', d3.forceCenter(WIDTH / 2, HEIGHT / 2))
+    .alpha(0.3); // nodes start from the precomputed layout
 
   const mainNode = topAuthors.find((a) => a.id === mainAuthor);
   if (mainNode) {
@@ -11,12 +11,9 @@ d3.json('data/venues.json').then((d) => {
 document.addEventListener('DOMContentLoaded', () => {
   let allData = [];
 
-  d3.csv('data/high_citations_all_dblp.csv').then((data) => {
-    allData = data.filter((d) => {
-      const vt = (d.venue_type || '').toLowerCase().trim();
-      const vn = (d.venue_name || '').toLowerCase().trim();
-      return vt !== 'book' && vn !== '' && vn !== 'n/a';
-    });
+  // Filtered and sorted by citations in processing/trending/top_cited.py
+  d3.json('data/top_cited.json').then((data) => {
+    allData = data.overall;
 
     updateVisuals(10);
 
@@ -26,10 +23,7 @@ document.addEventListener('DOMContentLoaded', () => {
   });
 
   function updateVisuals(limit) {
-    const topPapers = allData
-      .filter((d) => d.title && d.n_citation)
-      .sort((a, b) => +b.n_citation - +a.n_citation)
-      .slice(0, limit);
+    const topPapers = allData.slice(0, limit);
 
     renderPapers(topPapers);
     const colorMap = renderTopAuthors(topPapers);
@@ -73,6 +67,7 @@ function renderPapers(papers) {
   const container = d3.select('#top-cited-papers').html('');
 
   papers.forEach((paper, i) => {
+    const authors = paper.authors.join(', ') || 'Unknown authors';
     const div = container
       .append('div')
       .attr(
@@ -102,11 +97,7 @@ function renderPapers(papers) {
     div
       .append('p')
       .attr('class', 'text-sm text-gray-600')
-      .text(
-        `${
-          parseAuthors(paper.author_name).join(', ') || 'Unknown authors'
-        } • ${formatNumberWithQuote(Math.floor(paper.n_citation))} citations`
-      );
+      .text(`${authors} • ${formatNumberWithQuote(paper.n_citation)} citations`);
   });
 }
 
@@ -125,7 +116,7 @@ function toggleDetails(paper) {
 
 function showDetails(paper) {
   d3.select('#detail-title').text(paper.title);
-  d3.select('#detail-authors').text(`${parseAuthors(paper.author_name).join(', ') || 'Unknown'}`);
+  d3.select('#detail-authors').text(`${paper.authors.join(', ') || 'Unknown'}`);
   d3.select('#detail-venue').text(`${paper.venue_name || 'N/A'}`);
   d3.select('#detail-year').text(`${fmtInt(paper.year) || 'N/A'}`);
   d3.select('#detail-doi').html(
@@ -135,29 +126,18 @@ function showDetails(paper) {
   );
 
   const kwP = d3.select('#detail-keywords').html('');
-  if (paper.keyword) {
-    const kws = paper.keyword
-      .split(';')
-      .map((k) => k.trim())
-      .filter((k) => k);
-    kwP.text(kws.join(', '));
-  } else {
-    kwP.text('None');
-  }
+  kwP.text(paper.keywords.join(', ') || 'None');
 }
 
 function renderTopAuthors(papers) {
   const authorMap = new Map();
   papers.forEach((p) => {
-    const authors = parseAuthors(p.author_name);
-    const citations = +p.n_citation || 0;
-    authors.forEach((name) => {
-      authorMap.set(name, (authorMap.get(name) || 0) + citations);
+    p.authors.forEach((name) => {
+      authorMap.set(name, (authorMap.get(name) || 0) + p.n_citation);
     });
   });
 
   const topAuthors = Array.from(authorMap.entries())
-    .filter(([name, _]) => name != 'nan')
     .sort((a, b) => b[1] - a[1])
     .slice(0, 10)
     .map(([name, citations]) => ({ name, citations }));
@@ -236,10 +216,8 @@ function renderSankey(papers) {
   const nodeSet = new Set(),
     linkMap = new Map();
   papers.forEach((p) => {
-    const authors = parseAuthors(p.author_name),
-      venue = p.venue_name && p.venue_name.trim();
-    if (!venue) return;
-    authors.forEach((name) => {
+    const venue = p.venue_name;
+    p.authors.forEach((name) => {
       const a = `A:${name}`,
         v = `V:${venue}`,
         key = `${a}|${v}`;
@@ -382,14 +360,6 @@ function renderSankey(papers) {
 }
 
 /**-------------utility functions---------------------*/
-function parseAuthors(raw) {
-  if (!raw) return [];
-  return raw
-    .split(';')
-    .map((d) => d.trim())
-    .filter((a) => a && a.length > 0 && a.toLowerCase() !== 'nan');
-}
-
 function formatNumberWithQuote(num) {
   return num.toString().replace(/\B(?=(\d{3})+(?!\d))/g, "'");
 }
@@ -1,12 +1,42 @@
 /* ---------------- state ------------------------------------------------- */
 let cachedWinners = []; // keep the data around
 let showAll = false; // current view state
+const PORTRAIT_SIZE = 112; // w-28, in CSS pixels
 
 /* ---------------- helpers ---------------------------------------------- */
 function winnersPerRow(grid) {
   return getComputedStyle(grid).gridTemplateColumns.split(' ').filter(Boolean).length;
 }
 
+// Portraits are tiles of one pre-encoded sprite (processing/turing-award/images.py)
+function portrait(w) {
+  const className = `
+    row-start-2 aspect-square w-28 object-cover rounded-xl
+    filter grayscale brightness-90 transition
+    group-hover:brightness-110`;
+  const div = Object.assign(document.createElement('div'), { className });
+  div.setAttribute('role', 'img');
+  div.setAttribute('aria-label', w.name);
+  // Winners without a tile in the sprite keep an empty placeholder
+  if (!w.image) {
+    div.classList.add('bg-slate-200');
+    return div;
+  }
+
+  const { sprite } = w.image;
+  const scale = PORTRAIT_SIZE / sprite.size;
+  const avif = `url('./data/images/${sprite.avif}') type('image/avif')`;
+  const webp = `url('./data/images/${sprite.webp}') type('image/webp')`;
+  Object.assign(div.style, {
+    backgroundSize: `${sprite.width * scale}px ${sprite.height * scale}px`,
+    backgroundPosition: `-${sprite.x * scale}px -${sprite.y * scale}px`,
+  });
+  // Browsers without image-set() ignore the second value and keep the WebP sprite
+  div.style.backgroundImage = `url('./data/images/${sprite.webp}')`;
+  div.style.backgroundImage = `image-set(${avif}, ${webp})`;
+  return div;
+}
+
 /* ---------------- main renderer ---------------------------------------- */
 function renderCards(winners) {
   cachedWinners = winners; // cache for later toggles
@@ -32,14 +62,7 @@ function renderCards(winners) {
         textContent: w.name,
         className: 'row-start-1 text-sm font-semibold text-slate-700 text-center',
       }),
-      Object.assign(document.createElement('img'), {
-        src: `./data/images/${w.image_filename}`,
-        alt: w.name,
-        className: `
-          row-start-2 aspect-square w-28 object-cover rounded-xl
-          filter grayscale brightness-90 transition
-          group-hover:brightness-110`,
-      }),
+      portrait(w),
       Object.assign(document.createElement('span'), {
         textContent: w.year,
         className: 'row-start-3 text-xs text-slate-500',